@@ -7,7 +7,10 @@ from __future__ import annotations
 import json
 import os
 
-from .schema import CartProject, DisplayConfig, BootstrapConfig, BootstrapLayer
+from .schema import (
+    CartProject, DisplayConfig, BootstrapConfig, BootstrapLayer,
+    PackJson, PackMeta, PackIcon, PackHash, PackBuild, PackChunk,
+)
 
 
 class ProjectLoadError(Exception):
@@ -88,6 +91,89 @@ def load_cart(cart_path: str) -> CartProject:
         raise ProjectLoadError(f".cart 文件结构异常：{e}") from e
 
 
+def load_pack(pack_path: str) -> PackJson:
+    """
+    读取 pack.json，返回 PackJson。
+
+    未出现的字段按 schema 默认值补齐；未知字段忽略。
+
+    异常
+    ----
+    ProjectLoadError : 文件不存在、格式错误等
+    """
+    if not os.path.isfile(pack_path):
+        raise ProjectLoadError(f"文件不存在：{pack_path}")
+
+    try:
+        with open(pack_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ProjectLoadError(f"无法读取 pack.json：{e}") from e
+
+    try:
+        return pack_from_dict(data)
+    except Exception as e:
+        raise ProjectLoadError(f"pack.json 结构异常：{e}") from e
+
+
+def pack_from_dict(data: dict) -> PackJson:
+    """把 pack.json 的 dict 形式转换为 PackJson"""
+    meta_data = data.get("meta", {})
+    icon_data = data.get("icon", {})
+    hash_data = data.get("hash", {})
+    build_data = data.get("build", {})
+
+    meta = PackMeta(
+        title=meta_data.get("title", ""),
+        version=meta_data.get("version", "0.1.0"),
+        cart_id=meta_data.get("cart_id", ""),
+        entry=meta_data.get("entry", ""),
+        title_zh=meta_data.get("title_zh", ""),
+        publisher=meta_data.get("publisher", ""),
+        min_fw=meta_data.get("min_fw", ""),
+        id=meta_data.get("id", ""),
+        description=meta_data.get("description"),
+        category=meta_data.get("category", "app"),
+        tags=list(meta_data.get("tags", [])),
+        author=meta_data.get("author"),
+    )
+    icon = PackIcon(
+        path=icon_data.get("path", ""),
+        format=icon_data.get("format", "ARGB8888"),
+        width=icon_data.get("width", 200),
+        height=icon_data.get("height", 200),
+        preprocess=icon_data.get("preprocess", PackIcon().preprocess),
+    )
+    hash_cfg = PackHash(
+        header_crc32=hash_data.get("header_crc32", True),
+        image_crc32=hash_data.get("image_crc32", False),
+        per_chunk_crc32=hash_data.get("per_chunk_crc32", False),
+        per_file_crc32=hash_data.get("per_file_crc32", False),
+    )
+    build = PackBuild(
+        alignment_bytes=build_data.get("alignment_bytes", 4096),
+        deterministic=build_data.get("deterministic", True),
+        fail_on_conflict=build_data.get("fail_on_conflict", True),
+    )
+
+    chunks = []
+    for c in data.get("chunks", []):
+        chunks.append(PackChunk(
+            type=c.get("type", "RES"),
+            compress=c.get("compress", "none"),
+            source=c.get("source"),
+            name=c.get("name"),
+            glob=c.get("glob"),
+            name_prefix=c.get("name_prefix"),
+            strip_prefix=c.get("strip_prefix"),
+            exclude=list(c.get("exclude", [])),
+            order=c.get("order", "lex"),
+            res=list(c.get("res", [])),
+        ))
+
+    return PackJson(meta=meta, icon=icon, hash=hash_cfg, build=build, chunks=chunks)
+
+
 def find_cart_file(project_root: str) -> str:
     """
     在项目根目录中找到 .cart 文件，返回其绝对路径。
@@ -0,0 +1,714 @@
+"""
+CartDark IDE · project/pack_builder.py
+根据 pack.json 生成 XHGC_PACK 镜像（*.cart.bin）。
+
+流程：
+  1. 展开每个 chunk（MANF / LUA / RES / script），应用 glob、exclude、
+     strip_prefix、name_prefix、order，得到 chunk → 文件清单
+     （所有 chunk 共用一次项目遍历，见 pack_match.py）
+  2. 以流式方式把文件内容逐块拷贝进输出镜像，内存占用与文件数量/大小无关
+  3. 回写文件头与 chunk 表，临时文件写完后原子替换目标文件
+  4. 写出锁文件（见 pack_lock.py）；下次构建只重新读取有变化的文件，
+     未变化的文件 / chunk 直接从上一版镜像按字节拷贝
+
+压缩（见 pack_compress.py）按文件进行，在进程池中并行；
+build.deterministic 为 true 时输出顺序与 order 规则一致，否则按完成顺序写入。
+pack.json 的 hash 段要求的校验值由 pack_crc.py 在镜像写完后回填。
+
+镜像二进制布局见 pack_format.py。
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from .io import load_pack, ProjectLoadError
+from .pack_compress import (
+    CODECS, CompressPool, CompressedFile, FILE_FLAG_COMPRESSED,
+    STREAM_THRESHOLD, compress_payload, new_compressor,
+)
+from .pack_crc import stamp_checksums
+from .pack_format import (
+    HEADER, CHUNK_ENTRY, FILE_ENTRY, PACK_MAGIC, PACK_VERSION,
+    FLAG_DETERMINISTIC, CHUNK_FOURCC,
+)
+from .pack_lock import (
+    PackLock, LockedChunk, LockedFile, lock_path_for, load_lock, save_lock,
+    config_hash, content_hash, new_content_hash,
+)
+from .pack_match import PackScan, ScannedFile, scan_project
+from .schema import PackJson, PackChunk
+
+
+# ──────────────────────────────────────────────
+# 公开异常
+# ──────────────────────────────────────────────
+
+class PackBuildError(Exception):
+    """构建过程中的可预期错误（配置错误、文件冲突、IO 失败等）"""
+
+
+# ──────────────────────────────────────────────
+# 写入参数
+# ──────────────────────────────────────────────
+
+# 文件在 chunk 数据区内的对齐
+_FILE_ALIGN = 4
+
+# 流式拷贝的块大小
+_COPY_BLOCK = 1024 * 1024
+
+
+# ──────────────────────────────────────────────
+# 构建计划
+# ──────────────────────────────────────────────
+
+@dataclass
+class PackEntry:
+    """一个待打包的文件"""
+    name: str                      # 包内名称
+    rel: str = ""                  # 相对项目根的路径（/ 分隔）；内联数据为空
+    src: str = ""                  # 磁盘绝对路径；内联数据为空
+    size: int = 0
+    mtime_ns: int = 0
+    data: Optional[bytes] = None   # 内联数据（MANF）
+
+
+@dataclass
+class ChunkPlan:
+    """一个 chunk 展开后的结果"""
+    index: int
+    chunk: PackChunk
+    entries: list[PackEntry] = field(default_factory=list)
+
+
+@dataclass
+class BuildResult:
+    output_path: str
+    image_size: int = 0
+    chunk_count: int = 0
+    file_count: int = 0
+    reused_files: int = 0          # 从上一版镜像直接拷贝的文件数
+    up_to_date: bool = False       # 无任何变化，未重写镜像
+    warnings: list[str] = field(default_factory=list)
+
+
+# ──────────────────────────────────────────────
+# 包内名称
+# ──────────────────────────────────────────────
+
+def _in_pack_name(rel: str, chunk: PackChunk) -> str:
+    name = rel
+    strip = chunk.strip_prefix or ""
+    if strip and name.startswith(strip):
+        name = name[len(strip):]
+    return (chunk.name_prefix or "") + name
+
+
+# ──────────────────────────────────────────────
+# chunk 展开
+# ──────────────────────────────────────────────
+
+def _manifest_bytes(pack: PackJson) -> bytes:
+    """MANF（source=inline_meta）：meta 的紧凑 JSON，键排序以保证可复现"""
+    return json.dumps(pack.meta.to_dict(), ensure_ascii=False,
+                      sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _entries_from_scan(files: list[ScannedFile], chunk: PackChunk) -> list[PackEntry]:
+    return [PackEntry(_in_pack_name(f.rel, chunk), f.rel, f.path, f.size, f.mtime_ns)
+            for f in files]
+
+
+def _check_script_res(project_root: str, chunk: PackChunk, warnings: list[str]) -> None:
+    for r in chunk.res:
+        r = r.strip("/")
+        if not os.path.exists(os.path.join(project_root, r.replace("/", os.sep))):
+            warnings.append(f"script res 不存在，已跳过：{r}")
+
+
+def _sort_entries(entries: list[PackEntry], order: str, deterministic: bool) -> None:
+    if order == "size":
+        entries.sort(key=lambda e: (e.size, e.name))
+    elif order == "lex" or deterministic:
+        entries.sort(key=lambda e: e.name)
+
+
+def expand_chunks(project_root: str, pack: PackJson,
+                  warnings: list[str] | None = None,
+                  scan: PackScan | None = None) -> list[ChunkPlan]:
+    """
+    展开 pack.json 中的所有 chunk，返回与 pack.chunks 一一对应的 ChunkPlan。
+    scan 为 scan_project() 的结果，未给出时在此遍历一次项目。
+
+    异常
+    ----
+    PackBuildError : chunk 类型未知、fail_on_conflict 时出现重名文件
+    """
+    if warnings is None:
+        warnings = []
+    project_root = os.path.abspath(project_root)
+    for i, chunk in enumerate(pack.chunks):
+        if chunk.type not in CHUNK_FOURCC:
+            raise PackBuildError(f"chunks[{i}] 类型未知：{chunk.type}")
+    if scan is None:
+        scan = scan_project(project_root, pack.chunks)
+
+    plans = []
+    for i, chunk in enumerate(pack.chunks):
+
+        if chunk.type == "MANF":
+            if chunk.source not in (None, "inline_meta"):
+                raise PackBuildError(f"chunks[{i}] MANF source 不支持：{chunk.source}")
+            data = _manifest_bytes(pack)
+            entries = [PackEntry(chunk.name or "meta/manifest.bin", size=len(data), data=data)]
+        elif chunk.type == "script":
+            _check_script_res(project_root, chunk, warnings)
+            entries = _entries_from_scan(scan.chunk_files[i], chunk)
+        elif chunk.glob:
+            entries = _entries_from_scan(scan.chunk_files[i], chunk)
+        else:
+            warnings.append(f"chunks[{i}] 未指定 glob，已生成空 chunk")
+            entries = []
+
+        _sort_entries(entries, chunk.order, pack.build.deterministic)
+        plans.append(ChunkPlan(i, chunk, entries))
+
+    _check_conflicts(plans, pack.build.fail_on_conflict, warnings)
+    return plans
+
+
+def _check_conflicts(plans: list[ChunkPlan], fail: bool, warnings: list[str]) -> None:
+    """包内名称全局唯一；fail_on_conflict=False 时保留第一次出现的文件"""
+    seen: dict[str, str] = {}
+    conflicts = []
+    for plan in plans:
+        kept = []
+        for e in plan.entries:
+            origin = e.rel or e.name
+            if e.name in seen:
+                conflicts.append(f"{e.name}（{seen[e.name]} 与 {origin}）")
+                continue
+            seen[e.name] = origin
+            kept.append(e)
+        plan.entries = kept
+
+    if not conflicts:
+        return
+    if fail:
+        raise PackBuildError("包内名称冲突：\n" + "\n".join(conflicts[:20]))
+    warnings.extend(f"名称冲突，已忽略后者：{c}" for c in conflicts)
+
+
+# ──────────────────────────────────────────────
+# 镜像写入
+# ──────────────────────────────────────────────
+
+def _align(value: int, alignment: int) -> int:
+    if alignment <= 1:
+        return value
+    return (value + alignment - 1) // alignment * alignment
+
+
+def _parse_cart_id(cart_id: str) -> int:
+    try:
+        return int(cart_id, 16) & 0xFFFFFFFFFFFFFFFF
+    except (TypeError, ValueError):
+        return 0
+
+
+class _ImageWriter:
+    """顺序写出镜像，跟踪当前偏移"""
+
+    def __init__(self, f):
+        self._f = f
+        self.pos = 0
+
+    def write(self, data) -> None:
+        self._f.write(data)
+        self.pos += len(data)
+
+    def pad_to(self, alignment: int) -> None:
+        target = _align(self.pos, alignment)
+        if target > self.pos:
+            self.write(b"\0" * (target - self.pos))
+
+    def copy_file(self, src: str, expected: int) -> tuple[int, str]:
+        """把 src 流式拷贝进镜像，同时计算内容哈希，返回 (写入字节数, 哈希)"""
+        written = 0
+        h = new_content_hash()
+        with open(src, "rb") as fin:
+            while True:
+                block = fin.read(_COPY_BLOCK)
+                if not block:
+                    break
+                self._f.write(block)
+                h.update(block)
+                written += len(block)
+        self.pos += written
+        if written != expected:
+            raise PackBuildError(f"文件在构建期间被修改：{src}")
+        return written, h.hexdigest()
+
+    def copy_range(self, src_f, offset: int, size: int) -> None:
+        """从另一个已打开的镜像文件按字节拷贝 [offset, offset+size)"""
+        src_f.seek(offset)
+        remaining = size
+        while remaining > 0:
+            block = src_f.read(min(_COPY_BLOCK, remaining))
+            if not block:
+                raise PackBuildError("上一版镜像被截断，无法增量构建")
+            self._f.write(block)
+            remaining -= len(block)
+        self.pos += size
+
+    def compress_file(self, src: str, expected: int, codec: str) -> tuple[int, str, int]:
+        """
+        大文件流式压缩写入，返回 (存储字节数, 原始内容哈希, flags)。
+        压缩结果不比原文小时回退为原样存储。
+        """
+        start = self.pos
+        written = raw = 0
+        h = new_content_hash()
+        comp = new_compressor(codec)
+        with open(src, "rb") as fin:
+            while True:
+                block = fin.read(_COPY_BLOCK)
+                if not block:
+                    break
+                raw += len(block)
+                h.update(block)
+                out = comp.compress(block)
+                self._f.write(out)
+                written += len(out)
+            out = comp.flush()
+            self._f.write(out)
+            written += len(out)
+        if raw != expected:
+            raise PackBuildError(f"文件在构建期间被修改：{src}")
+        if written < raw:
+            self.pos = start + written
+            return written, h.hexdigest(), FILE_FLAG_COMPRESSED
+        self._f.seek(start)
+        self._f.truncate()
+        self.pos = start
+        size, digest = self.copy_file(src, expected)
+        return size, digest, 0
+
+
+@dataclass
+class _ChunkRecord:
+    type: str
+    compress: str
+    files: list[LockedFile] = field(default_factory=list)
+    crc32: int = 0
+    data_offset: int = 0
+    data_size: int = 0
+    index_offset: int = 0
+    index_size: int = 0
+
+    def to_lock(self) -> LockedChunk:
+        return LockedChunk(self.type, self.compress, self.data_offset,
+                           self.data_size, [r.name for r in self.files])
+
+
+def _pack_index(files: list[LockedFile]) -> bytes:
+    """crc32 先写 0，由 pack_crc.stamp_checksums 按 hash 配置回填"""
+    parts = []
+    for r in files:
+        name = r.name.encode("utf-8")
+        parts.append(FILE_ENTRY.pack(len(name), r.flags, 0,
+                                     r.offset, r.stored_size, r.raw_size))
+        parts.append(name)
+    return b"".join(parts)
+
+
+class PackBuilder:
+    """
+    XHGC_PACK 构建器。
+
+    用法
+    ----
+    result = PackBuilder(project_root).build()
+    """
+
+    def __init__(self, project_root: str, pack: PackJson | None = None,
+                 output_path: str | None = None,
+                 progress: Callable[[int, int], None] | None = None,
+                 incremental: bool = True, workers: int | None = None):
+        self.project_root = os.path.abspath(project_root)
+        if pack is None:
+            try:
+                pack = load_pack(os.path.join(self.project_root, "pack.json"))
+            except ProjectLoadError as e:
+                raise PackBuildError(str(e)) from e
+        self.pack = pack
+        self.output_path = output_path or default_output_path(self.project_root, pack)
+        self.lock_path = lock_path_for(self.output_path)
+        self.incremental = incremental
+        self._progress = progress
+        self._warnings: list[str] = []
+        self._prev: PackLock | None = None
+        self._reused = 0
+        self._workers = workers
+
+    # ── 公开 API ──────────────────────────────
+
+    def build(self) -> BuildResult:
+        """执行构建，返回 BuildResult；失败时抛出 PackBuildError"""
+        plans = expand_chunks(self.project_root, self.pack, self._warnings)
+        for plan in plans:
+            if plan.chunk.compress not in CODECS:
+                raise PackBuildError(
+                    f"chunks[{plan.index}] 不支持的压缩方式：{plan.chunk.compress}")
+
+        cfg_hash = config_hash(self.pack.to_dict())
+        if self.incremental:
+            self._prev = self._load_prev_lock()
+            if self._is_up_to_date(plans, cfg_hash):
+                return BuildResult(
+                    output_path=self.output_path,
+                    image_size=self._prev.image_size,
+                    chunk_count=len(plans),
+                    file_count=sum(len(p.entries) for p in plans),
+                    reused_files=len(self._prev.files),
+                    up_to_date=True,
+                    warnings=list(self._warnings),
+                )
+
+        out_dir = os.path.dirname(self.output_path)
+        tmp_path = self.output_path + ".tmp"
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+            prev_f = open(self.output_path, "rb") if self._prev else None
+            try:
+                with open(tmp_path, "wb") as f, CompressPool(self._workers) as pool:
+                    image_size, records = self._write_image(f, plans, prev_f, pool)
+                    f.flush()
+                    os.fsync(f.fileno())
+            finally:
+                if prev_f:
+                    prev_f.close()
+            self._stamp(tmp_path, records)
+            os.replace(tmp_path, self.output_path)
+            self._write_lock(records, cfg_hash, image_size)
+        except OSError as e:
+            _silent_remove(tmp_path)
+            raise PackBuildError(f"写入镜像失败：{e}") from e
+        except BaseException:
+            _silent_remove(tmp_path)
+            raise
+
+        return BuildResult(
+            output_path=self.output_path,
+            image_size=image_size,
+            chunk_count=len(records),
+            file_count=sum(len(r.files) for r in records),
+            reused_files=self._reused,
+            warnings=list(self._warnings),
+        )
+
+    # ── 内部 ──────────────────────────────────
+
+    def _stamp(self, image_path: str, records: list[_ChunkRecord]) -> None:
+        """计算并回填校验值；复制来的文件沿用上一版的 CRC"""
+        known = {(ci, fi): r.crc32
+                 for ci, rec in enumerate(records)
+                 for fi, r in enumerate(rec.files) if r.has_crc}
+        result = stamp_checksums(image_path, self.pack.hash, known)
+        for rec, crcs in zip(records, result.file_crc32):
+            for r, crc in zip(rec.files, crcs):
+                r.crc32, r.has_crc = crc, True
+        for rec, crc in zip(records, result.chunk_crc32):
+            rec.crc32 = crc
+
+    def _load_prev_lock(self) -> PackLock | None:
+        lock = load_lock(self.lock_path)
+        if lock is None or not lock.matches_image(self.output_path):
+            return None
+        return lock
+
+    def _write_lock(self, records: list[_ChunkRecord], cfg_hash: str, image_size: int):
+        lock = PackLock(
+            config_hash=cfg_hash,
+            image_size=image_size,
+            image_mtime_ns=os.stat(self.output_path).st_mtime_ns,
+            chunks=[r.to_lock() for r in records],
+            files={f.name: f for r in records for f in r.files},
+        )
+        try:
+            save_lock(self.lock_path, lock)
+        except OSError as e:
+            # 锁文件只影响下次构建速度，不影响本次结果
+            self._warnings.append(f"写入锁文件失败：{e}")
+
+    def _unchanged(self, entry: PackEntry, chunk_index: int,
+                   compress: str) -> LockedFile | None:
+        """返回上一版中与 entry 完全一致的文件记录；有变化时返回 None"""
+        prev = self._prev.files.get(entry.name) if self._prev else None
+        if prev is None or prev.chunk != chunk_index or prev.compress != compress:
+            return None
+        if entry.data is not None:
+            return prev if prev.hash == content_hash(entry.data) else None
+        if prev.rel == entry.rel and prev.size == entry.size and prev.mtime_ns == entry.mtime_ns:
+            return prev
+        return None
+
+    def _prev_chunk(self, plan: ChunkPlan) -> LockedChunk | None:
+        if not self._prev or plan.index >= len(self._prev.chunks):
+            return None
+        prev = self._prev.chunks[plan.index]
+        if prev.type != plan.chunk.type or prev.compress != plan.chunk.compress:
+            return None
+        return prev
+
+    def _is_up_to_date(self, plans: list[ChunkPlan], cfg_hash: str) -> bool:
+        if not self._prev or self._prev.config_hash != cfg_hash:
+            return False
+        if len(self._prev.chunks) != len(plans):
+            return False
+        for plan in plans:
+            prev_chunk = self._prev_chunk(plan)
+            if prev_chunk is None or prev_chunk.files != [e.name for e in plan.entries]:
+                return False
+            for e in plan.entries:
+                if self._unchanged(e, plan.index, plan.chunk.compress) is None:
+                    return False
+        return True
+
+    def _write_image(self, f, plans: list[ChunkPlan], prev_f,
+                     pool: CompressPool) -> tuple[int, list[_ChunkRecord]]:
+        build = self.pack.build
+        alignment = max(1, int(build.alignment_bytes or 1))
+        chunk_table_offset = HEADER.size
+        w = _ImageWriter(f)
+
+        # 先占位 header + chunk 表，数据写完后回填
+        w.write(b"\0" * (chunk_table_offset + CHUNK_ENTRY.size * len(plans)))
+
+        total = sum(len(p.entries) for p in plans)
+        done = 0
+        records = []
+        for plan in plans:
+            w.pad_to(alignment)
+            w.pad_to(_FILE_ALIGN)
+            compress = plan.chunk.compress
+            rec = _ChunkRecord(plan.chunk.type, compress, data_offset=w.pos)
+            prev_chunk = self._prev_chunk(plan) if prev_f else None
+            unchanged = [self._unchanged(e, plan.index, compress) if prev_chunk else None
+                         for e in plan.entries]
+
+            if (prev_chunk is not None and all(unchanged)
+                    and prev_chunk.files == [e.name for e in plan.entries]):
+                # 整个 chunk 未变化：数据区按字节拷贝，文件偏移保持不变
+                w.copy_range(prev_f, prev_chunk.data_offset, prev_chunk.data_size)
+                rec.files = [_relocated(p, p.offset) for p in unchanged]
+                self._reused += len(unchanged)
+                done += len(unchanged)
+                if self._progress:
+                    self._progress(done, total)
+            else:
+                for entry, prev, payload in self._chunk_stream(plan, unchanged, pool):
+                    w.pad_to(_FILE_ALIGN)
+                    offset = w.pos - rec.data_offset
+                    if prev is not None:
+                        w.copy_range(prev_f, prev_chunk.data_offset + prev.offset,
+                                     prev.stored_size)
+                        rec.files.append(_relocated(prev, offset))
+                        self._reused += 1
+                    elif payload is not None:
+                        w.write(payload.data)
+                        rec.files.append(_payload_record(entry, payload, plan.index,
+                                                         compress, offset))
+                    else:
+                        rec.files.append(self._write_entry(w, entry, plan.index,
+                                                           compress, offset))
+                    done += 1
+                    if self._progress:
+                        self._progress(done, total)
+            rec.data_size = w.pos - rec.data_offset
+            records.append(rec)
+
+        for rec in records:
+            w.pad_to(8)
+            index = _pack_index(rec.files)
+            rec.index_offset = w.pos
+            rec.index_size = len(index)
+            w.write(index)
+
+        image_size = w.pos
+        f.seek(0)
+        f.write(self._header_bytes(len(records), alignment, chunk_table_offset, image_size))
+        for rec in records:
+            f.write(_chunk_entry_bytes(rec))
+        f.seek(image_size)
+        return image_size, records
+
+    def _chunk_stream(self, plan: ChunkPlan, unchanged: list, pool: CompressPool):
+        """
+        逐个产出 (entry, prev, payload)：
+          prev    不为 None → 从上一版镜像复制
+          payload 不为 None → 已在进程池中压缩好的数据
+          两者皆 None       → 由主进程直接写入（未压缩 / 内联 / 超大文件）
+        """
+        codec = plan.chunk.compress
+        items = list(zip(plan.entries, unchanged))
+        if codec == "none":
+            for entry, prev in items:
+                yield entry, prev, None
+            return
+
+        pooled = [i for i, (e, prev) in enumerate(items)
+                  if prev is None and e.data is None and e.size <= STREAM_THRESHOLD]
+        jobs = [(i, items[i][0].src, items[i][0].size, codec) for i in pooled]
+
+        if self.pack.build.deterministic:
+            results = pool.map_files(jobs, ordered=True)
+            pooled_set = set(pooled)
+            for i, (entry, prev) in enumerate(items):
+                if i in pooled_set:
+                    key, payload = next(results)
+                    yield entry, None, payload
+                else:
+                    yield entry, prev, None
+        else:
+            pooled_set = set(pooled)
+            for i, (entry, prev) in enumerate(items):
+                if i not in pooled_set:
+                    yield entry, prev, None
+            for i, payload in pool.map_files(jobs, ordered=False):
+                yield items[i][0], None, payload
+
+    def _write_entry(self, w: _ImageWriter, entry: PackEntry, chunk_index: int,
+                     compress: str, offset: int) -> LockedFile:
+        flags = 0
+        if entry.data is not None:
+            if compress == "none":
+                w.write(entry.data)
+                size, digest, raw_size = len(entry.data), content_hash(entry.data), len(entry.data)
+            else:
+                payload = compress_payload(entry.data, compress)
+                w.write(payload.data)
+                return _payload_record(entry, payload, chunk_index, compress, offset)
+        elif compress == "none":
+            size, digest = w.copy_file(entry.src, entry.size)
+            raw_size = size
+        else:
+            size, digest, flags = w.compress_file(entry.src, entry.size, compress)
+            raw_size = entry.size
+        return LockedFile(
+            name=entry.name, rel=entry.rel, size=entry.size, mtime_ns=entry.mtime_ns,
+            hash=digest, chunk=chunk_index, offset=offset,
+            stored_size=size, raw_size=raw_size, flags=flags, compress=compress,
+        )
+
+    def _header_bytes(self, chunk_count: int, alignment: int,
+                      chunk_table_offset: int, image_size: int) -> bytes:
+        deterministic = self.pack.build.deterministic
+        return HEADER.pack(
+            PACK_MAGIC, PACK_VERSION, HEADER.size,
+            FLAG_DETERMINISTIC if deterministic else 0,
+            _parse_cart_id(self.pack.meta.cart_id),
+            chunk_count, alignment, chunk_table_offset, image_size,
+            0, 0,
+            0 if deterministic else int(time.time()),
+        )
+
+
+def _payload_record(entry: PackEntry, payload: CompressedFile, chunk_index: int,
+                    compress: str, offset: int) -> LockedFile:
+    if payload.raw_size != entry.size:
+        raise PackBuildError(f"文件在构建期间被修改：{entry.rel or entry.name}")
+    return LockedFile(
+        name=entry.name, rel=entry.rel, size=entry.size, mtime_ns=entry.mtime_ns,
+        hash=payload.hash, chunk=chunk_index, offset=offset,
+        stored_size=len(payload.data), raw_size=payload.raw_size,
+        flags=payload.flags, compress=compress,
+    )
+
+
+def _relocated(prev: LockedFile, offset: int) -> LockedFile:
+    """复用上一版的文件记录，仅更新 chunk 内偏移"""
+    return LockedFile(**{**prev.__dict__, "offset": offset})
+
+
+def _chunk_entry_bytes(rec: _ChunkRecord) -> bytes:
+    return CHUNK_ENTRY.pack(
+        CHUNK_FOURCC[rec.type], CODECS[rec.compress], 0, 0,
+        len(rec.files), rec.crc32,
+        rec.data_offset, rec.data_size, rec.index_offset, rec.index_size,
+    )
+
+
+def _silent_remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# ──────────────────────────────────────────────
+# 公开入口
+# ──────────────────────────────────────────────
+
+def default_output_path(project_root: str, pack: PackJson) -> str:
+    """默认输出到 <project_root>/build/<title>.cart.bin"""
+    name = pack.meta.title or os.path.basename(os.path.abspath(project_root))
+    return os.path.join(project_root, "build", f"{name}.cart.bin")
+
+
+def build_pack(project_root: str, output_path: str | None = None,
+               progress: Callable[[int, int], None] | None = None,
+               incremental: bool = True, workers: int | None = None) -> BuildResult:
+    """
+    按项目根目录下的 pack.json 构建镜像。
+
+    参数
+    ----
+    project_root : 项目根目录
+    output_path  : 输出文件路径，默认 build/<title>.cart.bin
+    progress     : 可选回调 progress(done, total)，每写完一个文件调用一次
+    incremental  : 是否利用锁文件做增量构建；False 时强制全量重建
+    workers      : 压缩进程数，默认 CPU 核数；<= 1 时在当前进程内压缩
+
+    异常
+    ----
+    PackBuildError : 配置错误、名称冲突、IO 失败等
+    """
+    return PackBuilder(project_root, output_path=output_path, progress=progress,
+                       incremental=incremental, workers=workers).build()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """命令行入口：python -m src.cartdark_ide.project.pack_builder <project_root>"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="构建 XHGC_PACK 镜像")
+    parser.add_argument("project_root")
+    parser.add_argument("-o", "--output", default=None)
+    parser.add_argument("--full", action="store_true", help="忽略锁文件，全量重建")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="压缩进程数")
+    args = parser.parse_args(argv)
+
+    try:
+        result = build_pack(args.project_root, args.output,
+                            incremental=not args.full, workers=args.jobs)
+    except PackBuildError as e:
+        print(f"构建失败：{e}")
+        return 1
+    for w in result.warnings:
+        print(f"警告：{w}")
+    if result.up_to_date:
+        print(f"{result.output_path}  已是最新")
+        return 0
+    print(f"{result.output_path}  {result.image_size} 字节，"
+          f"{result.chunk_count} 个 chunk，{result.file_count} 个文件"
+          f"（复用 {result.reused_files} 个）")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
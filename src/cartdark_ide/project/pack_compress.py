@@ -0,0 +1,190 @@
+"""
+CartDark IDE · project/pack_compress.py
+pack chunk 的压缩编解码器与多进程压缩调度。
+
+  - 编解码器：none / zlib / lzma（均为标准库）
+  - 每个文件单独压缩，运行时可按文件随机读取
+  - 压缩后不比原文件小的文件按原样存储（FILE_FLAG_COMPRESSED 不置位）
+  - 小文件按批提交到进程池，避免每个文件一次跨进程往返；
+    同时在途的批数受窗口限制，内存占用与文件总数无关
+"""
+from __future__ import annotations
+
+import lzma
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Iterator
+
+from .pack_lock import new_content_hash
+
+
+# 编解码器名 → chunk 表中的 compress 编码
+CODECS: dict[str, int] = {
+    "none": 0,
+    "zlib": 1,
+    "lzma": 2,
+}
+
+# 文件 index 条目 flags
+FILE_FLAG_COMPRESSED = 0x1
+
+# 超过该大小的文件不进进程池，在主进程内边读边压缩边写
+STREAM_THRESHOLD = 16 * 1024 * 1024
+
+# 每批的上限
+_BATCH_BYTES = 4 * 1024 * 1024
+_BATCH_FILES = 64
+
+
+def new_compressor(codec: str):
+    """返回流式压缩器（有 compress() / flush()），与 compress_bytes 输出一致"""
+    if codec == "zlib":
+        return zlib.compressobj(9)
+    if codec == "lzma":
+        return lzma.LZMACompressor(format=lzma.FORMAT_ALONE, preset=6)
+    raise ValueError(f"未知压缩方式：{codec}")
+
+
+def compress_bytes(data: bytes, codec: str) -> bytes:
+    c = new_compressor(codec)
+    return c.compress(data) + c.flush()
+
+
+def decompress_bytes(data: bytes, codec: str) -> bytes:
+    if codec == "none":
+        return data
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "lzma":
+        return lzma.decompress(data, format=lzma.FORMAT_ALONE)
+    raise ValueError(f"未知压缩方式：{codec}")
+
+
+@dataclass
+class CompressedFile:
+    raw_size: int
+    hash: str           # 原始内容哈希
+    flags: int
+    data: bytes         # 实际写入镜像的字节
+
+
+def compress_payload(raw: bytes, codec: str) -> CompressedFile:
+    """压缩一段内容；不比原文小时存原文"""
+    h = new_content_hash()
+    h.update(raw)
+    packed = compress_bytes(raw, codec)
+    if len(packed) < len(raw):
+        return CompressedFile(len(raw), h.hexdigest(), FILE_FLAG_COMPRESSED, packed)
+    return CompressedFile(len(raw), h.hexdigest(), 0, raw)
+
+
+def _compress_batch(jobs: list[tuple[str, str]]) -> list[tuple[int, str, int, bytes]]:
+    """进程池工作函数：读取并压缩一批文件。返回元组以减小序列化开销"""
+    out = []
+    for src, codec in jobs:
+        with open(src, "rb") as f:
+            raw = f.read()
+        r = compress_payload(raw, codec)
+        out.append((r.raw_size, r.hash, r.flags, r.data))
+    return out
+
+
+class CompressPool:
+    """
+    多进程压缩调度。
+
+    workers <= 1 或进程池不可用时退化为当前进程内顺序压缩，结果相同。
+    """
+
+    def __init__(self, workers: int | None = None):
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self._executor: ProcessPoolExecutor | None = None
+        self._disabled = self.workers <= 1
+
+    def _get_executor(self) -> ProcessPoolExecutor | None:
+        if self._executor is None and not self._disabled:
+            try:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            except (OSError, NotImplementedError, ImportError):
+                self._disabled = True
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "CompressPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+    def map_files(self, jobs: list[tuple[object, str, int, str]],
+                  ordered: bool = True) -> Iterator[tuple[object, CompressedFile]]:
+        """
+        压缩一组文件，逐个产出 (key, CompressedFile)。
+
+        jobs    : [(key, src, size, codec), ...]
+        ordered : True 时按 jobs 顺序产出；False 时按完成顺序产出
+        """
+        batches = _make_batches(jobs)
+        executor = self._get_executor()
+        if executor is None:
+            for batch in batches:
+                yield from _zip_results(batch, _compress_batch(_batch_args(batch)))
+            return
+
+        window = self.workers * 2
+        queue = deque(batches)
+        in_flight: dict = {}        # future → batch
+        order: deque = deque()      # 提交顺序（ordered 模式）
+
+        def submit_more():
+            while queue and len(in_flight) < window:
+                batch = queue.popleft()
+                fut = executor.submit(_compress_batch, _batch_args(batch))
+                in_flight[fut] = batch
+                if ordered:
+                    order.append(fut)
+
+        submit_more()
+        while in_flight:
+            if ordered:
+                fut = order.popleft()
+                results = fut.result()
+                batch = in_flight.pop(fut)
+                submit_more()
+                yield from _zip_results(batch, results)
+            else:
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    batch = in_flight.pop(fut)
+                    results = fut.result()
+                    submit_more()
+                    yield from _zip_results(batch, results)
+
+
+def _make_batches(jobs):
+    batches, cur, cur_bytes = [], [], 0
+    for job in jobs:
+        cur.append(job)
+        cur_bytes += job[2]
+        if len(cur) >= _BATCH_FILES or cur_bytes >= _BATCH_BYTES:
+            batches.append(cur)
+            cur, cur_bytes = [], 0
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def _batch_args(batch) -> list[tuple[str, str]]:
+    return [(src, codec) for _key, src, _size, codec in batch]
+
+
+def _zip_results(batch, results):
+    for (key, _src, _size, _codec), (raw_size, digest, flags, data) in zip(batch, results):
+        yield key, CompressedFile(raw_size, digest, flags, data)
@@ -0,0 +1,242 @@
+"""
+CartDark IDE · project/pack_crc.py
+按 pack.json 的 hash 段计算并回填镜像校验值。
+
+  - 镜像以 mmap 方式打开，所有 CRC 直接在映射内存的切片上计算，不额外拷贝
+  - 大区域切成若干段在线程池中并行计算（zlib.crc32 计算时释放 GIL），
+    再用 crc32_combine 合并成整体 CRC
+  - image_crc32 复用已算出的 chunk CRC，只对 chunk 之间的元数据区补算
+  - 增量构建时，从上一版镜像复制来的文件可直接给出已知的 CRC，不再重算
+
+校验范围见 pack_format.py。
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from .pack_format import (
+    read_layout, HEADER_CRC_OFFSET, IMAGE_CRC_OFFSET,
+    CHUNK_CRC_OFFSET, FILE_CRC_OFFSET,
+)
+from .schema import PackHash
+
+
+# 单个线程任务处理的最小区域
+_SPLIT_BYTES = 16 * 1024 * 1024
+
+# per_file 计算时每个线程任务的文件总字节上限
+_FILE_GROUP_BYTES = 4 * 1024 * 1024
+
+_U32 = struct.Struct("<I")
+
+
+# ──────────────────────────────────────────────
+# crc32_combine（移植自 zlib 的 x2nmodp 实现）
+# ──────────────────────────────────────────────
+
+_POLY = 0xEDB88320
+
+
+def _multmodp(a: int, b: int) -> int:
+    """GF(2) 上 a(x) * b(x) mod p(x)，位反序表示"""
+    m = 1 << 31
+    p = 0
+    while True:
+        if a & m:
+            p ^= b
+            if (a & (m - 1)) == 0:
+                break
+        m >>= 1
+        b = (b >> 1) ^ _POLY if b & 1 else b >> 1
+    return p
+
+
+def _build_x2n_table() -> list[int]:
+    table = [0] * 32
+    p = 1 << 30            # x^1
+    table[0] = p
+    for n in range(1, 32):
+        p = _multmodp(p, p)
+        table[n] = p
+    return table
+
+
+_X2N = _build_x2n_table()
+
+
+def _x2nmodp(n: int, k: int) -> int:
+    """x^(n * 2^k) mod p(x)"""
+    p = 1 << 31            # x^0
+    while n:
+        if n & 1:
+            p = _multmodp(_X2N[k & 31], p)
+        n >>= 1
+        k += 1
+    return p
+
+
+def crc32_combine(crc1: int, crc2: int, len2: int) -> int:
+    """已知 crc(A)、crc(B) 与 len(B)，求 crc(A + B)"""
+    if len2 <= 0:
+        return crc1
+    return _multmodp(_x2nmodp(len2, 3), crc1) ^ crc2
+
+
+# ──────────────────────────────────────────────
+# 区域 CRC
+# ──────────────────────────────────────────────
+
+def crc32_region(view, start: int, end: int,
+                 executor: ThreadPoolExecutor | None = None) -> int:
+    """计算 view[start:end] 的 CRC；区域较大且给出线程池时分段并行"""
+    size = end - start
+    if size <= 0:
+        return 0
+    if executor is None or size < 2 * _SPLIT_BYTES:
+        return zlib.crc32(view[start:end])
+
+    parts = []
+    pos = start
+    while pos < end:
+        nxt = min(end, pos + _SPLIT_BYTES)
+        parts.append((pos, nxt))
+        pos = nxt
+    crcs = list(executor.map(lambda r: zlib.crc32(view[r[0]:r[1]]), parts))
+    crc = crcs[0]
+    for (a, b), c in zip(parts[1:], crcs[1:]):
+        crc = crc32_combine(crc, c, b - a)
+    return crc
+
+
+def _file_groups(files, known: set[int]):
+    """把需要计算的文件分组，每组一个线程任务"""
+    group, group_bytes = [], 0
+    for i, f in enumerate(files):
+        if i in known:
+            continue
+        group.append(i)
+        group_bytes += f.stored_size
+        if group_bytes >= _FILE_GROUP_BYTES:
+            yield group
+            group, group_bytes = [], 0
+    if group:
+        yield group
+
+
+# ──────────────────────────────────────────────
+# 公开入口
+# ──────────────────────────────────────────────
+
+@dataclass
+class ChecksumResult:
+    header_crc32: int = 0
+    image_crc32: int = 0
+    chunk_crc32: list[int] = field(default_factory=list)
+    file_crc32: list[list[int]] = field(default_factory=list)
+
+
+def stamp_checksums(image_path: str, hash_cfg: PackHash,
+                    known_file_crcs: dict[tuple[int, int], int] | None = None,
+                    workers: int | None = None) -> ChecksumResult:
+    """
+    计算 hash_cfg 要求的校验值并写回镜像对应字段。
+
+    参数
+    ----
+    image_path      : 已写完的镜像
+    hash_cfg        : pack.json 的 hash 段
+    known_file_crcs : {(chunk 下标, 文件下标): crc}，这些文件跳过计算
+    workers         : 计算线程数，默认 min(8, CPU 核数)
+
+    异常
+    ----
+    OSError / PackFormatError
+    """
+    result = ChecksumResult()
+    if not (hash_cfg.header_crc32 or hash_cfg.image_crc32
+            or hash_cfg.per_chunk_crc32 or hash_cfg.per_file_crc32):
+        return result
+
+    known_file_crcs = known_file_crcs or {}
+    workers = workers or min(8, os.cpu_count() or 1)
+
+    with open(image_path, "r+b") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE) as mm, \
+            ThreadPoolExecutor(max_workers=workers) as ex:
+        layout = read_layout(mm)
+        view = memoryview(mm)
+        try:
+            if hash_cfg.per_file_crc32:
+                result.file_crc32 = _stamp_files(view, mm, layout, known_file_crcs, ex)
+
+            if hash_cfg.per_chunk_crc32:
+                for chunk in layout.chunks:
+                    crc = crc32_region(view, chunk.data_offset,
+                                       chunk.data_offset + chunk.data_size, ex)
+                    _U32.pack_into(mm, chunk.entry_pos + CHUNK_CRC_OFFSET, crc)
+                    result.chunk_crc32.append(crc)
+
+            if hash_cfg.image_crc32:
+                result.image_crc32 = _image_crc(view, layout, result.chunk_crc32, ex)
+                _U32.pack_into(mm, IMAGE_CRC_OFFSET, result.image_crc32)
+
+            if hash_cfg.header_crc32:
+                _U32.pack_into(mm, HEADER_CRC_OFFSET, 0)
+                result.header_crc32 = zlib.crc32(view[:layout.header_size])
+                _U32.pack_into(mm, HEADER_CRC_OFFSET, result.header_crc32)
+        finally:
+            view.release()
+        mm.flush()
+    return result
+
+
+def _stamp_files(view, mm, layout, known: dict, ex: ThreadPoolExecutor) -> list[list[int]]:
+    out = []
+    for ci, chunk in enumerate(layout.chunks):
+        crcs = [0] * len(chunk.files)
+        known_idx = set()
+        for fi in range(len(chunk.files)):
+            crc = known.get((ci, fi))
+            if crc is not None:
+                crcs[fi] = crc
+                known_idx.add(fi)
+
+        base = chunk.data_offset
+        files = chunk.files
+
+        def work(group):
+            return [(fi, zlib.crc32(view[base + files[fi].offset:
+                                         base + files[fi].offset + files[fi].stored_size]))
+                    for fi in group]
+
+        for pairs in ex.map(work, list(_file_groups(files, known_idx))):
+            for fi, crc in pairs:
+                crcs[fi] = crc
+
+        for fi, f in enumerate(files):
+            _U32.pack_into(mm, f.entry_pos + FILE_CRC_OFFSET, crcs[fi])
+        out.append(crcs)
+    return out
+
+
+def _image_crc(view, layout, chunk_crcs: list[int], ex: ThreadPoolExecutor) -> int:
+    """[header_size, image_size) 的 CRC；chunk 数据区有现成 CRC 时直接合并"""
+    start, end = layout.header_size, layout.image_size
+    if not chunk_crcs:
+        return crc32_region(view, start, end, ex)
+
+    crc, pos = 0, start
+    for chunk, ccrc in sorted(zip(layout.chunks, chunk_crcs), key=lambda t: t[0].data_offset):
+        if chunk.data_size == 0:
+            continue
+        gap = crc32_region(view, pos, chunk.data_offset, ex)
+        crc = crc32_combine(crc, gap, chunk.data_offset - pos)
+        crc = crc32_combine(crc, ccrc, chunk.data_size)
+        pos = chunk.data_offset + chunk.data_size
+    tail = crc32_region(view, pos, end, ex)
+    return crc32_combine(crc, tail, end - pos)
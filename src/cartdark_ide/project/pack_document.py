@@ -0,0 +1,225 @@
+"""
+CartDark IDE · project/pack_document.py
+项目级的 pack.json 内存文档。
+
+  - 每个项目一份，解析结果常驻内存；以 (st_ino, st_mtime_ns, st_size)
+    判断磁盘文件是否被外部修改（编辑器保存、git checkout 等），变化时重新解析
+  - 修改先作用于内存，标记为脏并安排一次延迟写入；延迟期内的多次修改
+    合并成一次写盘（临时文件 + os.replace）
+  - 有未写入的修改时磁盘文件被外部修改：重新读取磁盘内容，再把未写入的
+    修改依次重放，不覆盖外部编辑
+  - 附带路径引用的反向索引（见 pack_refs.py）；mutate_indexed 的修改增量
+    维护索引，普通 mutate 之后索引在下次使用时重建
+
+用法
+----
+doc = document_for(project_root)
+doc.mutate(lambda data: ...)   # 返回 True 表示确有修改
+doc.mutate_indexed(lambda data, refs: refs.rename(old, new, False))
+doc.flush()                    # 立即写盘（构建前、关闭项目时）
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+from typing import Callable
+
+from .pack_refs import PackRefIndex
+
+
+# 合并写入的延迟（秒）
+SAVE_DELAY = 0.3
+
+Mutation = Callable[[dict], bool]
+IndexedMutation = Callable[[dict, PackRefIndex], bool]
+
+
+def _stat_key(path: str) -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def dump_pack(data: dict) -> str:
+    """pack.json 的标准序列化格式"""
+    return json.dumps(data, ensure_ascii=False, indent=2) + "\n"
+
+
+class PackDocument:
+    """
+    一个 pack.json 的内存副本。线程安全：延迟写入在定时器线程执行。
+
+    异常
+    ----
+    data() / mutate() 在文件不可读或 JSON 非法时抛出 OSError / ValueError
+    """
+
+    def __init__(self, path: str, delay: float = SAVE_DELAY):
+        self.path = path
+        self.delay = delay
+        self._lock = threading.RLock()
+        self._data: dict | None = None
+        self._stat: tuple[int, int, int] | None = None
+        self._refs: PackRefIndex | None = None
+        # 上次写盘之后的修改，用于重放：(fn, 是否为 IndexedMutation)
+        self._pending: list[tuple[Callable, bool]] = []
+        self._timer: threading.Timer | None = None
+
+    # ── 读取 ──────────────────────────────────
+
+    def data(self) -> dict:
+        """当前内容。返回内部对象，调用方不得直接修改（请用 mutate）"""
+        with self._lock:
+            self._ensure_fresh()
+            return self._data
+
+    def refs(self) -> PackRefIndex:
+        """路径引用索引，与 data() 同步"""
+        with self._lock:
+            self._ensure_fresh()
+            if self._refs is None:
+                self._refs = PackRefIndex(self._data)
+            return self._refs
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending)
+
+    def reload(self) -> None:
+        """丢弃内存副本，下次访问时重新读取（未写入的修改会被重放）"""
+        with self._lock:
+            self._stat = None
+
+    # ── 修改 ──────────────────────────────────
+
+    def mutate(self, fn: Mutation) -> bool:
+        """在内存中执行修改；fn 返回 True 时安排延迟写盘"""
+        with self._lock:
+            self._ensure_fresh()
+            if not fn(self._data):
+                return False
+            self._refs = None
+            self._pending.append((fn, False))
+            self._schedule()
+            return True
+
+    def mutate_indexed(self, fn: IndexedMutation) -> bool:
+        """同 mutate，但 fn 通过索引修改并负责保持索引同步"""
+        with self._lock:
+            refs = self.refs()
+            if not fn(self._data, refs):
+                return False
+            self._pending.append((fn, True))
+            self._schedule()
+            return True
+
+    def flush(self) -> None:
+        """立即写出未保存的修改"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            self._ensure_fresh()
+            self._write(self._data)
+            self._pending.clear()
+
+    def write_now(self) -> None:
+        """无论是否有修改都按标准格式重写一次（格式化）"""
+        with self._lock:
+            self._ensure_fresh()
+            self._pending.append((lambda data: True, False))
+        self.flush()
+
+    # ── 内部 ──────────────────────────────────
+
+    def _ensure_fresh(self) -> None:
+        key = _stat_key(self.path)
+        if self._data is not None and key is not None and key == self._stat:
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # 外部修改之后重放尚未写入的修改
+        replayed = []
+        refs = None
+        for fn, indexed in self._pending:
+            if indexed:
+                refs = refs or PackRefIndex(data)
+                ok = fn(data, refs)
+            else:
+                refs = None
+                ok = fn(data)
+            if ok:
+                replayed.append((fn, indexed))
+        self._pending = replayed
+        self._data = data
+        self._refs = refs
+        self._stat = key
+
+    def _schedule(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self) -> None:
+        try:
+            self.flush()
+        except (OSError, ValueError):
+            # 写盘失败时保留修改，下次 flush 再试
+            pass
+
+    def _write(self, data: dict) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(dump_pack(data))
+        os.replace(tmp, self.path)
+        self._stat = _stat_key(self.path)
+
+
+# ──────────────────────────────────────────────
+# 项目级注册表
+# ──────────────────────────────────────────────
+
+_documents: dict[str, PackDocument] = {}
+_registry_lock = threading.Lock()
+
+
+def document_for(project_root: str) -> PackDocument | None:
+    """项目的 PackDocument；pack.json 不存在时返回 None"""
+    path = os.path.join(os.path.abspath(project_root), "pack.json")
+    if not os.path.isfile(path):
+        return None
+    with _registry_lock:
+        doc = _documents.get(path)
+        if doc is None:
+            doc = _documents[path] = PackDocument(path)
+        return doc
+
+
+def close_document(project_root: str) -> None:
+    """写出未保存的修改并释放文档（关闭项目时）"""
+    path = os.path.join(os.path.abspath(project_root), "pack.json")
+    with _registry_lock:
+        doc = _documents.pop(path, None)
+    if doc is not None:
+        doc.flush()
+
+
+def flush_all() -> None:
+    with _registry_lock:
+        docs = list(_documents.values())
+    for doc in docs:
+        try:
+            doc.flush()
+        except (OSError, ValueError):
+            pass
+
+
+atexit.register(flush_all)
@@ -0,0 +1,139 @@
+"""
+CartDark IDE · project/pack_format.py
+XHGC_PACK 镜像（*.cart.bin）的二进制布局定义与解析。
+
+镜像布局（小端序）
+----
+  [Header 64B] [ChunkTable 64B × N] [pad] [Chunk0 data] [pad] [Chunk1 data] ...
+  [Chunk0 index] [Chunk1 index] ...
+
+  Header
+    magic "XHGCPACK" | pack_version u16 | header_size u16 | flags u32
+    cart_id u64 | chunk_count u32 | alignment u32 | chunk_table_offset u64
+    image_size u64 | header_crc32 u32 | image_crc32 u32 | build_time u64
+
+  ChunkTable 条目
+    type 4s | compress u8 | flags u8 | reserved u16 | file_count u32 | crc32 u32
+    data_offset u64 | data_size u64 | index_offset u64 | index_size u64 | reserved 16B
+
+  Chunk index 条目（变长）
+    name_len u16 | flags u16 | crc32 u32 | offset u64 | stored_size u64
+    raw_size u64 | name (utf-8, name_len 字节)
+
+  - chunk 数据区起点按 build.alignment_bytes 对齐
+  - chunk 内文件按 4 字节对齐，offset 相对 chunk 数据区起点
+  - 校验值（均为 CRC-32/ISO-HDLC，即 zlib.crc32）：
+      per_file_crc32  文件存储字节
+      per_chunk_crc32 chunk 数据区 [data_offset, data_offset + data_size)
+      image_crc32     [header_size, image_size)，在文件/chunk 校验值回填之后计算
+      header_crc32    [0, header_size)，计算时 header_crc32 字段视为 0
+"""
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, field
+
+
+PACK_MAGIC = b"XHGCPACK"
+PACK_VERSION = 1
+
+HEADER = struct.Struct("<8sHHIQIIQQIIQ")
+CHUNK_ENTRY = struct.Struct("<4sBBHIIQQQQ16x")
+FILE_ENTRY = struct.Struct("<HHIQQQ")
+
+# 各结构中 crc32 字段的偏移
+HEADER_CRC_OFFSET = 48
+IMAGE_CRC_OFFSET = 52
+CHUNK_CRC_OFFSET = 12
+FILE_CRC_OFFSET = 4
+
+# Header.flags
+FLAG_DETERMINISTIC = 0x1
+
+CHUNK_FOURCC: dict[str, bytes] = {
+    "MANF": b"MANF",
+    "LUA": b"LUA\0",
+    "RES": b"RES\0",
+    "script": b"SCRP",
+}
+
+
+class PackFormatError(Exception):
+    """镜像不是合法的 XHGC_PACK"""
+
+
+@dataclass
+class FileLayout:
+    name: str
+    flags: int
+    crc32: int
+    offset: int          # 相对 chunk 数据区
+    stored_size: int
+    raw_size: int
+    entry_pos: int       # index 条目在镜像中的绝对偏移
+
+
+@dataclass
+class ChunkLayout:
+    fourcc: bytes
+    compress: int
+    crc32: int
+    data_offset: int
+    data_size: int
+    index_offset: int
+    index_size: int
+    entry_pos: int       # chunk 表条目在镜像中的绝对偏移
+    files: list[FileLayout] = field(default_factory=list)
+
+
+@dataclass
+class PackLayout:
+    header_size: int
+    flags: int
+    cart_id: int
+    alignment: int
+    image_size: int
+    header_crc32: int
+    image_crc32: int
+    chunks: list[ChunkLayout] = field(default_factory=list)
+
+
+def read_layout(buf, with_files: bool = True) -> PackLayout:
+    """
+    解析镜像布局。buf 可以是 bytes、memoryview 或 mmap，不做整体拷贝。
+
+    异常
+    ----
+    PackFormatError : magic / 版本 / 偏移不合法
+    """
+    if len(buf) < HEADER.size:
+        raise PackFormatError("镜像过短")
+    (magic, version, header_size, flags, cart_id, chunk_count, alignment,
+     table_offset, image_size, header_crc, image_crc, _build_time) = HEADER.unpack_from(buf, 0)
+    if magic != PACK_MAGIC:
+        raise PackFormatError("magic 不匹配")
+    if version != PACK_VERSION:
+        raise PackFormatError(f"不支持的 pack_version：{version}")
+    if image_size > len(buf) or table_offset + CHUNK_ENTRY.size * chunk_count > image_size:
+        raise PackFormatError("镜像被截断")
+
+    layout = PackLayout(header_size, flags, cart_id, alignment,
+                        image_size, header_crc, image_crc)
+    for i in range(chunk_count):
+        pos = table_offset + CHUNK_ENTRY.size * i
+        (fourcc, compress, _flags, _res, file_count, crc, data_offset, data_size,
+         index_offset, index_size) = CHUNK_ENTRY.unpack_from(buf, pos)
+        if data_offset + data_size > image_size or index_offset + index_size > image_size:
+            raise PackFormatError(f"chunk {i} 越界")
+        chunk = ChunkLayout(fourcc, compress, crc, data_offset, data_size,
+                            index_offset, index_size, pos)
+        if with_files:
+            p = index_offset
+            for _ in range(file_count):
+                name_len, fflags, fcrc, offset, stored, raw = FILE_ENTRY.unpack_from(buf, p)
+                name_start = p + FILE_ENTRY.size
+                name = bytes(buf[name_start:name_start + name_len]).decode("utf-8")
+                chunk.files.append(FileLayout(name, fflags, fcrc, offset, stored, raw, p))
+                p = name_start + name_len
+        layout.chunks.append(chunk)
+    return layout
@@ -0,0 +1,130 @@
+"""
+CartDark IDE · project/pack_lock.py
+增量构建使用的锁文件（<name>.pack.lock.json）。
+
+记录上一次构建时每个输入文件的 size / mtime / 内容哈希，以及它在镜像中
+所在的 chunk 和 chunk 内偏移。再次构建时：
+  - size 与 mtime 均未变化的文件视为未修改，不再读取
+  - 未修改文件的存储字节直接从上一版镜像按偏移拷贝
+  - 整个 chunk 未变化时，chunk 数据区整体按字节拷贝
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field, asdict
+
+
+LOCK_FORMAT = "XHGC_PACK_LOCK"
+LOCK_VERSION = 1
+
+
+def new_content_hash():
+    """文件内容哈希器；构建时边拷贝边更新，不额外读一遍文件"""
+    return hashlib.blake2b(digest_size=16)
+
+
+def content_hash(data: bytes) -> str:
+    h = new_content_hash()
+    h.update(data)
+    return h.hexdigest()
+
+
+@dataclass
+class LockedFile:
+    name: str                 # 包内名称
+    rel: str = ""             # 相对项目根的源路径；内联数据为空
+    size: int = 0             # 源文件大小
+    mtime_ns: int = 0
+    hash: str = ""            # 源内容哈希
+    chunk: int = 0            # 所在 chunk 下标
+    offset: int = 0           # chunk 数据区内偏移
+    stored_size: int = 0
+    raw_size: int = 0
+    flags: int = 0
+    compress: str = "none"
+    crc32: int = 0            # 存储字节的 CRC（has_crc 为 True 时有效）
+    has_crc: bool = False
+
+
+@dataclass
+class LockedChunk:
+    type: str
+    compress: str = "none"
+    data_offset: int = 0
+    data_size: int = 0
+    files: list[str] = field(default_factory=list)   # 包内名称，按写入顺序
+
+
+@dataclass
+class PackLock:
+    config_hash: str = ""     # pack.json 配置哈希，变化时不做整体跳过
+    image_size: int = 0
+    image_mtime_ns: int = 0
+    chunks: list[LockedChunk] = field(default_factory=list)
+    files: dict[str, LockedFile] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "format": LOCK_FORMAT,
+            "version": LOCK_VERSION,
+            "config_hash": self.config_hash,
+            "image": {"size": self.image_size, "mtime_ns": self.image_mtime_ns},
+            "chunks": [asdict(c) for c in self.chunks],
+            "files": [asdict(f) for f in self.files.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PackLock":
+        image = data.get("image", {})
+        files = [LockedFile(**f) for f in data.get("files", [])]
+        return cls(
+            config_hash=data.get("config_hash", ""),
+            image_size=image.get("size", 0),
+            image_mtime_ns=image.get("mtime_ns", 0),
+            chunks=[LockedChunk(**c) for c in data.get("chunks", [])],
+            files={f.name: f for f in files},
+        )
+
+    def matches_image(self, image_path: str) -> bool:
+        """上一版镜像仍是本锁文件描述的那一份（未被删除或替换）"""
+        try:
+            st = os.stat(image_path)
+        except OSError:
+            return False
+        return st.st_size == self.image_size and st.st_mtime_ns == self.image_mtime_ns
+
+
+def lock_path_for(output_path: str) -> str:
+    """build/demo.cart.bin → build/demo.pack.lock.json"""
+    base = output_path
+    if base.endswith(".cart.bin"):
+        base = base[:-len(".cart.bin")]
+    return base + ".pack.lock.json"
+
+
+def config_hash(pack_dict: dict) -> str:
+    text = json.dumps(pack_dict, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return content_hash(text.encode("utf-8"))
+
+
+def load_lock(lock_path: str) -> PackLock | None:
+    """读取锁文件；不存在、损坏或版本不符时返回 None（退化为全量构建）"""
+    try:
+        with open(lock_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != LOCK_FORMAT or data.get("version") != LOCK_VERSION:
+            return None
+        return PackLock.from_dict(data)
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def save_lock(lock_path: str, lock: PackLock) -> None:
+    """原子写入锁文件"""
+    tmp = lock_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(lock.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    os.replace(tmp, lock_path)
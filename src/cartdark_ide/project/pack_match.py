@@ -0,0 +1,267 @@
+"""
+CartDark IDE · project/pack_match.py
+pack.json chunk 的 glob / exclude 匹配与项目单次遍历分类。
+
+  - 每个 chunk 的 glob 与全部 exclude 编译成一条正则：
+        (?!(?:exclude1|exclude2|...)\\Z)glob\\Z
+    一次 match 即可判断「被该 chunk 收录」
+  - chunk 按 glob 的静态目录前缀（如 res/、script/）分派；遍历时每个目录
+    只计算一次「哪些 chunk 可能命中」，目录下的文件只测试这些 chunk，
+    与任何 chunk 无关的目录整棵跳过
+  - scan_project() 用一次 os.scandir 遍历为所有 chunk 分类，
+    校验、构建、「是否被打包」查询共用同一结果
+
+glob 语义与 glob.glob(recursive=True) 一致：* ? [...] [!...] 不跨目录，
+** 匹配任意层目录，通配符不匹配以 . 开头的名称。
+"""
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+
+from .schema import PackChunk
+
+
+# ──────────────────────────────────────────────
+# glob → 正则
+# ──────────────────────────────────────────────
+
+def _translate_class(seg: str, i: int) -> tuple[str | None, int]:
+    """
+    seg[i] 为 [：与 fnmatch.translate 相同地翻译 [...] / [!...]，
+    返回 (正则字符类, 之后的位置)；没有闭合的 ] 时返回 (None, i + 1)。
+    """
+    j = i + 1
+    if j < len(seg) and seg[j] == "!":
+        j += 1
+    if j < len(seg) and seg[j] == "]":
+        j += 1
+    j = seg.find("]", j)
+    if j == -1:
+        return None, i + 1
+    stuff = seg[i + 1:j].replace("\\", "\\\\")
+    # 避免 re 把 && ~~ || 当作集合运算
+    stuff = re.sub(r"([&~|])", r"\\\1", stuff)
+    if stuff[:1] == "!":
+        # 取反的字符类同样不跨目录
+        stuff = "^/" + stuff[1:]
+    elif stuff[:1] in ("^", "["):
+        stuff = "\\" + stuff
+    return f"[{stuff}]", j + 1
+
+
+def _translate_segment(seg: str) -> str:
+    out = []
+    i = 0
+    while i < len(seg):
+        ch = seg[i]
+        if ch == "*":
+            out.append("[^/]*")
+        elif ch == "?":
+            out.append("[^/]")
+        elif ch == "[":
+            cls, i = _translate_class(seg, i)
+            out.append(cls if cls is not None else re.escape(ch))
+            continue
+        else:
+            out.append(re.escape(ch))
+        i += 1
+    # 与 glob.glob 一致：通配符不匹配以 . 开头的名称
+    if seg[:1] in ("*", "?", "["):
+        out.insert(0, r"(?!\.)")
+    return "".join(out)
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    把 pack.json 的 glob 转成正则（相对项目根，/ 分隔，不含锚点）。
+    支持 *、?、[...]、[!...]、**；** 匹配零个或多个目录层级。
+    """
+    segs = [s for s in pattern.strip("/").split("/") if s]
+    parts = []
+    for i, seg in enumerate(segs):
+        last = i == len(segs) - 1
+        if seg == "**":
+            if last:
+                parts.append(r"(?!\.)[^/]*(?:/(?!\.)[^/]*)*")
+            else:
+                parts.append(r"(?:(?!\.)[^/]*/)*")
+        else:
+            parts.append(_translate_segment(seg) + ("" if last else "/"))
+    return "".join(parts)
+
+
+def compile_glob(pattern: str) -> re.Pattern:
+    return re.compile(glob_to_regex(pattern) + r"\Z")
+
+
+def _compile_chunk(include: str | None, excludes: list[str]) -> re.Pattern:
+    """include 与 exclude 合成一条正则；include 为 None 时匹配任意路径"""
+    inc = glob_to_regex(include) if include is not None else ".*"
+    if excludes:
+        exc = "|".join(f"(?:{glob_to_regex(p)})" for p in excludes)
+        return re.compile(rf"(?!(?:{exc})\Z)(?:{inc})\Z")
+    return re.compile(rf"(?:{inc})\Z")
+
+
+def static_prefix(pattern: str) -> str:
+    """glob 中不含通配符的前导目录部分（不含结尾 /），用于限定遍历范围"""
+    segs = [s for s in pattern.strip("/").split("/") if s]
+    static = []
+    for seg in segs[:-1]:
+        if any(c in seg for c in "*?["):
+            break
+        static.append(seg)
+    return "/".join(static)
+
+
+def _covers(prefix: str, dir_rel: str) -> bool:
+    """dir_rel 目录下的文件是否可能落在 prefix 前缀范围内"""
+    if not prefix or not dir_rel:
+        return True
+    return (dir_rel == prefix or dir_rel.startswith(prefix + "/")
+            or prefix.startswith(dir_rel + "/"))
+
+
+# ──────────────────────────────────────────────
+# 匹配器
+# ──────────────────────────────────────────────
+
+@dataclass
+class _Rule:
+    index: int
+    regex: re.Pattern
+    prefixes: tuple[str, ...]     # 静态前缀；script chunk 为各 res 条目
+
+
+class PackMatcher:
+    """
+    所有 chunk 的编译结果。
+
+    用法
+    ----
+    m = PackMatcher(pack.chunks)
+    m.classify("res/img/a.png")   # → (3,)
+    """
+
+    def __init__(self, chunks: list[PackChunk]):
+        self._rules: list[_Rule] = []
+        self._script_res: dict[int, frozenset[str]] = {}
+        for i, chunk in enumerate(chunks):
+            if chunk.type == "script":
+                res = frozenset(r.strip("/") for r in chunk.res if r.strip("/"))
+                self._script_res[i] = res
+                self._rules.append(_Rule(i, _compile_chunk(None, chunk.exclude), tuple(res)))
+            elif chunk.type != "MANF" and chunk.glob:
+                self._rules.append(_Rule(
+                    i, _compile_chunk(chunk.glob, chunk.exclude),
+                    (static_prefix(chunk.glob),)))
+        self._active_cache: dict[str, tuple[_Rule, ...]] = {}
+
+    # ── 查询 ──────────────────────────────────
+
+    def classify(self, rel: str) -> tuple[int, ...]:
+        """rel（相对项目根，/ 分隔）被哪些 chunk 收录，按 chunk 顺序返回"""
+        rel = rel.strip("/")
+        dir_rel = rel.rpartition("/")[0]
+        return tuple(r.index for r in self._active(dir_rel) if self._hit(r, rel))
+
+    def is_packed(self, rel: str) -> bool:
+        return bool(self.classify(rel))
+
+    def wants_dir(self, dir_rel: str) -> bool:
+        """遍历时是否需要进入 dir_rel"""
+        return bool(self._active(dir_rel))
+
+    # ── 内部 ──────────────────────────────────
+
+    def _active(self, dir_rel: str) -> tuple[_Rule, ...]:
+        """dir_rel 下的文件可能命中的规则（每个目录只算一次）"""
+        cached = self._active_cache.get(dir_rel)
+        if cached is None:
+            cached = tuple(r for r in self._rules
+                           if any(_covers(p, dir_rel) for p in r.prefixes))
+            self._active_cache[dir_rel] = cached
+        return cached
+
+    def _hit(self, rule: _Rule, rel: str) -> bool:
+        res = self._script_res.get(rule.index)
+        if res is not None and not _under_any(rel, res):
+            return False
+        return rule.regex.match(rel) is not None
+
+
+def _under_any(rel: str, roots: frozenset[str]) -> bool:
+    """rel 本身或其某级父目录在 roots 中"""
+    if rel in roots:
+        return True
+    pos = rel.find("/")
+    while pos != -1:
+        if rel[:pos] in roots:
+            return True
+        pos = rel.find("/", pos + 1)
+    return False
+
+
+# ──────────────────────────────────────────────
+# 单次遍历
+# ──────────────────────────────────────────────
+
+@dataclass
+class ScannedFile:
+    rel: str
+    path: str
+    size: int
+    mtime_ns: int
+
+
+@dataclass
+class PackScan:
+    """一次遍历的分类结果"""
+    chunk_files: list[list[ScannedFile]] = field(default_factory=list)
+    membership: dict[str, tuple[int, ...]] = field(default_factory=dict)
+
+    def chunks_of(self, rel: str) -> tuple[int, ...]:
+        return self.membership.get(rel.strip("/"), ())
+
+    def is_packed(self, rel: str) -> bool:
+        return bool(self.chunks_of(rel))
+
+
+def scan_project(project_root: str, chunks: list[PackChunk],
+                 matcher: PackMatcher | None = None) -> PackScan:
+    """
+    用一次 os.scandir 遍历为所有 chunk 分类文件。
+    与任何 chunk 无关的目录不会被进入。
+    """
+    matcher = matcher or PackMatcher(chunks)
+    result = PackScan(chunk_files=[[] for _ in chunks])
+    stack = [(os.path.abspath(project_root), "")]
+    while stack:
+        abs_dir, rel_dir = stack.pop()
+        try:
+            it = os.scandir(abs_dir)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if matcher.wants_dir(rel):
+                            stack.append((entry.path, rel))
+                        continue
+                    if not entry.is_file():
+                        continue
+                    hits = matcher.classify(rel)
+                    if not hits:
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                f = ScannedFile(rel, entry.path, st.st_size, st.st_mtime_ns)
+                result.membership[rel] = hits
+                for i in hits:
+                    result.chunk_files[i].append(f)
+    return result
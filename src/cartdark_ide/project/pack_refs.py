@@ -0,0 +1,272 @@
+"""
+CartDark IDE · project/pack_refs.py
+pack.json 中路径引用的反向索引。
+
+pack.json 里引用项目路径的字段：
+  - icon.path、meta.entry                     精确路径
+  - script chunk 的 res 条目                  精确路径（文件或目录）
+  - chunk 的 glob / strip_prefix               路径前缀
+
+chunk 的 name_prefix 是包内名称而不是项目路径，不在索引中，重命名目录时不改动。
+
+索引按路径分段组织成前缀树，每个节点挂着引用该路径的字段。
+重命名 / 删除 old 时只需取 old 节点的子树，不再遍历所有 chunk 的 res 列表；
+script res 的成员判断由集合完成。
+
+索引与 PackDocument 的内存副本同步：通过本模块修改时增量更新，
+其他修改之后由 PackDocument 整体重建。
+"""
+from __future__ import annotations
+
+
+# 引用类别
+REF_ICON = "icon"
+REF_ENTRY = "entry"
+REF_RES = "res"
+REF_PREFIX = "prefix"
+
+# 引用项目路径的前缀字段（name_prefix 是包内名称，不在此列）
+_PREFIX_FIELDS = ("glob", "strip_prefix")
+_WILDCARDS = "*?["
+
+
+class PackRef:
+    """
+    一个路径引用。owner 是持有该字段的 dict（icon / meta / chunk），
+    按对象身份哈希，chunk 的插入、重排不影响已有引用。
+    """
+    __slots__ = ("kind", "owner", "field", "value")
+
+    def __init__(self, kind: str, owner: dict, field: str, value: str):
+        self.kind = kind
+        self.owner = owner
+        self.field = field
+        self.value = value
+
+
+class _Node:
+    __slots__ = ("children", "refs")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.refs: set[PackRef] = set()
+
+
+def _exact_key(value: str) -> list[str]:
+    return [s for s in value.strip("/").split("/") if s]
+
+
+def _prefix_key(value: str) -> list[str]:
+    """
+    前缀字段在树中的位置：其中不含通配符的完整目录段。
+    "res/**/*" → [res]；"res/" → [res]；"res/img/a" → [res, img]
+    """
+    segs = value.split("/")
+    dirs = segs[:-1]
+    key = []
+    for seg in dirs:
+        if any(c in seg for c in _WILDCARDS):
+            break
+        if seg:
+            key.append(seg)
+    return key
+
+
+def _replace_prefix(value: str, old_prefix: str, new_prefix: str) -> str:
+    return new_prefix + value[len(old_prefix):]
+
+
+class PackRefIndex:
+    """
+    用法
+    ----
+    idx = PackRefIndex(data)
+    idx.rename("res/img", "res/image", is_dir=True)
+    """
+
+    def __init__(self, data: dict):
+        self._root = _Node()
+        self._res_sets: dict[int, set[str]] = {}     # id(chunk) → res 集合
+        self._build(data)
+
+    # ── 构建 ──────────────────────────────────
+
+    def _build(self, data: dict) -> None:
+        icon = data.get("icon")
+        if isinstance(icon, dict) and icon.get("path"):
+            self._add(PackRef(REF_ICON, icon, "path", icon["path"]))
+        meta = data.get("meta")
+        if isinstance(meta, dict) and meta.get("entry"):
+            self._add(PackRef(REF_ENTRY, meta, "entry", meta["entry"]))
+        for chunk in data.get("chunks", []):
+            self._index_chunk(chunk)
+
+    def _index_chunk(self, chunk: dict) -> None:
+        for f in _PREFIX_FIELDS:
+            val = chunk.get(f)
+            if val:
+                self._add(PackRef(REF_PREFIX, chunk, f, val))
+        if chunk.get("type") == "script":
+            res = self._res_sets.setdefault(id(chunk), set())
+            for r in chunk.get("res", []):
+                res.add(r)
+                self._add(PackRef(REF_RES, chunk, "res", r))
+
+    def _key(self, ref: PackRef) -> list[str]:
+        return _prefix_key(ref.value) if ref.kind == REF_PREFIX else _exact_key(ref.value)
+
+    def _add(self, ref: PackRef) -> None:
+        node = self._root
+        for seg in self._key(ref):
+            node = node.children.setdefault(seg, _Node())
+        node.refs.add(ref)
+
+    def _discard(self, ref: PackRef) -> None:
+        node = self._root
+        path = []
+        for seg in self._key(ref):
+            nxt = node.children.get(seg)
+            if nxt is None:
+                return
+            path.append((node, seg))
+            node = nxt
+        node.refs.discard(ref)
+        # 清理空节点
+        for parent, seg in reversed(path):
+            child = parent.children[seg]
+            if child.refs or child.children:
+                break
+            del parent.children[seg]
+
+    # ── 查询 ──────────────────────────────────
+
+    def refs_under(self, rel: str) -> list[PackRef]:
+        """引用 rel 本身或其下任意路径的字段"""
+        node = self._root
+        for seg in _exact_key(rel):
+            node = node.children.get(seg)
+            if node is None:
+                return []
+        out = []
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            out.extend(n.refs)
+            stack.extend(n.children.values())
+        return out
+
+    def has_script_res(self, chunk: dict, rel: str) -> bool:
+        return rel in self._res_sets.get(id(chunk), ())
+
+    def is_referenced(self, rel: str) -> bool:
+        return any(r.kind != REF_PREFIX and r.value == rel for r in self.refs_under(rel))
+
+    # ── 修改（同时更新 data 与索引）─────────────
+
+    def rename(self, old_rel: str, new_rel: str, is_dir: bool) -> bool:
+        """
+        old_rel 重命名为 new_rel：
+          - icon.path / meta.entry 精确匹配时替换
+          - script res 精确匹配或位于 old_rel/ 之下时替换
+          - is_dir 时，以 old_rel/ 开头的 glob / strip_prefix 替换前缀；
+            name_prefix 不变，包内名称保持原样
+        """
+        return self.rename_many([(old_rel, new_rel, is_dir)])
+
+    def rename_many(self, moves: list[tuple[str, str, bool]]) -> bool:
+        # id(chunk) → (chunk, {批次开始时的 res 值: 引用})
+        touched: dict[int, tuple[dict, dict[str, PackRef]]] = {}
+        seen: set[PackRef] = set()
+        changed = False
+        for old_rel, new_rel, is_dir in moves:
+            old_prefix = old_rel.rstrip("/") + "/"
+            new_prefix = new_rel.rstrip("/") + "/"
+            for ref in self.refs_under(old_rel):
+                if ref.kind in (REF_ICON, REF_ENTRY):
+                    if ref.value != old_rel:
+                        continue
+                    new_val = new_rel
+                elif ref.kind == REF_RES:
+                    if ref.value == old_rel:
+                        new_val = new_rel
+                    elif ref.value.startswith(old_prefix):
+                        new_val = _replace_prefix(ref.value, old_prefix, new_prefix)
+                    else:
+                        continue
+                else:
+                    if not is_dir or not ref.value.startswith(old_prefix):
+                        continue
+                    new_val = _replace_prefix(ref.value, old_prefix, new_prefix)
+
+                self._discard(ref)
+                if ref.kind == REF_RES:
+                    res = self._res_sets[id(ref.owner)]
+                    res.discard(ref.value)
+                    res.add(new_val)
+                    if ref not in seen:
+                        seen.add(ref)
+                        touched.setdefault(id(ref.owner), (ref.owner, {}))[1][ref.value] = ref
+                else:
+                    ref.owner[ref.field] = new_val
+                ref.value = new_val
+                self._add(ref)
+                changed = True
+
+        # 每个 script chunk 的 res 列表只重写一次
+        for chunk, refs in touched.values():
+            chunk["res"] = [refs[r].value if r in refs else r for r in chunk.get("res", [])]
+        return changed
+
+    def delete(self, rel: str, under_res: bool) -> bool:
+        """rel 被删除：清空 icon.path / meta.entry（under_res 时），移除 script res"""
+        return self.delete_many([(rel, under_res)])
+
+    def delete_many(self, paths: list[tuple[str, bool]]) -> bool:
+        removed: dict[int, tuple[dict, set[str]]] = {}
+        changed = False
+        for rel, under_res in paths:
+            prefix = rel.rstrip("/") + "/"
+            for ref in self.refs_under(rel):
+                if ref.kind in (REF_ICON, REF_ENTRY):
+                    if not under_res or ref.value != rel:
+                        continue
+                    ref.owner[ref.field] = ""
+                elif ref.kind == REF_RES:
+                    if ref.value != rel and not ref.value.startswith(prefix):
+                        continue
+                    self._res_sets[id(ref.owner)].discard(ref.value)
+                    removed.setdefault(id(ref.owner), (ref.owner, set()))[1].add(ref.value)
+                else:
+                    continue
+                self._discard(ref)
+                changed = True
+
+        for chunk, gone in removed.values():
+            chunk["res"] = [r for r in chunk.get("res", []) if r not in gone]
+        return changed
+
+    def add_script_res(self, chunk: dict, rel: str) -> bool:
+        res = self._res_sets.setdefault(id(chunk), set())
+        if rel in res:
+            return False
+        res.add(rel)
+        chunk.setdefault("res", []).append(rel)
+        self._add(PackRef(REF_RES, chunk, "res", rel))
+        return True
+
+    def remove_script_res(self, rel: str) -> bool:
+        """从所有 script chunk 的 res 中移除 rel（仅精确匹配）"""
+        changed = False
+        for ref in self.refs_under(rel):
+            if ref.kind != REF_RES or ref.value != rel:
+                continue
+            self._res_sets[id(ref.owner)].discard(rel)
+            ref.owner["res"] = [r for r in ref.owner.get("res", []) if r != rel]
+            self._discard(ref)
+            changed = True
+        return changed
+
+    def add_chunk(self, chunk: dict) -> None:
+        """新插入的 chunk 加入索引"""
+        self._index_chunk(chunk)
+
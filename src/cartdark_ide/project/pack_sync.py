@@ -1,40 +1,34 @@
 """
 CartDark IDE · project/pack_sync.py
-对 res/ 目录下文件的增删改，同步更新 pack.json 中对应的 chunk glob/path。
+项目文件的增删改、重命名 / 移动后，同步更新 pack.json 中引用项目路径的字段。
 
-策略（第一版）：
+策略：
   - pack.json 中 chunks 里每个带 glob 的条目，glob 形如 "res/**/*"
-  - 删除/重命名/移动 res/ 下的文件或目录时，只更新 icon.path（如果匹配）
+  - 删除/重命名/移动文件或目录时，更新 icon.path、meta.entry 与 script res；
+    重命名 / 移动目录时还更新以其为前缀的 glob / strip_prefix
+  - name_prefix 是包内名称，不随项目目录改名
   - glob 是通配符，不需要逐文件维护；但 meta.entry 和 icon.path 是具体路径，需要更新
   - 对于精确 path 引用（icon.path、meta.entry），执行 rename/delete 时同步修改
+
+pack.json 的读写经由项目级的 PackDocument（见 pack_document.py）：
+修改先作用于内存，短时间内的多次修改合并成一次写盘。
+重命名 / 删除通过文档附带的路径引用索引（见 pack_refs.py）定位受影响的字段。
 """
 from __future__ import annotations
 
-import json
 import os
 import re
 
+from .io import pack_from_dict
+from .pack_document import document_for
+from .pack_match import PackMatcher, scan_project
+from .pack_refs import PackRefIndex
+
 
 class PackSyncError(Exception):
     pass
 
 
-def _find_pack_json(project_root: str) -> str | None:
-    p = os.path.join(project_root, "pack.json")
-    return p if os.path.isfile(p) else None
-
-
-def _load(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def _save(path: str, data: dict) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-        f.write("\n")
-
-
 def _rel(project_root: str, abs_path: str) -> str:
     """abs_path 转相对于 project_root 的路径，使用 / 分隔符"""
     return os.path.relpath(abs_path, project_root).replace(os.sep, "/")
@@ -49,65 +43,27 @@ def _is_under_res(project_root: str, abs_path: str) -> bool:
 
 def on_file_renamed(project_root: str, old_abs: str, new_abs: str) -> bool:
     """
-    文件/目录重命名或移动后调用。
-    只处理 res/ 下的路径。返回是否修改了 pack.json。
+    文件/目录重命名或移动后调用。返回是否修改了 pack.json。
     """
-    pack_path = _find_pack_json(project_root)
-    if not pack_path:
-        return False
-    if not _is_under_res(project_root, old_abs):
-        return False
-
-    data = _load(pack_path)
-    changed = False
-
-    old_rel = _rel(project_root, old_abs)
-    new_rel = _rel(project_root, new_abs)
-
-    # icon.path
-    icon = data.get("icon", {})
-    if icon.get("path") == old_rel:
-        icon["path"] = new_rel
-        changed = True
-
-    # meta.entry
-    meta = data.get("meta", {})
-    if meta.get("entry") == old_rel:
-        meta["entry"] = new_rel
-        changed = True
+    return on_files_renamed(project_root, [(old_abs, new_abs)])
 
-    # 目录重命名：更新所有以 old_rel/ 开头的 chunk strip_prefix / name_prefix / glob
-    old_prefix = old_rel.rstrip("/") + "/"
-    new_prefix = new_rel.rstrip("/") + "/"
-    is_dir = os.path.isdir(new_abs)  # 重命名后检查
 
-    if is_dir:
-        for chunk in data.get("chunks", []):
-            for field in ("glob", "strip_prefix", "name_prefix"):
-                val = chunk.get(field, "")
-                if val.startswith(old_prefix):
-                    chunk[field] = new_prefix + val[len(old_prefix):]
-                    changed = True
+def on_files_renamed(project_root: str, moves: list[tuple[str, str]]) -> bool:
+    """
+    一批文件/目录重命名或移动后调用（多选移动、批量重命名）。
+    所有改动在一次修改中完成，只写一次 pack.json。返回是否修改了 pack.json。
 
-    # script chunk：更新 res 列表里的精确路径（文件或目录前缀）
-    for chunk in data.get("chunks", []):
-        if chunk.get("type") == "script":
-            res_list = chunk.get("res", [])
-            new_res = []
-            for r in res_list:
-                if r == old_rel:
-                    new_res.append(new_rel)
-                    changed = True
-                elif r.startswith(old_prefix):
-                    new_res.append(new_prefix + r[len(old_prefix):])
-                    changed = True
-                else:
-                    new_res.append(r)
-            chunk["res"] = new_res
+    更新 icon.path、meta.entry、script res，
+    目录时还有以其为前缀的 glob / strip_prefix（name_prefix 不变）。
+    """
+    doc = document_for(project_root)
+    if doc is None or not moves:
+        return False
 
-    if changed:
-        _save(pack_path, data)
-    return changed
+    batch = [(_rel(project_root, old), _rel(project_root, new),
+              os.path.isdir(new))             # 重命名后检查
+             for old, new in moves]
+    return doc.mutate_indexed(lambda data, refs: refs.rename_many(batch))
 
 
 def on_file_deleted(project_root: str, abs_path: str) -> bool:
@@ -116,61 +72,37 @@ def on_file_deleted(project_root: str, abs_path: str) -> bool:
     处理 res/ 下的路径（icon/entry）以及所有目录的 script chunk。
     返回是否修改了 pack.json。
     """
-    pack_path = _find_pack_json(project_root)
-    if not pack_path:
-        return False
+    return on_files_deleted(project_root, [abs_path])
 
-    data = _load(pack_path)
-    changed = False
-    rel = _rel(project_root, abs_path)
 
-    # ── res/ 下：更新 icon.path / meta.entry ──
-    if _is_under_res(project_root, abs_path):
-        icon = data.get("icon", {})
-        if icon.get("path") == rel:
-            icon["path"] = ""
-            changed = True
+def on_files_deleted(project_root: str, paths: list[str]) -> bool:
+    """一批文件/目录删除后调用，只写一次 pack.json。规则同 on_file_deleted"""
+    doc = document_for(project_root)
+    if doc is None or not paths:
+        return False
 
-        meta = data.get("meta", {})
-        if meta.get("entry") == rel:
-            meta["entry"] = ""
-            changed = True
+    batch = [(_rel(project_root, p), _is_under_res(project_root, p)) for p in paths]
+    return doc.mutate_indexed(lambda data, refs: refs.delete_many(batch))
 
-    # ── 所有目录：从 script chunk res 列表移除 ──
-    for chunk in data.get("chunks", []):
-        if chunk.get("type") == "script":
-            res_list = chunk.get("res", [])
-            if rel in res_list:
-                res_list.remove(rel)
-                changed = True
-            # 目录删除：移除所有以该路径开头的条目
-            prefix = rel.rstrip("/") + "/"
-            before = len(res_list)
-            chunk["res"] = [r for r in res_list if not r.startswith(prefix)]
-            if len(chunk["res"]) != before:
-                changed = True
-
-    if changed:
-        _save(pack_path, data)
-    return changed
-
-
-def validate(project_root: str) -> list[str]:
+
+def validate(project_root: str, index=None) -> list[str]:
     """
     校验 pack.json：
     - icon.path 文件是否存在
     - meta.entry 文件是否存在（在 res/ 下才检查）
-    - chunks 中 glob 是否能匹配到至少一个文件
+    - chunks 中 glob（扣除 exclude 后）是否能匹配到至少一个文件
+    - script chunk 的 res 条目是否存在
+    index 为项目的 WorkspaceIndex：glob 的命中取自其文件清单与 chunk 归属，
+    不遍历磁盘；未给出或尚未就绪时退回一次项目遍历（见 pack_match.py）。
     返回问题列表（空列表表示无问题）。
     """
-    import glob as glob_mod
-
-    pack_path = _find_pack_json(project_root)
-    if not pack_path:
+    doc = document_for(project_root)
+    if doc is None:
         return ["pack.json 不存在"]
 
     try:
-        data = _load(pack_path)
+        data = doc.data()
+        pack = pack_from_dict(data)
     except Exception as e:
         return [f"pack.json 解析失败：{e}"]
 
@@ -190,26 +122,59 @@ def validate(project_root: str) -> list[str]:
         if not os.path.isfile(full):
             issues.append(f"meta.entry 文件不存在：{entry}")
 
-    # chunks glob
-    for i, chunk in enumerate(data.get("chunks", [])):
-        g = chunk.get("glob", "")
-        if g:
-            pattern = os.path.join(project_root, g.replace("/", os.sep))
-            matches = glob_mod.glob(pattern, recursive=True)
-            if not matches:
-                issues.append(f"chunks[{i}] glob 未匹配到任何文件：{g}")
+    # chunks
+    matched = _matched_chunks(project_root, pack.chunks, index, doc.dirty)
+    for i, chunk in enumerate(pack.chunks):
+        if chunk.type == "script":
+            for r in chunk.res:
+                full = os.path.join(project_root, r.strip("/").replace("/", os.sep))
+                if not os.path.exists(full):
+                    issues.append(f"chunks[{i}] script res 不存在：{r}")
+        elif chunk.type != "MANF" and chunk.glob and i not in matched:
+            issues.append(f"chunks[{i}] glob 未匹配到任何文件：{chunk.glob}")
 
     return issues
 
 
+def _matched_chunks(project_root: str, chunks, index, pack_dirty: bool) -> set[int]:
+    """至少收录了一个文件的 chunk 下标"""
+    if index is None or not index.is_ready:
+        scan = scan_project(project_root, chunks)
+        return {i for i, files in enumerate(scan.chunk_files) if files}
+    matched: set[int] = set()
+    if index.chunks_current() and not pack_dirty:
+        for f in index.files():
+            matched.update(index.chunks_of(f.rel))
+    else:
+        # pack.json 在索引分类之后改过（含尚未写盘的修改）：按当前内容重新分类
+        matcher = PackMatcher(chunks)
+        for f in index.files():
+            matched.update(matcher.classify(f.rel))
+    return matched
+
+
+def chunks_containing(project_root: str, abs_path: str) -> tuple[int, ...]:
+    """
+    abs_path 会被打进哪些 chunk（按 pack.json 中的下标），已考虑 exclude。
+    不遍历磁盘，只做路径匹配；pack.json 不存在或无法解析时返回空元组。
+    """
+    doc = document_for(project_root)
+    if doc is None:
+        return ()
+    try:
+        pack = pack_from_dict(doc.data())
+    except Exception:
+        return ()
+    return PackMatcher(pack.chunks).classify(_rel(project_root, abs_path))
+
+
 def format_json(project_root: str) -> bool:
     """格式化 pack.json，返回是否成功"""
-    pack_path = _find_pack_json(project_root)
-    if not pack_path:
+    doc = document_for(project_root)
+    if doc is None:
         return False
     try:
-        data = _load(pack_path)
-        _save(pack_path, data)
+        doc.write_now()
         return True
     except Exception:
         return False
@@ -221,16 +186,15 @@ def regenerate_from_res(project_root: str) -> bool:
     只替换 type==RES 且 glob 以 res/ 开头的 chunk。
     返回是否成功。
     """
-    pack_path = _find_pack_json(project_root)
-    if not pack_path:
+    doc = document_for(project_root)
+    if doc is None:
         return False
 
     res_dir = os.path.join(project_root, "res")
     if not os.path.isdir(res_dir):
         return False
 
-    try:
-        data = _load(pack_path)
+    def apply(data: dict) -> bool:
         # 找到并替换 res chunk
         for chunk in data.get("chunks", []):
             if chunk.get("type") == "RES" and chunk.get("glob", "").startswith("res/"):
@@ -238,7 +202,11 @@ def regenerate_from_res(project_root: str) -> bool:
                 chunk["strip_prefix"] = "res/"
                 chunk["name_prefix"] = "res/"
                 chunk["exclude"] = ["**/.DS_Store", "**/*.psd"]
-        _save(pack_path, data)
+        return True
+
+    try:
+        doc.mutate(apply)
+        doc.flush()
         return True
     except Exception:
         return False
@@ -250,17 +218,19 @@ def add_script_to_pack(project_root: str, abs_path: str) -> bool:
     如果不存在该 chunk，自动创建一个。
     返回是否成功。
     """
-    pack_path = _find_pack_json(project_root)
-    if not pack_path:
+    doc = document_for(project_root)
+    if doc is None:
         return False
 
     rel = _rel(project_root, abs_path)
-
     try:
-        data = _load(pack_path)
+        doc.mutate_indexed(lambda data, refs: _apply_add_script(data, refs, rel))
+        return True
     except Exception:
         return False
 
+
+def _apply_add_script(data: dict, refs: PackRefIndex, rel: str) -> bool:
     # 找 type == "script" 的 chunk
     script_chunk = None
     for chunk in data.get("chunks", []):
@@ -285,38 +255,41 @@ def add_script_to_pack(project_root: str, abs_path: str) -> bool:
                 insert_pos = i + 1
                 break
         chunks.insert(insert_pos, script_chunk)
+        refs.add_chunk(script_chunk)
 
     # 加入 res 列表（去重）
-    res_list = script_chunk.setdefault("res", [])
-    if rel not in res_list:
-        res_list.append(rel)
+    return refs.add_script_res(script_chunk, rel)
+
 
+def remove_script_from_pack(project_root: str, abs_path: str) -> bool:
+    """从 pack.json 的 script chunk res 列表中移除指定脚本"""
+    doc = document_for(project_root)
+    if doc is None:
+        return False
+
+    rel = _rel(project_root, abs_path)
     try:
-        _save(pack_path, data)
-        return True
+        return doc.mutate_indexed(lambda data, refs: refs.remove_script_res(rel))
     except Exception:
         return False
 
 
-def remove_script_from_pack(project_root: str, abs_path: str) -> bool:
-    """从 pack.json 的 script chunk res 列表中移除指定脚本"""
-    pack_path = _find_pack_json(project_root)
-    if not pack_path:
+def exclude_from_res_chunks(project_root: str, abs_path: str) -> bool:
+    """把 **/<文件名> 加入所有 RES chunk 的 exclude，返回是否修改了 pack.json"""
+    doc = document_for(project_root)
+    if doc is None:
         return False
 
-    rel = _rel(project_root, abs_path)
+    pattern = "**/" + os.path.basename(abs_path)
 
-    try:
-        data = _load(pack_path)
+    def apply(data: dict) -> bool:
         changed = False
         for chunk in data.get("chunks", []):
-            if chunk.get("type") == "script":
-                res_list = chunk.get("res", [])
-                if rel in res_list:
-                    res_list.remove(rel)
+            if chunk.get("type") == "RES":
+                excl = chunk.setdefault("exclude", [])
+                if pattern not in excl:
+                    excl.append(pattern)
                     changed = True
-        if changed:
-            _save(pack_path, data)
         return changed
-    except Exception:
-        return False
\ No newline at end of file
+
+    return doc.mutate(apply)
@@ -179,7 +179,7 @@ class PackBuild:
 
 @dataclass
 class PackChunk:
-    type: str = "RES"             # MANF | LUA | RES
+    type: str = "RES"             # MANF | LUA | RES | script
     compress: str = "none"
     # MANF 专用
     source: Optional[str] = None
@@ -190,6 +190,8 @@ class PackChunk:
     strip_prefix: Optional[str] = None
     exclude: list = field(default_factory=list)
     order: str = "lex"
+    # script 专用：显式列出的文件/目录（相对项目根）
+    res: list = field(default_factory=list)
 
     def to_dict(self) -> dict:
         d: dict = {"type": self.type, "compress": self.compress}
@@ -207,6 +209,8 @@ class PackChunk:
             d["exclude"] = self.exclude
         if self.order != "lex":
             d["order"] = self.order
+        if self.type == "script":
+            d["res"] = self.res
         return d
 
 
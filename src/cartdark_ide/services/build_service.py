@@ -0,0 +1,69 @@
+"""
+CartDark IDE · services/build_service.py
+在后台线程执行 pack 构建，通过信号把进度和结果交回 UI 线程。
+"""
+from __future__ import annotations
+
+import threading
+from PySide6.QtCore import QObject, Signal
+
+from ..project.pack_builder import PackBuilder, PackBuildError, BuildResult
+
+
+class BuildService(QObject):
+    """
+    构建服务。
+
+    信号
+    ----
+    build_started(str)
+        开始构建，携带项目根目录。
+    build_progress(int, int)
+        (已写入文件数, 文件总数)。
+    build_finished(BuildResult)
+        构建成功。
+    build_failed(str)
+        构建失败，携带错误信息。
+    """
+
+    build_started = Signal(str)
+    build_progress = Signal(int, int)
+    build_finished = Signal(object)   # BuildResult
+    build_failed = Signal(str)
+
+    PROGRESS_STEP = 256
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def build(self, project_root: str) -> bool:
+        """启动后台构建；已有构建在进行时返回 False"""
+        if self.is_running:
+            return False
+        self.build_started.emit(project_root)
+        self._thread = threading.Thread(
+            target=self._run, args=(project_root,), daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self, project_root: str):
+        # 信号跨线程发出时 Qt 自动排队到接收者所在线程；
+        # 进度按批发出，避免上万个文件时塞满事件队列
+        def progress(done: int, total: int):
+            if done == total or done % self.PROGRESS_STEP == 0:
+                self.build_progress.emit(done, total)
+
+        try:
+            result: BuildResult = PackBuilder(project_root, progress=progress).build()
+        except PackBuildError as e:
+            self.build_failed.emit(str(e))
+            return
+        except Exception as e:
+            self.build_failed.emit(f"构建异常：{e}")
+            return
+        self.build_finished.emit(result)
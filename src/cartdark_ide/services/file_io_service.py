@@ -0,0 +1,248 @@
+"""
+CartDark IDE · services/file_io_service.py
+编辑器文件读写：在线程池里完成，结果经信号回到 UI 线程。
+
+  - 读：文本 / JSON（解析也在工作线程）；慢盘、网络盘不再卡住界面
+  - 写：临时文件 + os.replace 原子替换，保留原文件权限；多个文件的写入并行
+  - 同一路径的多次写入按提交顺序生效：较早的写入还没开始时，
+    后提交的会让它直接跳过；被跳过的请求等那次较新的写入完成，
+    随之发出 finished / failed（其内容并没有单独写到磁盘上）
+  - 每个请求是一个 IORequest，完成时在 UI 线程发出 finished / failed；
+    请求不属于任何编辑器，编辑器关闭后写入照常完成
+  - 线程池的工作线程在解释器退出前会被等待，退出时不会丢掉已提交的写入
+
+用法
+----
+req = file_io().read_text(path)
+req.finished.connect(self._on_loaded)     # (内容)
+req.failed.connect(self._on_load_failed)  # (错误信息)
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Signal
+
+
+IO_WORKERS = 4
+
+# 写入被同一路径之后的写入取代（工作线程返回值）
+_SUPERSEDED = object()
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """在同一目录写临时文件再改名，保留原文件权限"""
+    folder = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(prefix=".~", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def dump_json(data) -> bytes:
+    """与编辑器一直以来的保存格式一致：缩进 2、不转义中文、末尾换行"""
+    return (json.dumps(data, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+
+
+def read_json(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class IORequest(QObject):
+    """
+    一次读写请求。
+
+    信号
+    ----
+    finished(object)
+        成功：读请求携带内容，写请求携带 None。
+    failed(str)
+        失败，携带错误信息。
+    """
+
+    finished = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, path: str, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.done = False
+        self.ok = False
+        # 写请求：规范化路径与该路径上的提交序号
+        self._write_key: str | None = None
+        self._write_seq = 0
+
+
+class FileIOService(QObject):
+    """文件读写服务；通过 file_io() 取全局实例"""
+
+    # 内部：工作线程 → UI 线程
+    _completed = Signal(object, bool, object)    # (请求, 是否成功, 结果 / 错误信息)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="file-io")
+        self._completed.connect(self._on_completed)
+        self._lock = threading.Lock()
+        # 以下按规范化路径记录；该路径上没有未完成的写入时一并清掉
+        self._write_seq: dict[str, int] = {}
+        self._path_locks: dict[str, threading.Lock] = {}
+        self._outstanding: dict[str, int] = {}
+        # 仅 UI 线程访问：最新一次真正写入的 (序号, 是否成功, 结果)，
+        # 以及等待较新写入结果的被取代请求
+        self._written: dict[str, tuple[int, bool, object]] = {}
+        self._waiting: dict[str, list[IORequest]] = {}
+        self._pending: set[IORequest] = set()
+
+    # ── 公开 API ──────────────────────────────
+
+    def read_text(self, path: str) -> IORequest:
+        return self._submit(path, _read_text, path)
+
+    def read_json(self, path: str) -> IORequest:
+        return self._submit(path, read_json, path)
+
+    def call(self, path: str, fn, *args) -> IORequest:
+        """在工作线程执行 fn(*args)（读取一组相关文件等），结果经 finished 送回"""
+        return self._submit(path, fn, *args)
+
+    def write_text(self, path: str, text: str) -> IORequest:
+        return self._submit_write(path, lambda: text.encode("utf-8"))
+
+    def write_json(self, path: str, data) -> IORequest:
+        return self._submit_write(path, lambda: dump_json(data))
+
+    def update_json(self, path: str, update) -> IORequest:
+        """读出 path 当前的 JSON（不存在或无效时为 {}），update(data) 原地修改后写回"""
+        def build() -> bytes:
+            try:
+                data = read_json(path)
+            except (OSError, ValueError):
+                data = {}
+            if not isinstance(data, dict):
+                data = {}
+            update(data)
+            return dump_json(data)
+        return self._submit_write(path, build)
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._pending)
+
+    # ── 内部 ──────────────────────────────────
+
+    def _submit(self, path: str, fn, *args, write_key: str | None = None,
+                write_seq: int = 0) -> IORequest:
+        req = IORequest(path, self)
+        req._write_key = write_key
+        req._write_seq = write_seq
+        self._pending.add(req)
+
+        def run():
+            try:
+                result = fn(*args)
+            except Exception as e:
+                # 任何异常都要让请求结束，调用方在等 finished / failed
+                self._completed.emit(req, False, str(e))
+                return
+            self._completed.emit(req, True, result)
+
+        self._executor.submit(run)
+        return req
+
+    def _submit_write(self, path: str, build) -> IORequest:
+        key = os.path.abspath(path)
+        with self._lock:
+            seq = self._write_seq.get(key, 0) + 1
+            self._write_seq[key] = seq
+            self._outstanding[key] = self._outstanding.get(key, 0) + 1
+            lock = self._path_locks.setdefault(key, threading.Lock())
+
+        def write():
+            with lock:
+                with self._lock:
+                    if self._write_seq.get(key) != seq:
+                        # 之后还有对同一文件的写入，这次的内容已经过时
+                        return _SUPERSEDED
+                write_atomic(path, build())
+            return None
+
+        return self._submit(path, write, write_key=key, write_seq=seq)
+
+    def _on_completed(self, req: IORequest, ok: bool, result):
+        key = req._write_key
+        if key is None:
+            self._resolve(req, ok, result)
+            return
+        seq = req._write_seq
+        written = self._written.get(key)
+        if ok and result is _SUPERSEDED:
+            if written is None or written[0] < seq:
+                # 取代它的写入还没完成
+                self._waiting.setdefault(key, []).append(req)
+                return
+            resolved = [(req, written[1], written[2])]
+        else:
+            if written is None or written[0] < seq:
+                self._written[key] = (seq, ok, result)
+            resolved = [(req, ok, result)]
+            waiting = self._waiting.pop(key, [])
+            for w in waiting:
+                if w._write_seq < seq:
+                    resolved.append((w, ok, result))
+            still = [w for w in waiting if w._write_seq > seq]
+            if still:
+                self._waiting[key] = still
+
+        with self._lock:
+            left = self._outstanding[key] - len(resolved)
+            if left:
+                self._outstanding[key] = left
+            else:
+                del self._outstanding[key]
+                del self._write_seq[key]
+                del self._path_locks[key]
+                self._written.pop(key, None)
+        for r, r_ok, r_result in resolved:
+            self._resolve(r, r_ok, r_result)
+
+    def _resolve(self, req: IORequest, ok: bool, result):
+        self._pending.discard(req)
+        req.done = True
+        req.ok = ok
+        if ok:
+            req.finished.emit(result)
+        else:
+            req.failed.emit(result)
+        req.deleteLater()
+
+
+_instance: FileIOService | None = None
+
+
+def file_io() -> FileIOService:
+    """全局文件读写服务（首次调用时创建，需在 UI 线程调用）"""
+    global _instance
+    if _instance is None:
+        _instance = FileIOService()
+    return _instance
@@ -0,0 +1,227 @@
+"""
+CartDark IDE · services/fs_watch_service.py
+监视已加载目录的磁盘变化，产出合并后的增量（新增 / 删除 / 重命名 / 替换）。
+
+  - 只监视调用方登记过的目录，每个目录保留一份 {名称: (是否目录, inode)} 快照；
+    WorkspaceIndex 与资源树共用同一个实例（见 WorkspaceIndex.watcher）
+  - QFileSystemWatcher 的 directoryChanged 只标记目录为脏，
+    COALESCE_MS 内的多次通知合并为一次：重新 scandir 脏目录并与快照比较
+  - 同一批次里一处消失、另一处出现且 inode 相同的条目视为重命名 / 移动
+  - 同名同类型但 inode 变了的条目（临时文件 + 改名的原子保存）报告为替换
+  - IDE 自己的文件操作完成后可调用 poll() 立即同步，不必等待通知
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+
+# 增量类别
+ADDED = "added"
+REMOVED = "removed"
+RENAMED = "renamed"
+MODIFIED = "modified"
+
+
+@dataclass
+class FsDelta:
+    kind: str            # ADDED | REMOVED | RENAMED | MODIFIED
+    path: str            # 绝对路径；RENAMED 时为原路径
+    is_dir: bool = False
+    new_path: str = ""   # RENAMED 时的新路径
+
+
+# ──────────────────────────────────────────────
+# 目录扫描
+# ──────────────────────────────────────────────
+
+# 跳过这些目录/文件
+_SKIP_NAMES = {".venv", ".git", ".idea", "__pycache__", ".DS_Store", "Thumbs.db"}
+
+
+def should_skip(name: str) -> bool:
+    if name in _SKIP_NAMES:
+        return True
+    # 保留 .gitignore，跳过其他隐藏文件
+    if name.startswith(".") and name != ".gitignore":
+        return True
+    return False
+
+
+def _sort_key(entry: tuple):
+    """目录排在文件前，同类按名称字母序"""
+    return (0 if entry[1] else 1, entry[0].lower())
+
+
+def scan_dir(dir_path: str) -> list[tuple[str, bool, int]]:
+    """
+    扫描一层目录，返回排序后的 [(名称, 是否目录, inode), ...]。
+    可在任意线程调用；目录不可读时返回空列表。
+    """
+    entries = []
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                # 跳过隐藏文件和 IDE 内部目录（.venv 等）
+                if should_skip(entry.name):
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    ino = entry.inode()
+                except OSError:
+                    is_dir, ino = False, 0
+                entries.append((entry.name, is_dir, ino))
+    except OSError:
+        return []
+    entries.sort(key=_sort_key)
+    return entries
+
+
+# ──────────────────────────────────────────────
+# 服务
+# ──────────────────────────────────────────────
+
+class FsWatchService(QObject):
+    """
+    目录监视服务。
+
+    信号
+    ----
+    changed(list[FsDelta])
+        一批合并后的增量。删除目录时只报告该目录本身；
+        原地写入（inode 不变）的文件不会被报告。
+    """
+
+    changed = Signal(object)
+
+    COALESCE_MS = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._snapshots: dict[str, dict[str, tuple[bool, int]]] = {}
+        self._dirty: set[str] = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.COALESCE_MS)
+        self._timer.timeout.connect(self._flush)
+
+    # ── 登记 ──────────────────────────────────
+
+    def watch_dir(self, dir_path: str, entries: list[tuple[str, bool, int]]):
+        """
+        登记目录及其当前内容（scan_dir 的结果）。
+        已登记的目录保留原快照：快照随通知保持最新，用后扫描的结果覆盖
+        会让先登记的使用方漏掉两次扫描之间的变化。
+        """
+        if dir_path in self._snapshots:
+            return
+        self._snapshots[dir_path] = {name: (is_dir, ino) for name, is_dir, ino in entries}
+        self._watcher.addPath(dir_path)
+
+    def unwatch_tree(self, dir_path: str):
+        """取消监视 dir_path 及其下所有已登记目录"""
+        prefix = dir_path + os.sep
+        gone = [d for d in self._snapshots if d == dir_path or d.startswith(prefix)]
+        for d in gone:
+            del self._snapshots[d]
+            self._dirty.discard(d)
+        watched = [d for d in self._watcher.directories()
+                   if d == dir_path or d.startswith(prefix)]
+        if watched:
+            self._watcher.removePaths(watched)
+
+    def clear(self):
+        self._timer.stop()
+        self._dirty.clear()
+        self._snapshots.clear()
+        watched = self._watcher.directories()
+        if watched:
+            self._watcher.removePaths(watched)
+
+    # ── 同步 ──────────────────────────────────
+
+    def poll(self, dir_paths):
+        """立即比较这些目录（连同已积累的脏目录）并发出增量"""
+        self._dirty.update(d for d in dir_paths if d in self._snapshots)
+        self._flush()
+
+    def _on_directory_changed(self, dir_path: str):
+        if dir_path in self._snapshots:
+            self._dirty.add(dir_path)
+            if not self._timer.isActive():
+                self._timer.start()
+
+    def _flush(self):
+        self._timer.stop()
+        if not self._dirty:
+            return
+        dirty, self._dirty = sorted(self._dirty), set()
+
+        removed: list[FsDelta] = []
+        added: list[tuple[FsDelta, int]] = []
+        removed_ino: dict[int, FsDelta] = {}
+        modified: list[FsDelta] = []
+        for d in dirty:
+            old = self._snapshots.get(d)
+            if old is None:
+                continue
+            if not os.path.isdir(d):
+                # 目录本身不见了：由父目录的比较报告
+                continue
+            entries = scan_dir(d)
+            new = {name: (is_dir, ino) for name, is_dir, ino in entries}
+            for name, (is_dir, ino) in old.items():
+                # 同名且类型不变视为原地替换（编辑器原子保存），不算删除
+                cur = new.get(name)
+                if cur is not None and cur[0] == is_dir:
+                    if not is_dir and ino and cur[1] and cur[1] != ino:
+                        modified.append(FsDelta(MODIFIED, os.path.join(d, name)))
+                else:
+                    delta = FsDelta(REMOVED, os.path.join(d, name), is_dir)
+                    removed.append(delta)
+                    if ino:
+                        removed_ino[ino] = delta
+            for name, (is_dir, ino) in new.items():
+                prev = old.get(name)
+                if prev is None or prev[0] != is_dir:
+                    added.append((FsDelta(ADDED, os.path.join(d, name), is_dir), ino))
+            self._snapshots[d] = new
+
+        # inode 相同的一删一增合并为重命名
+        deltas: list[FsDelta] = []
+        renamed_from: set[int] = set()
+        for a, ino in added:
+            r = removed_ino.get(ino) if ino else None
+            if r is not None and id(r) not in renamed_from and r.is_dir == a.is_dir:
+                renamed_from.add(id(r))
+                deltas.append(FsDelta(RENAMED, r.path, a.is_dir, a.path))
+            else:
+                deltas.append(a)
+        deltas[:0] = [r for r in removed if id(r) not in renamed_from]
+        deltas.extend(modified)
+
+        for delta in deltas:
+            if delta.is_dir and delta.kind == REMOVED:
+                self.unwatch_tree(delta.path)
+            elif delta.is_dir and delta.kind == RENAMED:
+                self._rekey_tree(delta.path, delta.new_path)
+
+        if deltas:
+            self.changed.emit(deltas)
+
+    def _rekey_tree(self, old_dir: str, new_dir: str):
+        """目录改名后把它及子目录的快照和监视路径迁到新路径"""
+        prefix = old_dir + os.sep
+        moved = {d: s for d, s in self._snapshots.items()
+                 if d == old_dir or d.startswith(prefix)}
+        if not moved:
+            return
+        self.unwatch_tree(old_dir)
+        for d, snap in moved.items():
+            nd = new_dir + d[len(old_dir):]
+            self._snapshots[nd] = snap
+            self._watcher.addPath(nd)
@@ -0,0 +1,388 @@
+"""
+CartDark IDE · services/outline_service.py
+Lua 脚本大纲：函数（全局 / local / 方法）、表、require，按嵌套组成符号树。
+
+  - 逐行扫描，每行得到一组结构事件（函数开始、块开始 / 结束、表、require）；
+    跨行的只有长注释 / 长字符串状态，与语法高亮的块状态同理
+  - 每个文件的扫描结果按行缓存（LuaOutlineParser）。文本变化后找出前后不变的行，
+    只重扫中间被编辑的行，以及之后进入状态变了的行（例如新打开的 --[[ ）；
+    符号树由各行的事件重新组装，只是遍历一遍事件列表
+  - 扫描与组装都在后台线程完成；同一文件排队的多次请求只处理最新的一次，
+    结果经 outline_ready 信号回到 UI 线程
+  - 只识别单行内写完的定义头（function a.b:c(…)、local t = {、x = require "m"），
+    不做完整的语法分析
+
+用法
+----
+service = OutlineService(parent)
+service.outline_ready.connect(self._on_outline)   # (文件路径, 顶层符号列表)
+service.request(file_path, text)
+"""
+from __future__ import annotations
+
+import queue
+import re
+import threading
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, Signal
+
+
+# 符号类别
+FUNCTION = "function"               # function a.b() / a = function()
+LOCAL_FUNCTION = "local_function"   # local function f() / local f = function()
+METHOD = "method"                   # function A:m()
+TABLE = "table"                     # t = { … } / local t = { … }
+REQUIRE = "require"                 # local m = require "m"
+
+# 按文件缓存扫描结果的个数（切换标签后回来仍可增量更新）
+CACHED_FILES = 8
+
+
+class Symbol:
+    """大纲中的一个符号；line 从 1 开始"""
+
+    __slots__ = ("name", "kind", "line", "col", "parent", "children", "row")
+
+    def __init__(self, name: str, kind: str, line: int, col: int):
+        self.name = name
+        self.kind = kind
+        self.line = line
+        self.col = col
+        self.parent: Symbol | None = None
+        self.children: list[Symbol] = []
+        self.row = 0
+
+    def add(self, child: Symbol):
+        child.parent = self
+        child.row = len(self.children)
+        self.children.append(child)
+
+
+# ──────────────────────────────────────────────
+# 逐行扫描
+# ──────────────────────────────────────────────
+
+# 行的进入 / 离开状态：0 为普通；长注释 / 长字符串为 类别基数 + 括号级别
+_STATE_NORMAL = 0
+_STATE_LONG_COMMENT = 0x100
+_STATE_LONG_STRING = 0x200
+_STATE_LEVEL_MASK = 0xFF
+
+_TOKEN = re.compile(r"""
+    (?P<long_comment>--\[(?P<lc_eq>=*)\[)
+  | (?P<comment>--)
+  | (?P<long_string>\[(?P<ls_eq>=*)\[)
+  | (?P<string>"(?:[^"\\]|\\.)*"?|'(?:[^'\\]|\\.)*'?)
+  | (?P<name>[A-Za-z_]\w*)
+  | (?P<number>\d[\w.]*)
+  | (?P<op>==|~=|<=|>=|\.\.\.?|::|\S)
+""", re.VERBOSE)
+
+_LONG_CLOSE = [f"]{'=' * n}]" for n in range(_STATE_LEVEL_MASK + 1)]
+
+# 以 end / until 结束的块
+_BLOCK_OPEN = frozenset({"if", "do", "repeat"})
+_BLOCK_CLOSE = frozenset({"end", "until"})
+
+# 行内事件：(列, 类型, 名称, 符号类别)
+_EV_FUNC = 0        # 函数开始（名称为 None 时是匿名函数，只算一层块）
+_EV_BLOCK = 1       # if / do / repeat
+_EV_END = 2         # end / until
+_EV_TABLE = 3       # 有名字的表构造开始
+_EV_BRACE = 4       # 其他 {
+_EV_BRACE_END = 5   # }
+_EV_REQUIRE = 6
+
+
+def _tokens(text: str, state: int) -> tuple[list[tuple[str, str, int]], int]:
+    """一行的记号 (类别, 文本, 列)，跳过注释；返回离开状态"""
+    tokens: list[tuple[str, str, int]] = []
+    pos = 0
+    if state:
+        end = text.find(_LONG_CLOSE[state & _STATE_LEVEL_MASK])
+        if end == -1:
+            return tokens, state
+        if state & _STATE_LONG_STRING:
+            tokens.append(("string", "", 0))
+        pos = end + 2 + (state & _STATE_LEVEL_MASK)
+
+    search = _TOKEN.search
+    while True:
+        m = search(text, pos)
+        if m is None:
+            return tokens, _STATE_NORMAL
+        group = m.lastgroup
+        if group == "comment":
+            return tokens, _STATE_NORMAL
+        if group == "long_comment" or group == "long_string":
+            is_comment = group == "long_comment"
+            level = min(len(m.group("lc_eq" if is_comment else "ls_eq")), _STATE_LEVEL_MASK)
+            end = text.find(_LONG_CLOSE[level], m.end())
+            if not is_comment:
+                tokens.append(("string", "", m.start()))
+            if end == -1:
+                base = _STATE_LONG_COMMENT if is_comment else _STATE_LONG_STRING
+                return tokens, base | level
+            pos = end + 2 + level
+            continue
+        if group == "string":
+            tokens.append(("string", m.group()[1:-1], m.start()))
+        else:
+            tokens.append((group, m.group(), m.start()))
+        pos = m.end()
+
+
+def _target(tokens: list, eq: int) -> tuple[str, bool] | None:
+    """
+    tokens[eq] 为 "=" 时，取赋值目标 a / a.b.c / local a，返回 (名称, 是否 local)；
+    下标赋值（t[k] = …）等返回 None。
+    """
+    i = eq - 1
+    if i < 0 or tokens[i][0] != "name":
+        return None
+    parts = [tokens[i][1]]
+    i -= 1
+    while i >= 1 and tokens[i][1] == "." and tokens[i - 1][0] == "name":
+        parts.append(tokens[i - 1][1])
+        i -= 2
+    is_local = i >= 0 and tokens[i][1] == "local"
+    if is_local and len(parts) > 1:
+        return None
+    return ".".join(reversed(parts)), is_local
+
+
+def scan_line(text: str, state: int) -> tuple[list[tuple], int]:
+    """一行的结构事件与离开状态"""
+    tokens, end_state = _tokens(text, state)
+    events: list[tuple] = []
+    n = len(tokens)
+    i = 0
+    while i < n:
+        kind, word, col = tokens[i]
+        if kind == "name":
+            if word == "function":
+                prev = tokens[i - 1][1] if i else ""
+                if prev == "local" and i + 1 < n and tokens[i + 1][0] == "name":
+                    events.append((col, _EV_FUNC, tokens[i + 1][1], LOCAL_FUNCTION))
+                    i += 2
+                    continue
+                if i + 1 < n and tokens[i + 1][0] == "name":
+                    # function a.b.c:m(
+                    j = i + 1
+                    name = tokens[j][1]
+                    sym_kind = FUNCTION
+                    while j + 2 < n and tokens[j + 1][1] in (".", ":") and tokens[j + 2][0] == "name":
+                        if tokens[j + 1][1] == ":":
+                            sym_kind = METHOD
+                        name += tokens[j + 1][1] + tokens[j + 2][1]
+                        j += 2
+                    events.append((col, _EV_FUNC, name, sym_kind))
+                    i = j + 1
+                    continue
+                target = _target(tokens, i - 1) if prev == "=" else None
+                if target is not None:
+                    name, is_local = target
+                    events.append((col, _EV_FUNC, name, LOCAL_FUNCTION if is_local else FUNCTION))
+                else:
+                    events.append((col, _EV_FUNC, None, None))
+            elif word in _BLOCK_OPEN:
+                events.append((col, _EV_BLOCK, None, None))
+            elif word in _BLOCK_CLOSE:
+                events.append((col, _EV_END, None, None))
+            elif word == "require" and i + 1 < n:
+                j = i + 2 if tokens[i + 1][1] == "(" else i + 1
+                if j < n and tokens[j][0] == "string" and tokens[j][1]:
+                    module = tokens[j][1]
+                    target = None
+                    if i >= 1 and tokens[i - 1][1] == "=":
+                        target = _target(tokens, i - 1)
+                    # local json = require "json" 只显示模块名
+                    label = module
+                    if target is not None and target[0] != module.rsplit(".", 1)[-1]:
+                        label = f"{target[0]} = {module}"
+                    events.append((col, _EV_REQUIRE, label, REQUIRE))
+                    i = j + 1
+                    continue
+        elif word == "{":
+            target = _target(tokens, i - 1) if i and tokens[i - 1][1] == "=" else None
+            if target is not None:
+                events.append((col, _EV_TABLE, target[0], TABLE))
+            else:
+                events.append((col, _EV_BRACE, None, None))
+        elif word == "}":
+            events.append((col, _EV_BRACE_END, None, None))
+        i += 1
+    return events, end_state
+
+
+# ──────────────────────────────────────────────
+# 增量解析与组装
+# ──────────────────────────────────────────────
+
+class LuaOutlineParser:
+    """一个文件的逐行扫描缓存；update(text) 只重扫变化的行"""
+
+    def __init__(self):
+        self._lines: list[str] = []
+        self._events: list[list[tuple]] = []
+        self._exits: list[int] = []
+        self.rescanned = 0          # 上次 update 实际扫描的行数
+
+    def update(self, text: str) -> list[Symbol]:
+        lines = text.split("\n")
+        old = self._lines
+        old_n, new_n = len(old), len(lines)
+
+        # 前后不变的行
+        limit = min(old_n, new_n)
+        head = 0
+        while head < limit and old[head] == lines[head]:
+            head += 1
+        tail = 0
+        while tail < limit - head and old[old_n - 1 - tail] == lines[new_n - 1 - tail]:
+            tail += 1
+
+        events = self._events[:head]
+        exits = self._exits[:head]
+        state = exits[-1] if exits else _STATE_NORMAL
+        for i in range(head, new_n - tail):
+            ev, state = scan_line(lines[i], state)
+            events.append(ev)
+            exits.append(state)
+
+        # 后面不变的行：进入状态相同就直接沿用，否则继续重扫
+        k = 0
+        while k < tail:
+            oi = old_n - tail + k
+            old_entry = self._exits[oi - 1] if oi else _STATE_NORMAL
+            if old_entry == state:
+                break
+            ev, state = scan_line(lines[new_n - tail + k], state)
+            events.append(ev)
+            exits.append(state)
+            k += 1
+        reuse = old_n - tail + k
+        events.extend(self._events[reuse:])
+        exits.extend(self._exits[reuse:])
+
+        self.rescanned = new_n - tail + k - head
+        self._lines, self._events, self._exits = lines, events, exits
+        return build_tree(events)
+
+
+def build_tree(line_events: list[list[tuple]]) -> list[Symbol]:
+    """由各行事件组装符号树，返回顶层符号"""
+    root = Symbol("", "", 0, 0)
+    tables: dict[str, Symbol] = {}      # 顶层表名 → 符号，a.b / a:b 挂到表下
+    stack: list[tuple[int, Symbol | None]] = []   # (块类型, 符号)，块类型为 0（end 结束）或 1（} 结束）
+
+    def container() -> Symbol:
+        for _kind, sym in reversed(stack):
+            if sym is not None:
+                return sym
+        return root
+
+    def place(sym: Symbol):
+        parent = container()
+        if parent is root and sym.kind in (FUNCTION, METHOD):
+            owner, sep, short = sym.name.rpartition(":" if sym.kind == METHOD else ".")
+            table = tables.get(owner) if sep else None
+            if table is not None:
+                sym.name = short
+                parent = table
+        parent.add(sym)
+
+    for line_no, events in enumerate(line_events, 1):
+        for col, ev, name, kind in events:
+            if ev == _EV_FUNC:
+                sym = Symbol(name, kind, line_no, col) if name is not None else None
+                if sym is not None:
+                    place(sym)
+                stack.append((0, sym))
+            elif ev == _EV_BLOCK:
+                stack.append((0, None))
+            elif ev == _EV_END:
+                # 找最近的 end 型块；中间残留的 { 说明括号没配对，一并弹出
+                while stack:
+                    if stack.pop()[0] == 0:
+                        break
+            elif ev == _EV_TABLE:
+                sym = Symbol(name, kind, line_no, col)
+                at_top = container() is root
+                place(sym)
+                if at_top:
+                    tables[name] = sym
+                stack.append((1, sym))
+            elif ev == _EV_BRACE:
+                stack.append((1, None))
+            elif ev == _EV_BRACE_END:
+                if stack and stack[-1][0] == 1:
+                    stack.pop()
+            elif ev == _EV_REQUIRE:
+                place(Symbol(name, kind, line_no, col))
+
+    for sym in root.children:
+        sym.parent = None
+    return root.children
+
+
+# ──────────────────────────────────────────────
+# 后台服务
+# ──────────────────────────────────────────────
+
+class OutlineService(QObject):
+    """
+    后台生成大纲。
+
+    信号
+    ----
+    outline_ready(str, object)
+        (文件路径, 顶层 Symbol 列表)，只对最后一次请求发出。
+    """
+
+    outline_ready = Signal(str, object)
+
+    # 内部：后台线程 → UI 线程
+    _parsed = Signal(int, str, object)      # (代次, 文件路径, 符号)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._generation = 0
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        # 以下只在后台线程中访问
+        self._parsers: OrderedDict[str, LuaOutlineParser] = OrderedDict()
+
+        self._parsed.connect(self._on_parsed)
+        threading.Thread(target=self._worker, daemon=True, name="lua-outline").start()
+
+    def request(self, file_path: str, text: str):
+        """排队解析；之前未处理的请求作废"""
+        self._generation += 1
+        self._jobs.put((self._generation, file_path, text))
+
+    def cancel(self):
+        self._generation += 1
+
+    def _worker(self):
+        while True:
+            # 取空队列，只处理最新的请求
+            job = self._jobs.get()
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+            generation, file_path, text = job
+            if generation != self._generation:
+                continue
+            parser = self._parsers.pop(file_path, None) or LuaOutlineParser()
+            self._parsers[file_path] = parser
+            while len(self._parsers) > CACHED_FILES:
+                self._parsers.popitem(last=False)
+            symbols = parser.update(text)
+            self._parsed.emit(generation, file_path, symbols)
+
+    def _on_parsed(self, generation: int, file_path: str, symbols: list):
+        if generation == self._generation:
+            self.outline_ready.emit(file_path, symbols)
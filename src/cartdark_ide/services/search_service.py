@@ -0,0 +1,377 @@
+"""
+CartDark IDE · services/search_service.py
+项目内全文搜索（在文件中查找）。
+
+  - 文件清单来自 WorkspaceIndex，不再遍历磁盘；跳过图片 / 音频等类别、
+    构建输出（build/、dist/、*.cart.bin、*.pack.lock.json）、过大的文件，
+    以及前 8 KB 含 NUL 字节的二进制文件
+  - 设置了 TrigramIndex 时先用索引筛掉不可能命中的文件，只验证候选文件
+  - 文件按小批分发到线程池：读文件时释放 GIL，多个文件的 I/O 并行；
+    每个文件先整体 search 一次，没有命中就不再逐行处理
+  - 命中按批（BATCH_HITS 条或 BATCH_MS 毫秒）经信号送回 UI 线程，
+    第一条命中立即发出
+  - 每次搜索有独立的取消标志；发起新搜索或调用 cancel() 时旧搜索
+    在处理下一个文件前停止，已排队的批次直接丢弃
+  - 替换（replace）按文件当前内容重新匹配，在线程池中一次处理全部文件，
+    每个文件写临时文件再 os.replace，不会留下写了一半的文件；
+    已在编辑器中打开的文件由调用方经编辑器文档替换，不走这里
+
+用法
+----
+svc = SearchService(parent)
+svc.results.connect(on_batch)           # (search_id, [SearchHit, ...])
+sid = svc.start(root, index.files(), SearchQuery("player", case_sensitive=False))
+"""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from PySide6.QtCore import QObject, Signal
+
+from ..project.pack_match import compile_glob
+from .file_io_service import write_atomic
+from .workspace_service import FileEntry, KIND_IMAGE, KIND_AUDIO
+
+
+# 工作线程数
+SEARCH_WORKERS = min(8, (os.cpu_count() or 2) + 2)
+
+# 每个任务处理的文件数
+FILES_PER_TASK = 16
+
+# 每完成多少个任务报告一次进度
+PROGRESS_STEP = 16
+
+# 批次大小 / 最长间隔
+BATCH_HITS = 200
+BATCH_MS = 50
+
+# 跳过大于此大小的文件
+MAX_FILE_SIZE = 4 * 1024 * 1024
+
+# 单个文件最多报告的命中数
+MAX_HITS_PER_FILE = 1000
+
+# 命中行显示的最大长度
+MAX_LINE_PREVIEW = 240
+
+# 二进制嗅探长度
+_SNIFF_BYTES = 8192
+
+_SKIP_KINDS = frozenset({KIND_IMAGE, KIND_AUDIO})
+
+# 构建输出等不参与搜索的路径（与脚手架生成的 .gitignore 一致）
+_EXCLUDE_GLOBS = ("build/**", "dist/**", "**/*.cart.bin", "**/*.pack.lock.json")
+_EXCLUDE_RES = [compile_glob(g) for g in _EXCLUDE_GLOBS]
+
+
+@dataclass
+class SearchQuery:
+    text: str
+    regex: bool = False
+    case_sensitive: bool = False
+    whole_word: bool = False
+
+
+class SearchHit:
+    """一处命中。col / end 为行内字符偏移"""
+    __slots__ = ("rel", "line", "col", "end", "text")
+
+    def __init__(self, rel: str, line: int, col: int, end: int, text: str):
+        self.rel = rel          # 相对项目根，/ 分隔
+        self.line = line        # 从 1 开始
+        self.col = col
+        self.end = end
+        self.text = text        # 命中所在行（可能被截断）
+
+
+@dataclass
+class ReplaceResult:
+    files: list[str] = field(default_factory=list)     # 已写入的文件（相对路径）
+    replacements: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+@dataclass
+class SearchStats:
+    files_searched: int = 0
+    files_skipped: int = 0          # 被三元组索引筛掉的文件数
+    files_matched: int = 0
+    hits: int = 0
+    cancelled: bool = False
+    elapsed: float = 0.0
+
+
+def compile_query(query: SearchQuery) -> re.Pattern:
+    """SearchQuery → 正则；正则语法错误时抛出 re.error"""
+    pattern = query.text if query.regex else re.escape(query.text)
+    if query.whole_word:
+        pattern = rf"\b(?:{pattern})\b"
+    flags = re.MULTILINE
+    if not query.case_sensitive:
+        flags |= re.IGNORECASE
+    return re.compile(pattern, flags)
+
+
+def is_searchable(entry: FileEntry) -> bool:
+    if entry.kind in _SKIP_KINDS or entry.size > MAX_FILE_SIZE:
+        return False
+    return not any(r.match(entry.rel) for r in _EXCLUDE_RES)
+
+
+def read_text(path: str) -> str | None:
+    """读取文本文件；二进制或不可读时返回 None"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if b"\0" in data[:_SNIFF_BYTES]:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+def search_text(rel: str, text: str, pattern: re.Pattern,
+                limit: int = MAX_HITS_PER_FILE) -> list[SearchHit]:
+    """在一段文本中查找，返回逐处命中"""
+    hits: list[SearchHit] = []
+    line_no = 1
+    scanned = 0                 # line_no 已统计到的位置
+    line_start = 0
+    line_end = -1
+    for m in pattern.finditer(text):
+        start = m.start()
+        if m.end() == start:
+            # 空匹配（如 ^、\b）没有可显示的范围
+            continue
+        if start > line_end:
+            line_no += text.count("\n", scanned, start)
+            scanned = start
+            line_start = text.rfind("\n", 0, start) + 1
+            line_end = text.find("\n", start)
+            if line_end == -1:
+                line_end = len(text)
+        line = text[line_start:line_end].rstrip("\r")
+        col = start - line_start
+        end = min(m.end() - line_start, len(line))
+        hits.append(SearchHit(rel, line_no, col, end, line[:MAX_LINE_PREVIEW]))
+        if len(hits) >= limit:
+            break
+    return hits
+
+
+def find_replacements(text: str, pattern: re.Pattern, replacement: str,
+                      regex: bool) -> list[tuple[int, int, str]]:
+    """
+    text 中每处命中的 (起点, 终点, 替换文本)。
+    正则模式下 replacement 按 Python 模板展开（\\1、\\g<name>），
+    否则原样插入；空匹配与搜索时一样跳过。模板无效时抛出 re.error。
+    """
+    edits = []
+    for m in pattern.finditer(text):
+        if m.end() == m.start():
+            continue
+        edits.append((m.start(), m.end(), m.expand(replacement) if regex else replacement))
+    return edits
+
+
+def replace_text(text: str, pattern: re.Pattern, replacement: str,
+                 regex: bool) -> tuple[str, int]:
+    """返回 (替换后的文本, 替换处数)"""
+    edits = find_replacements(text, pattern, replacement, regex)
+    if not edits:
+        return text, 0
+    parts = []
+    pos = 0
+    for start, end, new in edits:
+        parts.append(text[pos:start])
+        parts.append(new)
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts), len(edits)
+
+
+def _replace_file(path: str, pattern: re.Pattern, replacement: str,
+                  regex: bool) -> int:
+    with open(path, "rb") as f:
+        data = f.read()
+    if b"\0" in data[:_SNIFF_BYTES]:
+        return 0
+    # 严格解码：无法按 UTF-8 解码的文件不改写，免得替换字符写回磁盘
+    text = data.decode("utf-8")
+    new_text, count = replace_text(text, pattern, replacement, regex)
+    if count:
+        write_atomic(path, new_text.encode("utf-8"))
+    return count
+
+
+# ──────────────────────────────────────────────
+# 服务
+# ──────────────────────────────────────────────
+
+class SearchService(QObject):
+    """
+    在文件中查找。
+
+    信号
+    ----
+    started(int)
+        新搜索开始，携带搜索 id。
+    results(int, list[SearchHit])
+        一批命中。
+    progress(int, int, int)
+        (搜索 id, 已搜索文件数, 文件总数)。
+    finished(int, SearchStats)
+        搜索结束（包括被取消）。
+    failed(int, str)
+        查询无效（如正则语法错误）。
+    replaced(int, ReplaceResult)
+        一次 replace() 全部写完。
+    """
+
+    started = Signal(int)
+    results = Signal(int, object)
+    progress = Signal(int, int, int)
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+    replaced = Signal(int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS,
+                                            thread_name_prefix="search")
+        self._search_id = 0
+        self._cancel: threading.Event | None = None
+        self._index = None
+        self._replace_id = 0
+
+    @property
+    def current_id(self) -> int:
+        return self._search_id
+
+    def set_index(self, index) -> None:
+        """用于筛选候选文件的 TrigramIndex；None 表示逐个文件搜索"""
+        self._index = index
+
+    def start(self, project_root: str, files: list[FileEntry], query: SearchQuery) -> int:
+        """取消进行中的搜索并开始新搜索，返回搜索 id"""
+        self.cancel()
+        self._search_id += 1
+        sid = self._search_id
+        try:
+            pattern = compile_query(query)
+        except re.error as e:
+            self.failed.emit(sid, f"正则表达式错误：{e}")
+            return sid
+        cancel = self._cancel = threading.Event()
+        targets = [f for f in files if is_searchable(f)]
+        self.started.emit(sid)
+        threading.Thread(target=self._run,
+                         args=(sid, project_root, targets, query, pattern, cancel),
+                         daemon=True).start()
+        return sid
+
+    def replace(self, project_root: str, rels: list[str], query: SearchQuery,
+                replacement: str) -> int:
+        """在后台替换这些文件中的全部命中，返回替换 id；查询无效时抛出 re.error"""
+        pattern = compile_query(query)
+        self._replace_id += 1
+        rid = self._replace_id
+        threading.Thread(target=self._run_replace,
+                         args=(rid, project_root, rels, pattern, replacement, query.regex),
+                         daemon=True).start()
+        return rid
+
+    def cancel(self):
+        if self._cancel is not None:
+            self._cancel.set()
+            self._cancel = None
+
+    # ── 内部 ──────────────────────────────────
+
+    def _run(self, sid: int, root: str, targets: list[FileEntry], query: SearchQuery,
+             pattern: re.Pattern, cancel: threading.Event):
+        t0 = time.monotonic()
+        stats = SearchStats()
+        if self._index is not None:
+            candidates = self._index.narrow(targets, query.text, query.regex,
+                                            query.case_sensitive)
+            stats.files_skipped = len(targets) - len(candidates)
+            targets = candidates
+        lock = threading.Lock()
+        pending: list[SearchHit] = []
+        state = {"last_emit": 0.0, "emitted": False}
+
+        def flush(force: bool):
+            # 调用方持有 lock
+            now = time.monotonic()
+            # 第一批不等待，之后按数量或间隔合批
+            if pending and (force or not state["emitted"]
+                            or len(pending) >= BATCH_HITS
+                            or (now - state["last_emit"]) * 1000 >= BATCH_MS):
+                batch = pending[:]
+                pending.clear()
+                state["last_emit"] = now
+                state["emitted"] = True
+                self.results.emit(sid, batch)
+
+        def work(entries: list[FileEntry]):
+            for entry in entries:
+                if cancel.is_set():
+                    return
+                text = read_text(os.path.join(root, entry.rel))
+                hits = []
+                # 先整体判断，无命中的文件不逐行处理
+                if text is not None and pattern.search(text) is not None:
+                    hits = search_text(entry.rel, text, pattern)
+                with lock:
+                    stats.files_searched += 1
+                    if hits:
+                        stats.files_matched += 1
+                        stats.hits += len(hits)
+                        pending.extend(hits)
+                    if not cancel.is_set():
+                        flush(False)
+
+        futures = [self._executor.submit(work, targets[i:i + FILES_PER_TASK])
+                   for i in range(0, len(targets), FILES_PER_TASK)]
+        total = len(targets)
+        for n, fut in enumerate(futures):
+            if cancel.is_set():
+                for f in futures[n:]:
+                    f.cancel()
+                break
+            fut.result()
+            if (n + 1) % PROGRESS_STEP == 0 or n + 1 == len(futures):
+                self.progress.emit(sid, min((n + 1) * FILES_PER_TASK, total), total)
+
+        with lock:
+            stats.cancelled = cancel.is_set()
+            if not stats.cancelled:
+                flush(True)
+        stats.elapsed = time.monotonic() - t0
+        self.finished.emit(sid, stats)
+
+    def _run_replace(self, rid: int, root: str, rels: list[str], pattern: re.Pattern,
+                     replacement: str, regex: bool):
+        result = ReplaceResult()
+
+        def work(rel: str):
+            try:
+                return rel, _replace_file(os.path.join(root, *rel.split("/")),
+                                          pattern, replacement, regex), None
+            except (OSError, UnicodeDecodeError, re.error) as e:
+                return rel, 0, f"{rel}: {e}"
+
+        for rel, count, error in self._executor.map(work, rels):
+            if error:
+                result.errors.append(error)
+            elif count:
+                result.files.append(rel)
+                result.replacements += count
+        self.replaced.emit(rid, result)
@@ -0,0 +1,138 @@
+"""
+CartDark IDE · services/session_service.py
+按项目保存 / 恢复工作区会话：打开的标签、打开模式、光标和滚动位置、最近关闭的标签。
+
+  - 会话文件在 IDE 状态目录下，按 project.id 区分（state.paths.session_file）
+  - 路径存为相对项目根目录，项目目录整体移动后仍能恢复
+  - 读写都经 file_io() 在后台完成；恢复时只创建当前标签的编辑器，
+    其余标签以休眠状态出现，第一次切过去时才创建（见 Workspace）
+
+用法
+----
+session = SessionService(workspace, parent)
+session.open(project.project_id, project_root)   # 项目打开后：读入并恢复
+session.close()                                   # 项目关闭 / 切换前：保存
+"""
+from __future__ import annotations
+
+import os
+
+from PySide6.QtCore import QObject
+
+from .file_io_service import file_io, read_json
+from ..state.paths import session_file
+
+
+SESSION_FORMAT = "CART_SESSION"
+SESSION_VERSION = 1
+
+
+def _absolute(root: str, rel: str) -> str:
+    return os.path.normpath(os.path.join(root, rel))
+
+
+def _existing(root: str, entries) -> list[dict]:
+    """会话里的标签项换成绝对路径，去掉格式不对的和磁盘上已不存在的"""
+    if not isinstance(entries, list):
+        return []
+    result = []
+    for e in entries:
+        if isinstance(e, dict) and isinstance(e.get("path"), str):
+            path = _absolute(root, e["path"])
+            if os.path.isfile(path):
+                result.append(dict(e, path=path))
+    return result
+
+
+def read_session(path: str, root: str) -> dict | None:
+    """
+    读取会话文件（在工作线程调用），返回 Workspace.restore_session() 的参数；
+    文件不存在或格式不对时返回 None。
+    """
+    try:
+        data = read_json(path)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(data, dict) or data.get("format") != SESSION_FORMAT
+            or data.get("version") != SESSION_VERSION):
+        return None
+    active = data.get("active")
+    return {
+        "tabs":   _existing(root, data.get("tabs")),
+        "active": _absolute(root, active) if isinstance(active, str) else None,
+        "closed": _existing(root, data.get("closed")),
+    }
+
+
+class SessionService(QObject):
+    """工作区会话的读写；workspace 需提供 session_state() / restore_session()"""
+
+    def __init__(self, workspace, parent=None):
+        super().__init__(parent)
+        self._workspace = workspace
+        self._root = ""
+        self._path = ""
+        self._generation = 0
+
+    # ── 公开 API ──────────────────────────────
+
+    @property
+    def is_open(self) -> bool:
+        return bool(self._path)
+
+    def open(self, project_id: str, project_root: str):
+        """记下当前项目，在后台读入它的会话，读到后恢复到工作区"""
+        self._generation += 1
+        self._root = os.path.abspath(project_root)
+        self._path = session_file(project_id, self._root)
+        generation = self._generation
+        req = file_io().call(self._path, read_session, self._path, self._root)
+        req.finished.connect(lambda state: self._on_loaded(generation, state))
+
+    def save(self):
+        """在后台写出当前会话，返回 IORequest；没有打开项目时返回 None"""
+        if not self._path:
+            return None
+        state = self._workspace.session_state()
+        data = {
+            "format":  SESSION_FORMAT,
+            "version": SESSION_VERSION,
+            "tabs":    self._to_relative(state["tabs"]),
+            "active":  self._relative(state["active"]) if state["active"] else None,
+            "closed":  self._to_relative(state["closed"]),
+        }
+        return file_io().write_json(self._path, data)
+
+    def close(self):
+        """保存并忘掉当前项目"""
+        self.save()
+        self._generation += 1
+        self._root = ""
+        self._path = ""
+
+    # ── 内部 ──────────────────────────────────
+
+    def _on_loaded(self, generation: int, state):
+        if generation != self._generation or state is None:
+            # 读完之前已经换了项目，或者还没有会话
+            return
+        self._workspace.restore_session(state)
+
+    def _relative(self, path: str) -> str | None:
+        """项目内文件的相对路径（以 / 分隔）；项目外的文件返回 None，不写入会话"""
+        try:
+            rel = os.path.relpath(path, self._root)
+        except ValueError:
+            # Windows 上不在同一个盘
+            return None
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return None
+        return rel.replace(os.sep, "/")
+
+    def _to_relative(self, entries: list[dict]) -> list[dict]:
+        result = []
+        for entry in entries:
+            rel = self._relative(entry["path"])
+            if rel is not None:
+                result.append(dict(entry, path=rel))
+        return result
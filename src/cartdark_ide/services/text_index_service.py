@@ -0,0 +1,555 @@
+"""
+CartDark IDE · services/text_index_service.py
+全文搜索用的三元组（trigram）索引。
+
+  - 为脚本 / JSON / .cart / .collection / .input_binding 文件记录其中出现过的
+    全部 3 字节片段（ASCII 转小写），倒排表为 三元组 → 有序文档号数组
+  - 搜索时先从查询中取出必须出现的字面片段，求倒排表交集得到候选文件，
+    只有候选文件需要读盘验证；短查询或取不出字面片段的正则不做筛选
+  - 索引保存在 .cartdark/local/ 下，打开项目时读入；之后按 WorkspaceIndex
+    的 files_changed 增量更新，只重新读取变化的文件
+  - 文件变化时旧文档号只做标记删除（数组保持有序、追加即可），
+    失效的文档号多于有效的时，在后台写回时一并压缩
+  - 所有读写都在一个后台线程里完成；查询在搜索线程中持锁进行，
+    未编入索引或索引已过期的文件一律视为候选，结果不会漏
+
+用法
+----
+index = TrigramIndex(workspace_index, parent)
+index.open(project_root)
+targets = index.narrow(files, "player", regex=False)   # 任意线程
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import re
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from .workspace_service import (
+    FileEntry, IndexDelta, INDEX_DIR,
+    KIND_SCRIPT, KIND_JSON, KIND_CART, KIND_COLLECTION, KIND_INPUT_BINDING,
+)
+
+
+TRIGRAM_FILE = "trigram_index.bin"
+TRIGRAM_VERSION = 1
+_MAGIC = b"CDTG"
+
+# 编入索引的文件类别
+INDEXED_KINDS = frozenset({
+    KIND_SCRIPT, KIND_JSON, KIND_CART, KIND_COLLECTION, KIND_INPUT_BINDING,
+})
+
+# 大于此大小的文件不编入索引（与搜索的上限一致）
+MAX_INDEXED_SIZE = 4 * 1024 * 1024
+
+# 失效文档号达到此数量且多于有效文档时压缩
+_COMPACT_MIN_DEAD = 256
+
+_SNIFF_BYTES = 8192
+
+
+# ──────────────────────────────────────────────
+# 三元组提取（可在任意线程调用）
+# ──────────────────────────────────────────────
+
+def trigrams_of(data: bytes) -> set[bytes]:
+    """一段字节中出现的全部三元组（ASCII 小写化）"""
+    low = data.lower()
+    return {low[i:i + 3] for i in range(len(low) - 2)}
+
+
+def _literal_trigrams(literal: str, ascii_only: bool) -> set[bytes]:
+    grams = trigrams_of(literal.encode("utf-8"))
+    if ascii_only:
+        # 不区分大小写时，非 ASCII 字符的大小写变体字节不同，不能用于筛选
+        grams = {g for g in grams if g.isascii()}
+    return grams
+
+
+_VERBOSE_FLAG = re.compile(r"\(\?[a-zA-Z]*x")
+_REGEX_ESCAPED_LITERAL = set(".^$*+?{}[]()|\\/-#&~ \"'`,:;<=>!@%")
+
+
+def regex_literals(pattern: str) -> list[str] | None:
+    """
+    正则中每个匹配都必然包含的字面片段。
+    顶层有分支（|）时返回 None；分组和字符类整体跳过，
+    被 ? * { 修饰的字符从片段中去掉。
+    """
+    if _VERBOSE_FLAG.search(pattern):
+        # 详细模式下空白和 # 注释不是字面字符
+        return None
+    runs: list[str] = []
+    cur: list[str] = []
+    i, n = 0, len(pattern)
+
+    def cut():
+        if cur:
+            runs.append("".join(cur))
+            cur.clear()
+
+    while i < n:
+        c = pattern[i]
+        if c == "\\" and i + 1 < n:
+            nxt = pattern[i + 1]
+            if nxt in _REGEX_ESCAPED_LITERAL:
+                cur.append(nxt)
+                i += 2
+            else:
+                cut()                   # \w \d \b \n \x41 \1 等
+                i = _skip_escape(pattern, i)
+            continue
+        if c == "|":
+            return None
+        if c in "?*{":
+            # 前一个字符可选
+            if cur:
+                cur.pop()
+            cut()
+            if c == "{":
+                close = pattern.find("}", i)
+                i = close + 1 if close != -1 else n
+                continue
+            i += 1
+            continue
+        if c == "+":
+            # 前一个字符至少出现一次，但之后可能重复，片段到此为止
+            cut()
+            i += 1
+            continue
+        if c == "(":
+            cut()
+            i = _skip_group(pattern, i)
+            continue
+        if c == "[":
+            cut()
+            i = _skip_class(pattern, i)
+            continue
+        if c in ".^$":
+            cut()
+            i += 1
+            continue
+        cur.append(c)
+        i += 1
+    cut()
+    return runs
+
+
+_OCTAL = "01234567"
+_DIGITS = "0123456789"
+
+
+def _skip_escape(pattern: str, i: int) -> int:
+    """pattern[i] 为反斜杠：返回整个转义（连同 \\x41、\\N{...}、\\101 等参数）之后的位置"""
+    n = len(pattern)
+    nxt = pattern[i + 1]
+    if nxt == "x":
+        return min(i + 4, n)
+    if nxt == "u":
+        return min(i + 6, n)
+    if nxt == "U":
+        return min(i + 10, n)
+    if nxt == "N" and i + 2 < n and pattern[i + 2] == "{":
+        close = pattern.find("}", i)
+        return close + 1 if close != -1 else n
+    if nxt == "0":
+        # \0 之后最多再跟两位八进制
+        j = i + 2
+        while j < n and j < i + 4 and pattern[j] in _OCTAL:
+            j += 1
+        return j
+    if nxt in _DIGITS:
+        # 三位八进制是字符转义，否则是一到两位的反向引用
+        if (i + 3 < n and nxt in _OCTAL
+                and pattern[i + 2] in _OCTAL and pattern[i + 3] in _OCTAL):
+            return i + 4
+        if i + 2 < n and pattern[i + 2] in _DIGITS:
+            return i + 3
+        return i + 2
+    return i + 2
+
+
+def _skip_group(pattern: str, i: int) -> int:
+    depth = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "[":
+            i = _skip_class(pattern, i)
+            continue
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+            if depth == 0:
+                i += 1
+                # 分组后的量词作用于整个分组，分组本来就已跳过
+                if i < n and pattern[i] in "?*+":
+                    i += 1
+                return i
+        i += 1
+    return n
+
+
+def _skip_class(pattern: str, i: int) -> int:
+    n = len(pattern)
+    i += 1
+    if i < n and pattern[i] == "^":
+        i += 1
+    if i < n and pattern[i] == "]":
+        i += 1
+    while i < n:
+        if pattern[i] == "\\":
+            i += 2
+            continue
+        if pattern[i] == "]":
+            i += 1
+            if i < n and pattern[i] in "?*+":
+                i += 1
+            return i
+        i += 1
+    return n
+
+
+def query_trigrams(text: str, regex: bool, case_sensitive: bool) -> set[bytes]:
+    """查询必须命中的三元组；空集表示无法筛选"""
+    if regex:
+        literals = regex_literals(text)
+        if literals is None:
+            return set()
+        # 正则可能带 (?i) 等内联标志，一律只用 ASCII 三元组
+        ascii_only = True
+    else:
+        literals = [text]
+        ascii_only = not case_sensitive
+    grams: set[bytes] = set()
+    for lit in literals:
+        grams |= _literal_trigrams(lit, ascii_only)
+    return grams
+
+
+# ──────────────────────────────────────────────
+# 持久化
+# ──────────────────────────────────────────────
+
+def _index_path(project_root: str) -> str:
+    return os.path.join(project_root, INDEX_DIR, TRIGRAM_FILE)
+
+
+def _read_u32(f) -> int:
+    raw = f.read(4)
+    if len(raw) != 4:
+        raise ValueError("truncated")
+    return struct.unpack("<I", raw)[0]
+
+
+def _load(project_root: str):
+    """读入索引文件；不存在、版本不符或损坏时返回 None"""
+    try:
+        with open(_index_path(project_root), "rb") as f:
+            if f.read(4) != _MAGIC or _read_u32(f) != TRIGRAM_VERSION:
+                return None
+            header = json.loads(f.read(_read_u32(f)).decode("utf-8"))
+            if header.get("byteorder") != sys.byteorder:
+                return None
+            docs = {rel: (doc_id, size, mtime_ns)
+                    for doc_id, rel, size, mtime_ns in header["docs"]}
+            postings: dict[bytes, array] = {}
+            for _ in range(_read_u32(f)):
+                key = f.read(3)
+                ids = array("I")
+                count = _read_u32(f)
+                ids.frombytes(f.read(count * ids.itemsize))
+                if len(key) != 3 or len(ids) != count:
+                    return None
+                postings[key] = ids
+            return docs, postings, header["next_id"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save(project_root: str, docs: dict, postings: dict, next_id: int) -> None:
+    folder = os.path.join(project_root, INDEX_DIR)
+    path = _index_path(project_root)
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "next_id": next_id,
+        "docs": [[doc_id, rel, size, mtime_ns]
+                 for rel, (doc_id, size, mtime_ns) in docs.items()],
+    }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    try:
+        os.makedirs(folder, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC)
+            f.write(struct.pack("<II", TRIGRAM_VERSION, len(header)))
+            f.write(header)
+            f.write(struct.pack("<I", len(postings)))
+            for key, ids in postings.items():
+                f.write(key)
+                f.write(struct.pack("<I", len(ids)))
+                ids.tofile(f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _read_indexable(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if b"\0" in data[:_SNIFF_BYTES]:
+        return None
+    return data
+
+
+def _contains(ids: array, doc_id: int) -> bool:
+    i = bisect_left(ids, doc_id)
+    return i < len(ids) and ids[i] == doc_id
+
+
+# ──────────────────────────────────────────────
+# 服务
+# ──────────────────────────────────────────────
+
+class TrigramIndex(QObject):
+    """
+    三元组索引服务。
+
+    信号
+    ----
+    updated(int, int)
+        一批文件编入索引后发出：(已编入的文件数, 待编入的文件数)。
+    """
+
+    updated = Signal(int, int)
+
+    SAVE_DELAY_MS = 5000
+
+    def __init__(self, workspace_index, parent=None):
+        super().__init__(parent)
+        self._workspace = workspace_index
+        self._root = ""
+        self._generation = 0
+        # 以下数据只在后台线程中修改，修改和查询都持 _lock
+        self._lock = threading.Lock()
+        self._docs: dict[str, tuple[int, int, int]] = {}   # rel → (文档号, size, mtime_ns)
+        self._postings: dict[bytes, array] = {}
+        self._next_id = 0
+        self._dead = 0
+        self._dirty = False
+
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        threading.Thread(target=self._worker, daemon=True,
+                         name="trigram-index").start()
+
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(self.SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self._request_save)
+        self.updated.connect(self._on_updated)
+
+        workspace_index.ready.connect(self._on_ready)
+        workspace_index.files_changed.connect(self._on_files_changed)
+
+    # ── 生命周期 ──────────────────────────────
+
+    def open(self, project_root: str):
+        """读入项目的索引文件；WorkspaceIndex 就绪后核对"""
+        self.close()
+        self._root = os.path.abspath(project_root)
+        self._generation += 1
+        self._jobs.put((self._generation, "load", self._root))
+
+    def close(self):
+        """写回索引并清空"""
+        if self._root and self._save_timer.isActive():
+            self._save_timer.stop()
+            self._request_save()
+        self._generation += 1
+        self._jobs.put((self._generation, "clear", None))
+        self._root = ""
+
+    # ── 查询 ──────────────────────────────────
+
+    def narrow(self, files: list[FileEntry], text: str, regex: bool = False,
+               case_sensitive: bool = False) -> list[FileEntry]:
+        """
+        从 files 中去掉不可能命中的文件（保持原顺序）。
+        可在任意线程调用；未编入或已过期的文件保留。
+        """
+        grams = query_trigrams(text, regex, case_sensitive)
+        if not grams:
+            return files
+        with self._lock:
+            matched = self._match(grams)
+            docs = self._docs
+            out = []
+            for f in files:
+                doc = docs.get(f.rel)
+                if (doc is None or doc[1] != f.size or doc[2] != f.mtime_ns
+                        or doc[0] in matched):
+                    out.append(f)
+            return out
+
+    def _match(self, grams: set[bytes]) -> set[int]:
+        lists = []
+        for g in grams:
+            ids = self._postings.get(g)
+            if ids is None:
+                return set()
+            lists.append(ids)
+        lists.sort(key=len)
+        matched = set(lists[0])
+        for ids in lists[1:]:
+            if not matched:
+                break
+            matched = {i for i in matched if _contains(ids, i)}
+        return matched
+
+    # ── WorkspaceIndex 事件（UI 线程）──────────
+
+    def _on_ready(self):
+        if self._root and self._workspace.project_root == self._root:
+            self._jobs.put((self._generation, "sync",
+                            [f for f in self._workspace.files() if self._wants(f)]))
+
+    def _on_files_changed(self, delta: IndexDelta):
+        if not self._root or self._workspace.project_root != self._root:
+            return
+        changed = []
+        removed = list(delta.removed)
+        for rel in delta.added + delta.modified:
+            entry = self._workspace.get(rel)
+            if entry is not None and self._wants(entry):
+                changed.append(entry)
+            else:
+                removed.append(rel)
+        if changed or removed:
+            self._jobs.put((self._generation, "update", (changed, removed)))
+
+    @staticmethod
+    def _wants(entry: FileEntry) -> bool:
+        return entry.kind in INDEXED_KINDS and entry.size <= MAX_INDEXED_SIZE
+
+    def _on_updated(self, _done: int, _pending: int):
+        self._save_timer.start()
+
+    def _request_save(self):
+        self._jobs.put((self._generation, "save", self._root))
+
+    # ── 后台线程 ──────────────────────────────
+
+    def _worker(self):
+        while True:
+            generation, job, arg = self._jobs.get()
+            if job == "clear":
+                with self._lock:
+                    self._reset()
+                continue
+            if job == "save":
+                # close() 排入保存后立即换代，保存仍要写出旧项目的索引
+                self._save_job(arg)
+                continue
+            if generation != self._generation:
+                continue
+            if job == "load":
+                self._load_job(arg)
+            elif job == "sync":
+                self._sync_job(generation, arg)
+            elif job == "update":
+                self._update_job(generation, *arg)
+
+    def _reset(self):
+        self._docs = {}
+        self._postings = {}
+        self._next_id = 0
+        self._dead = 0
+        self._dirty = False
+
+    def _load_job(self, root: str):
+        loaded = _load(root)
+        with self._lock:
+            self._reset()
+            if loaded is not None:
+                self._docs, self._postings, self._next_id = loaded
+                live = {d[0] for d in self._docs.values()}
+                self._dead = self._next_id - len(live)
+
+    def _sync_job(self, generation: int, entries: list[FileEntry]):
+        """与完整文件清单核对：编入缺失 / 过期的文件，移除已不存在的"""
+        wanted = {e.rel for e in entries}
+        with self._lock:
+            gone = [rel for rel in self._docs if rel not in wanted]
+            stale = [e for e in entries
+                     if (doc := self._docs.get(e.rel)) is None
+                     or doc[1] != e.size or doc[2] != e.mtime_ns]
+        self._update_job(generation, stale, gone)
+
+    def _update_job(self, generation: int, changed: list[FileEntry], removed: list[str]):
+        root = self._root
+        with self._lock:
+            for rel in removed:
+                if self._docs.pop(rel, None) is not None:
+                    self._dead += 1
+                    self._dirty = True
+        if removed and not changed:
+            self.updated.emit(0, 0)
+        total = len(changed)
+        for n, entry in enumerate(changed, 1):
+            if generation != self._generation:
+                return
+            data = _read_indexable(os.path.join(root, *entry.rel.split("/")))
+            grams = trigrams_of(data) if data is not None else None
+            with self._lock:
+                if self._docs.pop(entry.rel, None) is not None:
+                    self._dead += 1
+                self._dirty = True
+                if grams is None:
+                    continue
+                doc_id = self._next_id
+                self._next_id += 1
+                self._docs[entry.rel] = (doc_id, entry.size, entry.mtime_ns)
+                postings = self._postings
+                for g in grams:
+                    ids = postings.get(g)
+                    if ids is None:
+                        postings[g] = array("I", (doc_id,))
+                    else:
+                        ids.append(doc_id)
+            if n % 64 == 0 or n == total:
+                self.updated.emit(n, total - n)
+
+    def _save_job(self, root: str):
+        with self._lock:
+            if not self._dirty or not root:
+                return
+            if self._dead >= _COMPACT_MIN_DEAD and self._dead > len(self._docs):
+                self._compact()
+            _save(root, self._docs, self._postings, self._next_id)
+            self._dirty = False
+
+    def _compact(self):
+        """去掉倒排表中失效的文档号（调用方持有 _lock）"""
+        live = {d[0] for d in self._docs.values()}
+        postings = {}
+        for key, ids in self._postings.items():
+            kept = array("I", (i for i in ids if i in live))
+            if kept:
+                postings[key] = kept
+        self._postings = postings
+        self._dead = 0
@@ -0,0 +1,493 @@
+"""
+CartDark IDE · services/workspace_service.py
+项目文件索引：一份权威的、增量维护的项目文件清单。
+
+  - 每个文件记录相对路径、大小、mtime、类别，以及会被打进哪些 pack chunk
+  - 打开项目时先读入 .cartdark/local/ 下上次保存的索引，立即可用；
+    随后在后台线程遍历磁盘核对，差异以增量发出
+  - 核对完成后监视全部目录（FsWatchService），新增 / 删除 / 重命名 /
+    原子替换增量更新；IDE 原地写入的文件由调用方经 refresh_paths() 告知
+  - pack.json 变化时只重新分类 chunk 归属，不重新遍历磁盘
+  - 修改后延迟写回缓存文件（临时文件 + os.replace）
+
+快速打开、全局搜索（及其三元组索引）和 pack 校验（pack_sync.validate）
+都从这里取文件清单，不再各自遍历磁盘；资源树按需扫描展开的目录，
+但与索引共用同一个目录监视器（watcher），不再单独监视。
+
+用法
+----
+index = WorkspaceIndex(parent)
+index.ready.connect(...)
+index.open(project_root)
+for f in index.files():
+    f.rel, f.size, f.kind, f.chunks
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from .fs_watch_service import (
+    FsWatchService, FsDelta, ADDED, REMOVED, RENAMED, MODIFIED, should_skip,
+)
+
+
+# 索引缓存位置（相对项目根；.cartdark/local/ 已被脚手架的 .gitignore 忽略）
+INDEX_DIR = os.path.join(".cartdark", "local")
+INDEX_FILE = "workspace_index.json"
+INDEX_VERSION = 1
+
+
+# ──────────────────────────────────────────────
+# 文件类别
+# ──────────────────────────────────────────────
+
+KIND_SCRIPT = "script"
+KIND_JSON = "json"
+KIND_CART = "cart"
+KIND_COLLECTION = "collection"
+KIND_INPUT_BINDING = "input_binding"
+KIND_IMAGE = "image"
+KIND_AUDIO = "audio"
+KIND_TEXT = "text"
+KIND_OTHER = "other"
+
+_EXT_KIND: dict[str, str] = {
+    ".lua": KIND_SCRIPT,
+    ".json": KIND_JSON,
+    ".cart": KIND_CART,
+    ".collection": KIND_COLLECTION,
+    ".input_binding": KIND_INPUT_BINDING,
+    ".png": KIND_IMAGE, ".jpg": KIND_IMAGE, ".jpeg": KIND_IMAGE,
+    ".bmp": KIND_IMAGE, ".gif": KIND_IMAGE,
+    ".wav": KIND_AUDIO, ".ogg": KIND_AUDIO, ".mp3": KIND_AUDIO,
+    ".md": KIND_TEXT, ".txt": KIND_TEXT, ".csv": KIND_TEXT,
+}
+
+# 可以按文本打开 / 搜索的类别
+TEXT_KINDS = frozenset({
+    KIND_SCRIPT, KIND_JSON, KIND_CART, KIND_COLLECTION, KIND_INPUT_BINDING, KIND_TEXT,
+})
+
+
+def file_kind(name: str) -> str:
+    if name == ".gitignore":
+        return KIND_TEXT
+    return _EXT_KIND.get(os.path.splitext(name)[1].lower(), KIND_OTHER)
+
+
+# ──────────────────────────────────────────────
+# 数据
+# ──────────────────────────────────────────────
+
+class FileEntry:
+    """一个项目文件。大项目有上万条，使用 __slots__"""
+    __slots__ = ("rel", "size", "mtime_ns", "kind", "chunks")
+
+    def __init__(self, rel: str, size: int, mtime_ns: int, kind: str,
+                 chunks: tuple[int, ...] = ()):
+        self.rel = rel                  # 相对项目根，/ 分隔
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.kind = kind
+        self.chunks = chunks            # 所属 chunk 在 pack.json 中的下标
+
+    @property
+    def name(self) -> str:
+        return self.rel.rpartition("/")[2]
+
+    def same_stat(self, other: "FileEntry") -> bool:
+        return self.size == other.size and self.mtime_ns == other.mtime_ns
+
+
+@dataclass
+class IndexDelta:
+    """一批索引变化（相对路径）；重命名表现为一删一增"""
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    modified: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+# ──────────────────────────────────────────────
+# 遍历与分类（可在任意线程调用）
+# ──────────────────────────────────────────────
+
+def _pack_stamp(project_root: str) -> list[int] | None:
+    try:
+        st = os.stat(os.path.join(project_root, "pack.json"))
+    except OSError:
+        return None
+    return [st.st_ino, st.st_mtime_ns, st.st_size]
+
+
+def _make_matcher(project_root: str):
+    """当前 pack.json 的 PackMatcher；没有或无法解析时返回 None"""
+    from ..project.io import pack_from_dict
+    from ..project.pack_document import document_for
+    from ..project.pack_match import PackMatcher
+    doc = document_for(project_root)
+    if doc is None:
+        return None
+    try:
+        return PackMatcher(pack_from_dict(doc.data()).chunks)
+    except Exception:
+        return None
+
+
+def _classify(matcher, rel: str) -> tuple[int, ...]:
+    return matcher.classify(rel) if matcher is not None else ()
+
+
+def _walk(project_root: str, rel_dir: str, matcher,
+          previous: dict[str, FileEntry] | None):
+    """
+    遍历 rel_dir（"" 为项目根）下的全部文件。
+    返回 ({rel: FileEntry}, {目录绝对路径: scan_dir 格式的条目})。
+    previous 中大小和 mtime 未变的文件沿用其 chunk 归属。
+    """
+    files: dict[str, FileEntry] = {}
+    dirs: dict[str, list[tuple[str, bool, int]]] = {}
+    start = os.path.join(project_root, rel_dir) if rel_dir else project_root
+    stack = [(start, rel_dir)]
+    while stack:
+        abs_dir, rel = stack.pop()
+        listing = []
+        try:
+            it = os.scandir(abs_dir)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if should_skip(entry.name):
+                    continue
+                child = f"{rel}/{entry.name}" if rel else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        listing.append((entry.name, True, entry.inode()))
+                        stack.append((entry.path, child))
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                listing.append((entry.name, False, st.st_ino))
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                old = previous.get(child) if previous is not None else None
+                if old is not None and old.size == st.st_size and old.mtime_ns == st.st_mtime_ns:
+                    files[child] = old
+                else:
+                    files[child] = FileEntry(child, st.st_size, st.st_mtime_ns,
+                                             file_kind(entry.name), _classify(matcher, child))
+        dirs[abs_dir] = listing
+    return files, dirs
+
+
+def _load_cache(project_root: str) -> tuple[dict[str, FileEntry], list[int] | None]:
+    path = os.path.join(project_root, INDEX_DIR, INDEX_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        if raw.get("version") != INDEX_VERSION:
+            return {}, None
+        files = {}
+        for rel, size, mtime_ns, kind, chunks in raw.get("files", []):
+            files[rel] = FileEntry(rel, size, mtime_ns, kind, tuple(chunks))
+        return files, raw.get("pack")
+    except (OSError, ValueError, TypeError):
+        return {}, None
+
+
+def _save_cache(project_root: str, files: list[FileEntry], stamp) -> None:
+    folder = os.path.join(project_root, INDEX_DIR)
+    path = os.path.join(folder, INDEX_FILE)
+    raw = {
+        "version": INDEX_VERSION,
+        "pack": stamp,
+        "files": [[f.rel, f.size, f.mtime_ns, f.kind, list(f.chunks)] for f in files],
+    }
+    try:
+        os.makedirs(folder, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(raw, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+# ──────────────────────────────────────────────
+# 服务
+# ──────────────────────────────────────────────
+
+class WorkspaceIndex(QObject):
+    """
+    项目文件索引服务。
+
+    信号
+    ----
+    ready()
+        索引首次可用（读入缓存，或没有缓存时首次遍历完成）。
+    files_changed(IndexDelta)
+        索引内容变化（后台核对的差异、磁盘增量、pack 归属重新分类）。
+    """
+
+    ready = Signal()
+    files_changed = Signal(object)   # IndexDelta
+
+    # 内部：后台线程 → UI 线程
+    _cache_loaded = Signal(int, object, object)       # (代次, files, pack 戳)
+    _walked = Signal(int, str, object, object)        # (代次, 子树, files, dirs)
+
+    SAVE_DELAY_MS = 2000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._root = ""
+        self._files: dict[str, FileEntry] = {}
+        self._generation = 0
+        self._is_ready = False
+        self._matcher = None
+        self._pack = None                 # 分类所依据的 pack.json 戳
+        self._watcher = FsWatchService(self)
+        self._watcher.changed.connect(self._on_fs_changed)
+        self._cache_loaded.connect(self._on_cache_loaded)
+        self._walked.connect(self._on_walked)
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(self.SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self._save_async)
+
+    # ── 生命周期 ──────────────────────────────
+
+    def open(self, project_root: str):
+        """打开项目：读缓存并在后台核对"""
+        self.close()
+        self._root = os.path.abspath(project_root)
+        self._matcher = _make_matcher(self._root)
+        self._generation += 1
+        threading.Thread(target=self._open_worker,
+                         args=(self._generation, self._root), daemon=True).start()
+
+    def close(self):
+        """写回缓存并清空索引"""
+        if self._root and self._save_timer.isActive():
+            self._save_timer.stop()
+            _save_cache(self._root, list(self._files.values()), self._pack)
+        self._generation += 1
+        self._watcher.clear()
+        self._files = {}
+        self._root = ""
+        self._is_ready = False
+        self._matcher = None
+        self._pack = None
+
+    # ── 查询 ──────────────────────────────────
+
+    @property
+    def project_root(self) -> str:
+        return self._root
+
+    @property
+    def is_ready(self) -> bool:
+        return self._is_ready
+
+    def files(self) -> list[FileEntry]:
+        """当前全部文件（副本，可交给后台线程）"""
+        return list(self._files.values())
+
+    def get(self, rel: str) -> FileEntry | None:
+        return self._files.get(rel)
+
+    def chunks_of(self, rel: str) -> tuple[int, ...]:
+        entry = self._files.get(rel)
+        return entry.chunks if entry is not None else ()
+
+    def is_packed(self, rel: str) -> bool:
+        return bool(self.chunks_of(rel))
+
+    @property
+    def watcher(self) -> FsWatchService:
+        """项目目录的监视服务；资源树共用它，不再另外监视"""
+        return self._watcher
+
+    def chunks_current(self) -> bool:
+        """各文件的 chunk 归属是否按磁盘上当前的 pack.json 计算"""
+        return self._is_ready and self._pack == _pack_stamp(self._root)
+
+    def rel_path(self, abs_path: str) -> str:
+        return os.path.relpath(abs_path, self._root).replace(os.sep, "/")
+
+    def abs_path(self, rel: str) -> str:
+        return os.path.join(self._root, *rel.split("/"))
+
+    # ── 更新 ──────────────────────────────────
+
+    def refresh_paths(self, abs_paths):
+        """重新 stat 这些文件（IDE 原地写入后调用）"""
+        if not self._root:
+            return
+        delta = IndexDelta()
+        for p in abs_paths:
+            self._restat(self.rel_path(os.path.abspath(p)), delta)
+        self._commit(delta)
+
+    # ── 内部：后台加载 ────────────────────────
+
+    def _open_worker(self, generation: int, root: str):
+        cached, stamp = _load_cache(root)
+        if cached:
+            self._cache_loaded.emit(generation, cached, stamp)
+        # pack.json 与缓存时一致才沿用缓存中的 chunk 归属
+        current = _pack_stamp(root)
+        previous = cached if cached and stamp == current else None
+        files, dirs = _walk(root, "", _make_matcher(root), previous)
+        self._walked.emit(generation, "", files, dirs)
+
+    def _on_cache_loaded(self, generation: int, files: dict, stamp):
+        if generation != self._generation:
+            return
+        self._files = files
+        self._pack = stamp
+        self._is_ready = True
+        self.ready.emit()
+
+    def _on_walked(self, generation: int, rel_dir: str, files: dict, dirs: dict):
+        if generation != self._generation:
+            return
+        delta = IndexDelta()
+        if rel_dir:
+            # 新增的子目录：合并进索引
+            for rel, entry in files.items():
+                old = self._files.get(rel)
+                if old is None:
+                    delta.added.append(rel)
+                elif not old.same_stat(entry):
+                    delta.modified.append(rel)
+                self._files[rel] = entry
+        else:
+            old_files = self._files
+            for rel, entry in files.items():
+                old = old_files.get(rel)
+                if old is None:
+                    delta.added.append(rel)
+                elif old is not entry and not old.same_stat(entry):
+                    delta.modified.append(rel)
+            delta.removed = [rel for rel in old_files if rel not in files]
+            self._files = files
+            self._matcher = _make_matcher(self._root)
+            self._pack = _pack_stamp(self._root)
+        for d, listing in dirs.items():
+            self._watcher.watch_dir(d, listing)
+        if not self._is_ready:
+            self._is_ready = True
+            self.ready.emit()
+            self._schedule_save()
+            if not rel_dir:
+                return
+        self._commit(delta)
+
+    # ── 内部：增量 ────────────────────────────
+
+    def _on_fs_changed(self, deltas: list[FsDelta]):
+        delta = IndexDelta()
+        for d in deltas:
+            rel = self.rel_path(d.path)
+            if d.kind == ADDED:
+                if d.is_dir:
+                    self._walk_subtree(rel)
+                else:
+                    self._restat(rel, delta)
+            elif d.kind == REMOVED:
+                self._drop(rel, d.is_dir, delta)
+            elif d.kind == RENAMED:
+                self._move(rel, self.rel_path(d.new_path), d.is_dir, delta)
+            elif d.kind == MODIFIED:
+                self._restat(rel, delta)
+        self._commit(delta)
+
+    def _walk_subtree(self, rel_dir: str):
+        generation, root, matcher = self._generation, self._root, self._matcher
+
+        def run():
+            files, dirs = _walk(root, rel_dir, matcher, None)
+            self._walked.emit(generation, rel_dir, files, dirs)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _restat(self, rel: str, delta: IndexDelta):
+        try:
+            st = os.stat(self.abs_path(rel))
+        except OSError:
+            if self._files.pop(rel, None) is not None:
+                delta.removed.append(rel)
+            return
+        if not os.path.isfile(self.abs_path(rel)) or should_skip(rel.rpartition("/")[2]):
+            return
+        old = self._files.get(rel)
+        if old is not None and old.size == st.st_size and old.mtime_ns == st.st_mtime_ns:
+            return
+        self._files[rel] = FileEntry(rel, st.st_size, st.st_mtime_ns,
+                                     file_kind(rel.rpartition("/")[2]),
+                                     _classify(self._matcher, rel))
+        (delta.added if old is None else delta.modified).append(rel)
+
+    def _under(self, rel_dir: str) -> list[str]:
+        prefix = rel_dir + "/"
+        return [rel for rel in self._files if rel.startswith(prefix)]
+
+    def _drop(self, rel: str, is_dir: bool, delta: IndexDelta):
+        for r in (self._under(rel) if is_dir else [rel]):
+            if self._files.pop(r, None) is not None:
+                delta.removed.append(r)
+
+    def _move(self, old: str, new: str, is_dir: bool, delta: IndexDelta):
+        pairs = [(r, new + r[len(old):]) for r in self._under(old)] if is_dir else [(old, new)]
+        for src, dst in pairs:
+            entry = self._files.pop(src, None)
+            if entry is None:
+                continue
+            # chunk 归属取决于路径，需要重新分类
+            self._files[dst] = FileEntry(dst, entry.size, entry.mtime_ns,
+                                         file_kind(dst.rpartition("/")[2]),
+                                         _classify(self._matcher, dst))
+            delta.removed.append(src)
+            delta.added.append(dst)
+
+    def _reclassify(self, delta: IndexDelta):
+        """pack.json 变化：重新计算全部文件的 chunk 归属"""
+        self._matcher = _make_matcher(self._root)
+        self._pack = _pack_stamp(self._root)
+        for rel, entry in self._files.items():
+            chunks = _classify(self._matcher, rel)
+            if chunks != entry.chunks:
+                entry.chunks = chunks
+                delta.modified.append(rel)
+
+    def _commit(self, delta: IndexDelta):
+        if "pack.json" in delta.modified or "pack.json" in delta.added \
+                or "pack.json" in delta.removed:
+            self._reclassify(delta)
+        if delta:
+            self.files_changed.emit(delta)
+            self._schedule_save()
+
+    # ── 内部：持久化 ──────────────────────────
+
+    def _schedule_save(self):
+        if not self._save_timer.isActive():
+            self._save_timer.start()
+
+    def _save_async(self):
+        if not self._root:
+            return
+        # 序列化上万条记录放到后台线程，UI 线程只复制列表
+        threading.Thread(target=_save_cache,
+                         args=(self._root, list(self._files.values()), self._pack),
+                         daemon=True).start()
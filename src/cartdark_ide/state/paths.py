@@ -0,0 +1,52 @@
+"""
+CartDark IDE · state/paths.py
+IDE 自身（与项目无关）的状态目录。
+
+  - 位于系统的用户数据目录下，与 SettingsStore 的 QSettings 使用同一组
+    公司名/应用名，主窗口未设置 applicationName 时也不会落到别处
+  - 存放可重建的缓存和各项目的工作区会话（打开的标签）；
+    删除整个目录不影响任何设置
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+
+from PySide6.QtCore import QStandardPaths
+
+
+_ORG = "CartDark"
+_APP = "CartDark IDE"
+
+
+def state_dir() -> str:
+    """IDE 状态目录（按需创建）"""
+    base = QStandardPaths.writableLocation(QStandardPaths.GenericDataLocation)
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".local", "share")
+    path = os.path.join(base, _ORG, _APP)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cache_dir(name: str) -> str:
+    """状态目录下名为 name 的缓存子目录（按需创建）"""
+    path = os.path.join(state_dir(), "cache", name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def session_file(project_id: str, project_root: str) -> str:
+    """
+    项目的工作区会话文件路径（目录按需创建）。
+    按 project.id 区分，项目目录移动后会话仍然有效；
+    没有 id（或 id 不能用作文件名）时退回到项目根目录路径的哈希。
+    """
+    if re.fullmatch(r"[\w-]{1,64}", project_id or ""):
+        key = project_id
+    else:
+        key = hashlib.sha1(os.path.abspath(project_root).encode("utf-8")).hexdigest()
+    path = os.path.join(state_dir(), "sessions")
+    os.makedirs(path, exist_ok=True)
+    return os.path.join(path, f"{key}.json")
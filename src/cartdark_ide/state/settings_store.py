@@ -14,6 +14,7 @@ class SettingsStore:
 
     # ── key 常量 ──────────────────────────────
     KEY_LAST_PROJECT_LOCATION = "project/last_location"
+    KEY_MAX_LIVE_EDITORS      = "editor/max_live_editors"
     # 后续可在这里继续添加，例如：
     # KEY_THEME = "ui/theme"
     # KEY_RECENT_PROJECTS = "project/recent"
@@ -42,4 +43,18 @@ class SettingsStore:
     @last_project_location.setter
     def last_project_location(self, path: str) -> None:
         self._q.setValue(self.KEY_LAST_PROJECT_LOCATION, path)
-        self._q.sync()
\ No newline at end of file
+        self._q.sync()
+
+    @property
+    def max_live_editors(self) -> int:
+        """同时保留的编辑器个数，超出的后台标签会休眠（见 Workspace）"""
+        try:
+            value = int(self._q.value(self.KEY_MAX_LIVE_EDITORS, 12))
+        except (TypeError, ValueError):
+            value = 12
+        return max(value, 1)
+
+    @max_live_editors.setter
+    def max_live_editors(self, count: int) -> None:
+        self._q.setValue(self.KEY_MAX_LIVE_EDITORS, max(int(count), 1))
+        self._q.sync()
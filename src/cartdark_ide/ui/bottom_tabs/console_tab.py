@@ -53,4 +53,8 @@ class ConsoleTab(QWidget):
         self.console_text = QTextEdit()
         self.console_text.setReadOnly(True)
         # 移除硬编码的背景色，使用主题默认颜色
-        self.layout.addWidget(self.console_text)
\ No newline at end of file
+        self.layout.addWidget(self.console_text)
+
+    def append_line(self, text: str):
+        """追加一行输出"""
+        self.console_text.append(text)
\ No newline at end of file
@@ -0,0 +1,579 @@
+"""
+CartDark IDE · ui/bottom_tabs/search_results_tab.py
+「搜索结果」标签：在文件中查找（⌘⇧F）。
+
+  - 输入停顿 SEARCH_DELAY_MS 后发起搜索；输入或选项一变，进行中的搜索立即取消
+  - 结果模型为两层（文件 → 命中行）的 QAbstractItemModel，命中按批插入；
+    视图使用统一行高，只绘制可见行，上万条命中也不卡
+  - 替换模式：替换预览在命中行第一次被绘制（即展开该文件）时才计算并缓存；
+    「全部替换」一次处理所有文件——已打开的文件经编辑器文档替换（可撤销），
+    其余文件在后台批量写入（临时文件 + 改名）
+"""
+from __future__ import annotations
+
+import os
+import re
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QToolButton, QLabel,
+    QTreeView, QStyledItemDelegate, QStyle, QAbstractItemView, QMessageBox,
+)
+from PySide6.QtCore import (
+    Qt, Signal, QTimer, QAbstractItemModel, QModelIndex, QRect,
+)
+from PySide6.QtGui import QColor, QFont, QFontMetrics
+
+from ..theme import theme
+from ...services.search_service import (
+    SearchService, SearchQuery, SearchHit, compile_query,
+)
+
+
+# 输入停顿多久后开始搜索
+SEARCH_DELAY_MS = 200
+
+
+class _FileGroup:
+    """一个文件的命中"""
+    __slots__ = ("rel", "hits", "row", "previews")
+
+    def __init__(self, rel: str, row: int):
+        self.rel = rel
+        self.hits: list[SearchHit] = []
+        self.row = row
+        self.previews: dict[int, str | None] = {}   # 命中行号 → 替换文本
+
+
+class SearchResultsModel(QAbstractItemModel):
+    """
+    搜索结果模型：顶层为文件，子项为命中。
+    顶层索引的 internalPointer 为模型自身，子项的为所属 _FileGroup。
+    """
+
+    HIT_ROLE = Qt.UserRole + 1
+    PREVIEW_ROLE = Qt.UserRole + 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._groups: list[_FileGroup] = []
+        self._by_rel: dict[str, _FileGroup] = {}
+        self._hit_count = 0
+        self._pattern: re.Pattern | None = None
+        self._replacement: str | None = None
+        self._regex = False
+
+    # ── 公开 API ──────────────────────────────
+
+    @property
+    def hit_count(self) -> int:
+        return self._hit_count
+
+    @property
+    def file_count(self) -> int:
+        return len(self._groups)
+
+    def rels(self) -> list[str]:
+        return [g.rel for g in self._groups]
+
+    def set_replacement(self, pattern: re.Pattern | None, replacement: str | None,
+                        regex: bool):
+        """设置替换预览；replacement 为 None 表示不在替换模式"""
+        self._pattern = pattern
+        self._replacement = replacement
+        self._regex = regex
+        # 只清缓存；视图重绘可见行时再按需取 PREVIEW_ROLE
+        for group in self._groups:
+            group.previews.clear()
+
+    def clear(self):
+        self.beginResetModel()
+        self._groups = []
+        self._by_rel = {}
+        self._hit_count = 0
+        self.endResetModel()
+
+    def add_hits(self, hits: list[SearchHit]):
+        """追加一批命中：已有文件在其下追加行，新文件追加到末尾"""
+        new_groups: list[_FileGroup] = []
+        new_rels: set[str] = set()
+        appended: dict[str, list[SearchHit]] = {}
+        for hit in hits:
+            group = self._by_rel.get(hit.rel)
+            if group is None:
+                group = _FileGroup(hit.rel, len(self._groups) + len(new_groups))
+                self._by_rel[hit.rel] = group
+                new_groups.append(group)
+                new_rels.add(hit.rel)
+            if hit.rel in new_rels:
+                group.hits.append(hit)
+            else:
+                appended.setdefault(hit.rel, []).append(hit)
+        self._hit_count += len(hits)
+
+        for rel, more in appended.items():
+            group = self._by_rel[rel]
+            first = len(group.hits)
+            self.beginInsertRows(self._group_index(group), first, first + len(more) - 1)
+            group.hits.extend(more)
+            self.endInsertRows()
+        if new_groups:
+            first = len(self._groups)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_groups) - 1)
+            self._groups.extend(new_groups)
+            self.endInsertRows()
+            # 文件行的数量标注
+            self.dataChanged.emit(self._group_index(new_groups[0]),
+                                  self._group_index(new_groups[-1]))
+        for rel in appended:
+            idx = self._group_index(self._by_rel[rel])
+            self.dataChanged.emit(idx, idx)
+
+    def hit_at(self, index: QModelIndex) -> SearchHit | None:
+        group = self._group_of_child(index)
+        return group.hits[index.row()] if group is not None else None
+
+    def rel_at(self, index: QModelIndex) -> str:
+        if not index.isValid():
+            return ""
+        group = self._group_of_child(index)
+        if group is not None:
+            return group.rel
+        return self._groups[index.row()].rel
+
+    # ── QAbstractItemModel ────────────────────
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if column != 0:
+            return QModelIndex()
+        if not parent.isValid():
+            if 0 <= row < len(self._groups):
+                return self.createIndex(row, 0, self)
+            return QModelIndex()
+        if parent.internalPointer() is self:
+            group = self._groups[parent.row()]
+            if 0 <= row < len(group.hits):
+                return self.createIndex(row, 0, group)
+        return QModelIndex()
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        group = self._group_of_child(index)
+        return self._group_index(group) if group is not None else QModelIndex()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self._groups)
+        if parent.internalPointer() is self:
+            return len(self._groups[parent.row()].hits)
+        return 0
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        group = self._group_of_child(index)
+        if group is not None:
+            hit = group.hits[index.row()]
+            if role == Qt.DisplayRole:
+                return hit.text
+            if role == self.HIT_ROLE:
+                return hit
+            if role == self.PREVIEW_ROLE:
+                return self._preview(group, index.row())
+            return None
+        group = self._groups[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{group.rel}  ({len(group.hits)})"
+        if role == Qt.ToolTipRole:
+            return group.rel
+        return None
+
+    # ── 内部 ──────────────────────────────────
+
+    def _preview(self, group: _FileGroup, row: int) -> str | None:
+        if self._replacement is None or self._pattern is None:
+            return None
+        if row in group.previews:
+            return group.previews[row]
+        hit = group.hits[row]
+        preview = None
+        m = self._pattern.match(hit.text, hit.col)
+        if m is not None:
+            try:
+                preview = m.expand(self._replacement) if self._regex else self._replacement
+            except (re.error, IndexError):
+                preview = None
+        group.previews[row] = preview
+        return preview
+
+    def _group_of_child(self, index: QModelIndex) -> _FileGroup | None:
+        if not index.isValid():
+            return None
+        ptr = index.internalPointer()
+        return ptr if isinstance(ptr, _FileGroup) else None
+
+    def _group_index(self, group: _FileGroup) -> QModelIndex:
+        return self.createIndex(group.row, 0, self)
+
+
+class _HitDelegate(QStyledItemDelegate):
+    """命中行：行号（次要色）+ 行内容，命中部分加底色"""
+
+    def paint(self, painter, option, index):
+        hit = index.data(SearchResultsModel.HIT_ROLE)
+        if hit is None:
+            super().paint(painter, option, index)
+            return
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, QColor(theme.BG_SELECTED))
+        font = QFont(option.font)
+        fm = QFontMetrics(font)
+        painter.setFont(font)
+        rect = option.rect
+        x = rect.x() + 4
+
+        num = f"{hit.line}"
+        painter.setPen(QColor(theme.FG_SECONDARY))
+        w = fm.horizontalAdvance(num) + 10
+        painter.drawText(QRect(x, rect.y(), w, rect.height()), Qt.AlignVCenter | Qt.AlignLeft, num)
+        x += w
+
+        # 行首空白不显示，命中位置随之左移
+        text = hit.text
+        strip = len(text) - len(text.lstrip())
+        before = text[strip:hit.col] if hit.col >= strip else ""
+        match = text[max(hit.col, strip):hit.end]
+        after = text[hit.end:]
+        preview = index.data(SearchResultsModel.PREVIEW_ROLE)
+        dark = theme.is_dark()
+        if preview is None:
+            parts = ((before, None), (match, "#6b5d00" if dark else "#ffe97a"), (after, None))
+        else:
+            # 替换模式：原文划掉，后面接替换文本
+            parts = ((before, None), (match, "#6b2b2b" if dark else "#ffc9c9"),
+                     (preview, "#2b5b2b" if dark else "#c7f0c7"), (after, None))
+        strike = QFont(font)
+        strike.setStrikeOut(True)
+        for n, (part, bg) in enumerate(parts):
+            if not part:
+                continue
+            struck = preview is not None and n == 1
+            part_fm = QFontMetrics(strike) if struck else fm
+            pw = part_fm.horizontalAdvance(part)
+            r = QRect(x, rect.y(), pw, rect.height())
+            if bg:
+                painter.fillRect(r, QColor(bg))
+            painter.setFont(strike if struck else font)
+            painter.setPen(QColor(theme.FG_PRIMARY))
+            painter.drawText(r, Qt.AlignVCenter | Qt.AlignLeft, part)
+            x += pw
+            if x > rect.right():
+                break
+        painter.restore()
+
+
+class SearchResultsTab(QWidget):
+    """
+    在文件中查找。
+
+    信号
+    ----
+    location_activated(str, int, int, int)
+        (绝对路径, 行号, 列, 长度)，双击 / 回车命中行时发出。
+    files_replaced(list[str])
+        「全部替换」改写了磁盘上的这些文件（绝对路径）。
+    """
+
+    location_activated = Signal(str, int, int, int)
+    files_replaced = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._root = ""
+        self._source = None               # () -> list[FileEntry]
+        self._search_id = 0
+        self._editor_for = None           # (abs_path) -> 已打开的编辑器 | None
+        self._pending_edits = 0           # 经编辑器文档完成的替换处数
+        self._pending_skipped: list[str] = []
+        self._replace_status = ""         # 替换完成后重新搜索时附在状态前
+
+        self._service = SearchService(self)
+        self._service.started.connect(self._on_started)
+        self._service.results.connect(self._on_results)
+        self._service.progress.connect(self._on_progress)
+        self._service.finished.connect(self._on_finished)
+        self._service.failed.connect(self._on_failed)
+        self._service.replaced.connect(self._on_replaced)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 0)
+        layout.setSpacing(4)
+
+        bar = QHBoxLayout()
+        bar.setSpacing(4)
+        self._mode_btn = QToolButton()
+        self._mode_btn.setText("⇄")
+        self._mode_btn.setToolTip("切换替换")
+        self._mode_btn.setCheckable(True)
+        self._mode_btn.setFixedSize(26, 24)
+        self._mode_btn.toggled.connect(self._on_mode_toggled)
+        bar.addWidget(self._mode_btn)
+        self._input = QLineEdit()
+        self._input.setPlaceholderText("在文件中搜索")
+        self._input.setClearButtonEnabled(True)
+        self._input.textChanged.connect(self._schedule)
+        self._input.returnPressed.connect(self._run_now)
+        bar.addWidget(self._input, 1)
+
+        self._case_btn = self._make_toggle("Aa", "区分大小写")
+        self._word_btn = self._make_toggle("ab", "全字匹配")
+        self._regex_btn = self._make_toggle(".*", "正则表达式")
+        for btn in (self._case_btn, self._word_btn, self._regex_btn):
+            bar.addWidget(btn)
+
+        self._status = QLabel("")
+        self._status.setMinimumWidth(160)
+        bar.addWidget(self._status)
+        layout.addLayout(bar)
+
+        self._replace_row = QWidget()
+        row = QHBoxLayout(self._replace_row)
+        row.setContentsMargins(30, 0, 0, 0)
+        row.setSpacing(4)
+        self._replace_input = QLineEdit()
+        self._replace_input.setPlaceholderText("替换（正则模式下可用 \\1、\\g<name>）")
+        self._replace_input.textChanged.connect(self._update_previews)
+        self._replace_input.returnPressed.connect(self._replace_all)
+        row.addWidget(self._replace_input, 1)
+        self._replace_btn = QToolButton()
+        self._replace_btn.setText("全部替换")
+        self._replace_btn.clicked.connect(self._replace_all)
+        row.addWidget(self._replace_btn)
+        row.addStretch()
+        self._replace_row.setVisible(False)
+        layout.addWidget(self._replace_row)
+
+        self._model = SearchResultsModel(self)
+        self._view = QTreeView()
+        self._view.setHeaderHidden(True)
+        self._view.setUniformRowHeights(True)
+        self._view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self._view.setItemDelegate(_HitDelegate(self._view))
+        self._view.setModel(self._model)
+        self._view.activated.connect(self._on_activated)
+        layout.addWidget(self._view, 1)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(SEARCH_DELAY_MS)
+        self._timer.timeout.connect(self._run_now)
+
+        self._apply_theme()
+        theme.changed.connect(lambda _: self._apply_theme())
+
+    # ── 公开 API ──────────────────────────────
+
+    def set_source(self, project_root: str, source):
+        """切换项目；source() 返回当前 WorkspaceIndex 的文件清单"""
+        self._service.cancel()
+        self._root = project_root
+        self._source = source
+        self._model.clear()
+        self._status.setText("")
+
+    def set_index(self, index):
+        """设置 TrigramIndex，用于在搜索前筛选候选文件"""
+        self._service.set_index(index)
+
+    def set_editor_provider(self, provider):
+        """provider(abs_path) 返回该文件已打开的编辑器；替换时经它修改文档"""
+        self._editor_for = provider
+
+    def focus_input(self, text: str = ""):
+        if text:
+            self._input.setText(text)
+        self._input.setFocus()
+        self._input.selectAll()
+
+    def query(self) -> SearchQuery:
+        return SearchQuery(self._input.text(),
+                           regex=self._regex_btn.isChecked(),
+                           case_sensitive=self._case_btn.isChecked(),
+                           whole_word=self._word_btn.isChecked())
+
+    # ── 内部 ──────────────────────────────────
+
+    def _make_toggle(self, text: str, tip: str) -> QToolButton:
+        btn = QToolButton()
+        btn.setText(text)
+        btn.setToolTip(tip)
+        btn.setCheckable(True)
+        btn.setFixedSize(26, 24)
+        btn.toggled.connect(self._schedule)
+        return btn
+
+    def _schedule(self, *_args):
+        # 查询一变就取消旧搜索，停顿后再开始新的
+        self._service.cancel()
+        self._timer.start()
+
+    def _on_mode_toggled(self, on: bool):
+        self._replace_row.setVisible(on)
+        self._update_previews()
+        if on:
+            self._replace_input.setFocus()
+
+    def _update_previews(self, *_args):
+        if not self._mode_btn.isChecked():
+            self._model.set_replacement(None, None, False)
+            return
+        query = self.query()
+        try:
+            pattern = compile_query(query) if query.text else None
+        except re.error:
+            pattern = None
+        self._model.set_replacement(pattern, self._replace_input.text(), query.regex)
+        self._view.viewport().update()
+
+    def _replace_all(self):
+        query = self.query()
+        if not self._mode_btn.isChecked() or not query.text or not self._model.hit_count:
+            return
+        try:
+            pattern = compile_query(query)
+        except re.error as e:
+            self._status.setText(f"正则表达式错误：{e}")
+            return
+        replacement = self._replace_input.text()
+        rels = self._model.rels()
+        answer = QMessageBox.question(
+            self, "全部替换",
+            f"将 {len(rels)} 个文件中的 {self._model.hit_count} 处结果替换为“{replacement}”？")
+        if answer != QMessageBox.Yes:
+            return
+
+        # 已打开的文件改编辑器里的文档；有未保存修改的结构化编辑器跳过，
+        # 免得磁盘写入和编辑器里的内容互相覆盖
+        on_disk, skipped = [], []
+        edits = 0
+        for rel in rels:
+            abs_path = os.path.join(self._root, *rel.split("/"))
+            editor = self._editor_for(abs_path) if self._editor_for else None
+            if editor is None:
+                on_disk.append(rel)
+            elif hasattr(editor, "replace_matches") and not getattr(editor, "read_only", False):
+                try:
+                    edits += editor.replace_matches(pattern, replacement, query.regex)
+                except re.error as e:
+                    self._status.setText(f"替换模板错误：{e}")
+                    return
+            elif editor.modified:
+                skipped.append(rel)
+            else:
+                on_disk.append(rel)
+        self._pending_edits = edits
+        self._pending_skipped = skipped
+        self._status.setToolTip("")
+        self._replace_btn.setEnabled(False)
+        self._status.setText("替换中…")
+        self._service.replace(self._root, on_disk, query, replacement)
+
+    def _on_replaced(self, _rid: int, result):
+        self._replace_btn.setEnabled(True)
+        if result.files:
+            self.files_replaced.emit(
+                [os.path.join(self._root, *rel.split("/")) for rel in result.files])
+        # 重新搜索以刷新结果，再显示替换结果
+        self._run_now()
+        msg = f"已替换 {result.replacements + self._pending_edits} 处"
+        if self._pending_skipped:
+            msg += f"，跳过 {len(self._pending_skipped)} 个有未保存修改的文件"
+        if result.errors:
+            msg += f"，{len(result.errors)} 个文件失败"
+            self._status.setToolTip("\n".join(result.errors))
+        self._replace_status = msg
+        self._status.setText(msg)
+
+    def _run_now(self):
+        self._timer.stop()
+        query = self.query()
+        self._model.clear()
+        self._update_previews()
+        if not query.text or not self._root or self._source is None:
+            self._service.cancel()
+            self._status.setText("")
+            return
+        self._search_id = self._service.start(self._root, self._source(), query)
+
+    def _on_started(self, sid: int):
+        if sid == self._search_id or sid == self._service.current_id:
+            self._status.setText("搜索中…")
+
+    def _on_results(self, sid: int, hits: list):
+        if sid != self._search_id:
+            return
+        first = self._model.file_count == 0
+        self._model.add_hits(hits)
+        if first and self._model.file_count:
+            # 第一个文件默认展开
+            self._view.expand(self._model.index(0, 0))
+
+    def _on_progress(self, sid: int, done: int, total: int):
+        if sid == self._search_id:
+            self._status.setText(f"搜索中… {done}/{total}")
+
+    def _on_finished(self, sid: int, stats):
+        if sid != self._search_id or stats.cancelled:
+            return
+        text = f"{stats.files_matched} 个文件中 {stats.hits} 处结果（{stats.elapsed * 1000:.0f} ms）"
+        if self._replace_status:
+            text = f"{self._replace_status}；{text}"
+            self._replace_status = ""
+        self._status.setText(text)
+
+    def _on_failed(self, sid: int, message: str):
+        if sid == self._service.current_id:
+            self._status.setText(message)
+
+    def _on_activated(self, index: QModelIndex):
+        hit = self._model.hit_at(index)
+        if hit is None:
+            self._view.setExpanded(index, not self._view.isExpanded(index))
+            return
+        abs_path = os.path.join(self._root, *hit.rel.split("/"))
+        self.location_activated.emit(abs_path, hit.line, hit.col, hit.end - hit.col)
+
+    def _apply_theme(self):
+        t = theme
+        self._input.setStyleSheet(f"""
+            QLineEdit {{
+                background: {t.BG_WIDGET_ALT}; color: {t.FG_PRIMARY};
+                border: 1px solid {t.BORDER_INPUT}; border-radius: 3px;
+                padding: 2px 6px;
+            }}
+            QLineEdit:focus {{ border-color: {t.BORDER_FOCUS}; }}
+        """)
+        toggle = f"""
+            QToolButton {{
+                background: transparent; color: {t.FG_SECONDARY};
+                border: 1px solid transparent; border-radius: 3px;
+            }}
+            QToolButton:checked {{
+                background: {t.BG_SELECTED}; color: {t.FG_PRIMARY};
+                border-color: {t.BORDER_FOCUS};
+            }}
+        """
+        for btn in (self._mode_btn, self._case_btn, self._word_btn, self._regex_btn):
+            btn.setStyleSheet(toggle)
+        self._replace_input.setStyleSheet(self._input.styleSheet())
+        self._replace_btn.setStyleSheet(f"""
+            QToolButton {{
+                background: {t.BG_WIDGET_ALT}; color: {t.FG_PRIMARY};
+                border: 1px solid {t.BORDER_INPUT}; border-radius: 3px;
+                padding: 2px 8px;
+            }}
+            QToolButton:disabled {{ color: {t.FG_MUTED}; }}
+        """)
+        self._status.setStyleSheet(f"color: {t.FG_MUTED}; font-size: 12px;")
@@ -4,7 +4,6 @@ CartDark IDE · ui/central/cart_editor.py
 """
 from __future__ import annotations
 
-import json
 import os
 
 from PySide6.QtWidgets import (
@@ -16,6 +15,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, Signal
 
 from ..theme import theme
+from ...services.file_io_service import file_io
 
 
 def _make_scroll_page() -> tuple[QScrollArea, QWidget, QVBoxLayout]:
@@ -488,6 +488,16 @@ class _BootstrapPage(QWidget):
         }
 
 
+def _merge_pages(data: dict, patch: dict) -> None:
+    """把各页 save_into 的结果合并进文件内容：project 只覆盖表单里的字段，其余整体替换"""
+    for key, value in patch.items():
+        current = data.get(key)
+        if key == "project" and isinstance(current, dict):
+            current.update(value)
+        else:
+            data[key] = value
+
+
 class CartEditor(QWidget):
     modified_changed = Signal(bool)
 
@@ -495,6 +505,7 @@ class CartEditor(QWidget):
         super().__init__(parent)
         self._file_path    = file_path
         self._modified     = False
+        self._loading      = False
         self._project_root = os.path.dirname(os.path.abspath(file_path))
 
         self._setup_ui()
@@ -509,25 +520,41 @@ class CartEditor(QWidget):
     def modified(self) -> bool:
         return self._modified
 
-    def save(self) -> bool:
-        try:
-            try:
-                with open(self._file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            except Exception:
-                data = {}
+    def save(self):
+        """
+        在后台保存，返回 IORequest；载入完成前返回 None。
+        表单的值在这里取好，工作线程读出磁盘上的当前内容后合并写回，
+        文件里表单不管的字段（project.id 等）保持不变。
+        """
+        if self._loading:
+            return None
+        patch: dict = {}
+        self._project_page.save_into(patch)
+        self._display_page.save_into(patch)
+        self._bootstrap_page.save_into(patch)
+
+        def update(data: dict):
             data["format"]  = "CART_PROJECT"
             data["version"] = 1
-            self._project_page.save_into(data)
-            self._display_page.save_into(data)
-            self._bootstrap_page.save_into(data)
-            with open(self._file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-                f.write("\n")
-            self._set_modified(False)
-            return True
-        except OSError:
-            return False
+            _merge_pages(data, patch)
+
+        req = file_io().update_json(self._file_path, update)
+        self._set_modified(False)
+        req.failed.connect(self._on_save_failed)
+        return req
+
+    def reload(self):
+        """从磁盘重新读入（文件被 IDE 在别处改写后调用）"""
+        self._load_file()
+
+    def view_state(self) -> dict:
+        """标签休眠前记下的界面状态：当前页"""
+        return {"page": self._nav.currentRow()}
+
+    def restore_view_state(self, state: dict):
+        row = state.get("page")
+        if isinstance(row, int) and 0 <= row < self._nav.count():
+            self._nav.setCurrentRow(row)
 
     def _setup_ui(self):
         layout = QHBoxLayout(self)
@@ -613,16 +640,29 @@ class CartEditor(QWidget):
                 self._stack.setCurrentIndex(idx)
 
     def _load_file(self):
-        try:
-            with open(self._file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception:
+        """在后台读入；读完前表单不可编辑"""
+        self._loading = True
+        self.setEnabled(False)
+        req = file_io().read_json(self._file_path)
+        req.finished.connect(self._on_loaded)
+        req.failed.connect(self._on_load_failed)
+
+    def _on_load_failed(self, _message: str):
+        self._on_loaded({})
+
+    def _on_loaded(self, data):
+        if not isinstance(data, dict):
             data = {}
         self._project_page.load(data)
         self._display_page.load(data)
         self._bootstrap_page.load(data)
+        self._loading = False
+        self.setEnabled(True)
         self._set_modified(False)
 
+    def _on_save_failed(self, _message: str):
+        self._set_modified(True)
+
     def _set_modified(self, value: bool):
         if value != self._modified:
             self._modified = value
@@ -1,20 +1,34 @@
 """
 CartDark IDE · ui/central/editor_host.py
 单文件编辑器。当前使用 QPlainTextEdit，带行号区域。
+超过 LARGE_FILE_THRESHOLD 的文件改用 mmap 支持的只读查看器（LargeFileView），
+不整体读入内存，也不做语法高亮；用户可以选择仍然载入编辑。
 """
 from __future__ import annotations
 
 import os
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
 from PySide6.QtWidgets import (
     QWidget, QHBoxLayout, QVBoxLayout, QPlainTextEdit, QTextEdit,
     QSizePolicy, QLineEdit, QPushButton, QLabel, QCheckBox
 )
-from PySide6.QtCore import Qt, QRect, QSize, Signal
+from PySide6.QtCore import Qt, QRect, QSize, Signal, QTimer
 from ..theme import theme
 from PySide6.QtGui import (
     QColor, QPainter, QTextFormat, QFont, QFontMetrics,
-    QTextCharFormat, QSyntaxHighlighter, QTextDocument
+    QTextCursor, QTextDocument
 )
+from ...services.file_io_service import file_io
+from ...services.search_service import find_replacements
+from .syntax import highlighter_for
+from .large_file_view import LargeFileView
+
+
+# 大于此大小的文件以只读查看器打开
+LARGE_FILE_THRESHOLD = 2 * 1024 * 1024
 
 
 # ──────────────────────────────────────────────
@@ -33,59 +47,6 @@ class _LineNumberArea(QWidget):
         self._editor.line_number_area_paint_event(event)
 
 
-# ──────────────────────────────────────────────
-# 简易 Lua 语法高亮
-# ──────────────────────────────────────────────
-
-class _LuaHighlighter(QSyntaxHighlighter):
-    def __init__(self, document: QTextDocument):
-        super().__init__(document)
-
-        self._rules: list[tuple] = []
-
-        def fmt(color: str, bold=False, italic=False) -> QTextCharFormat:
-            f = QTextCharFormat()
-            f.setForeground(QColor(color))
-            if bold:
-                f.setFontWeight(700)
-            if italic:
-                f.setFontItalic(True)
-            return f
-
-        import re
-
-        keywords = [
-            "and", "break", "do", "else", "elseif", "end", "false",
-            "for", "function", "goto", "if", "in", "local", "nil",
-            "not", "or", "repeat", "return", "then", "true", "until", "while"
-        ]
-        kw_fmt = fmt("#c678dd", bold=True)
-        for kw in keywords:
-            self._rules.append((re.compile(rf'\b{kw}\b'), kw_fmt))
-
-        # 字符串
-        self._rules.append((re.compile(r'"[^"\\]*(\\.[^"\\]*)*"'), fmt("#98c379")))
-        self._rules.append((re.compile(r"'[^'\\]*(\\.[^'\\]*)*'"), fmt("#98c379")))
-
-        # 数字
-        self._rules.append((re.compile(r'\b\d+(\.\d+)?\b'), fmt("#d19a66")))
-
-        # 单行注释
-        self._rules.append((re.compile(r'--[^\n]*'), fmt("#5c6370", italic=True)))
-
-        # 内置函数
-        builtins = ["print", "pairs", "ipairs", "type", "tostring", "tonumber",
-                    "require", "math", "table", "string", "io", "os"]
-        bi_fmt = fmt("#61afef")
-        for b in builtins:
-            self._rules.append((re.compile(rf'\b{b}\b'), bi_fmt))
-
-    def highlightBlock(self, text: str):
-        for pattern, fmt in self._rules:
-            for m in pattern.finditer(text):
-                self.setFormat(m.start(), m.end() - m.start(), fmt)
-
-
 # ──────────────────────────────────────────────
 # 代码编辑器（带行号）
 # ──────────────────────────────────────────────
@@ -105,6 +66,7 @@ class _CodeEditor(QPlainTextEdit):
         )
 
         self._line_number_area = _LineNumberArea(self)
+        self._find_selections: list = []     # 查找栏的高亮，与当前行高亮合并
 
         self.blockCountChanged.connect(self._update_line_number_width)
         self.updateRequest.connect(self._update_line_number_area)
@@ -184,6 +146,21 @@ class _CodeEditor(QPlainTextEdit):
         if rect.contains(self.viewport().rect()):
             self._update_line_number_width()
 
+    def set_find_selections(self, selections: list):
+        self._find_selections = selections
+        self._highlight_current_line()
+
+    def visible_blocks(self):
+        """视口内可见的文本块"""
+        block = self.firstVisibleBlock()
+        top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
+        height = self.viewport().height()
+        while block.isValid() and top <= height:
+            if block.isVisible():
+                yield block
+            top += self.blockBoundingRect(block).height()
+            block = block.next()
+
     def _highlight_current_line(self):
         extra = []
         if not self.isReadOnly():
@@ -194,13 +171,25 @@ class _CodeEditor(QPlainTextEdit):
             selection.cursor = self.textCursor()
             selection.cursor.clearSelection()
             extra.append(selection)
-        self.setExtraSelections(extra)
+        self.setExtraSelections(extra + self._find_selections)
 
 
 # ──────────────────────────────────────────────
 # EditorHost：单文件编辑器容器
 # ──────────────────────────────────────────────
 
+def _utf16_len(text: str, end: int) -> int:
+    return len(text[:end].encode("utf-16-le")) // 2
+
+
+# 查找栏：输入停顿多久后查找 / 后台统计的上限 / 每批送回的命中数
+FIND_DELAY_MS = 150
+MAX_FIND_COUNT = 100_000
+FIND_BATCH = 5000
+
+_ASTRAL = re.compile("[\U00010000-\U0010FFFF]")
+
+
 class EditorHost(QWidget):
     """
     单文件编辑器（纯文本 + 语法高亮）。
@@ -216,6 +205,14 @@ class EditorHost(QWidget):
         super().__init__(parent)
         self._file_path = file_path
         self._modified = False
+        self._loading = False
+        self._load_req = None
+        self._pending_goto: tuple[int, int, int] | None = None
+        self._pending_scroll: int | None = None
+        self._pending_state: dict | None = None
+        self._viewer: LargeFileView | None = None
+        self._banner: QWidget | None = None
+        self._highlighter = None
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -229,13 +226,17 @@ class EditorHost(QWidget):
         self._find_bar.setVisible(False)
         layout.addWidget(self._find_bar)
 
-        # 加载文件内容
-        self._load_file()
-
-        # 根据扩展名附加高亮器
-        ext = os.path.splitext(file_path)[1].lower()
-        if ext == ".lua":
-            self._highlighter = _LuaHighlighter(self._editor.document())
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        if size > LARGE_FILE_THRESHOLD:
+            self._enter_large_mode(size)
+        else:
+            # 加载文件内容
+            self._load_file()
+            # 根据扩展名附加高亮器（Lua / JSON 类）
+            self._highlighter = highlighter_for(file_path, self._editor.document())
 
         # 监听修改
         self._editor.document().modificationChanged.connect(self._on_modified)
@@ -252,30 +253,222 @@ class EditorHost(QWidget):
     def modified(self) -> bool:
         return self._modified
 
-    def save(self) -> bool:
-        """保存文件，返回是否成功"""
-        try:
-            with open(self._file_path, "w", encoding="utf-8") as f:
-                f.write(self._editor.toPlainText())
-            self._editor.document().setModified(False)
-            return True
-        except OSError:
-            return False
+    @property
+    def read_only(self) -> bool:
+        """大文件模式或载入中：内容只在磁盘上，不经文档修改"""
+        return self._viewer is not None or self._loading
+
+    def save(self):
+        """
+        在后台保存，返回 IORequest；大文件模式或仍在载入时没有可写的内容，返回 None。
+        发出写入后即视为已保存，写入失败时恢复修改标记。
+        """
+        if self.read_only:
+            return None
+        req = file_io().write_text(self._file_path, self._editor.toPlainText())
+        self._editor.document().setModified(False)
+        req.failed.connect(self._on_save_failed)
+        return req
+
+    def reload(self):
+        """从磁盘重新读入（文件被 IDE 在别处改写后调用）"""
+        if self._viewer is not None:
+            self._viewer.reload()
+        else:
+            self._load_file()
+
+    def release(self):
+        """关闭标签前释放文件映射"""
+        if self._viewer is not None:
+            self._viewer.close_file()
+
+    def document(self) -> QTextDocument | None:
+        """编辑中的文档；大文件模式下没有文档，返回 None"""
+        return self._editor.document() if self._viewer is None else None
+
+    def view_state(self) -> dict:
+        """
+        标签休眠 / 会话保存时记下的界面状态：
+        top / left 为滚动位置（纵向以行计），cursor / anchor 为光标与选区起点。
+        """
+        if self._viewer is not None:
+            return {"top": self._viewer.verticalScrollBar().value()}
+        if self._loading and self._pending_state is not None:
+            return dict(self._pending_state)
+        cursor = self._editor.textCursor()
+        return {
+            "top":    self._editor.verticalScrollBar().value(),
+            "left":   self._editor.horizontalScrollBar().value(),
+            "cursor": cursor.position(),
+            "anchor": cursor.anchor(),
+        }
+
+    def restore_view_state(self, state: dict):
+        """恢复 view_state() 记下的状态；仍在载入时等载入完成再恢复"""
+        if self._viewer is not None:
+            self._viewer.scroll_to_line(int(state.get("top", 0)))
+            return
+        if self._loading:
+            self._pending_state = dict(state)
+            return
+        self._apply_view_state(state)
 
     # ── 内部 ──────────────────────────────────
 
-    def _load_file(self):
-        try:
-            with open(self._file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-        except OSError:
-            content = f"# 无法读取文件：{self._file_path}"
+    def _enter_large_mode(self, size: int):
+        self._editor.setVisible(False)
+        self._viewer = LargeFileView(self._file_path)
+
+        self._banner = QWidget()
+        row = QHBoxLayout(self._banner)
+        row.setContentsMargins(10, 4, 10, 4)
+        row.setSpacing(8)
+        self._banner_lbl = QLabel(
+            f"大文件（{size / (1024 * 1024):.1f} MB）以只读方式打开，已关闭语法高亮")
+        row.addWidget(self._banner_lbl)
+        row.addStretch()
+        edit_btn = QPushButton("仍然编辑")
+        edit_btn.setToolTip("整个载入编辑器；文件很大时可能卡顿")
+        edit_btn.clicked.connect(self._leave_large_mode)
+        row.addWidget(edit_btn)
+
+        layout = self.layout()
+        layout.insertWidget(0, self._banner)
+        layout.insertWidget(1, self._viewer, 1)
+        self._apply_banner_theme()
+
+    def _leave_large_mode(self):
+        """载入全文进入编辑器（仍不做语法高亮）"""
+        if self._viewer is None:
+            return
+        top = self._viewer.verticalScrollBar().value()
+        self._viewer.close_file()
+        for w in (self._banner, self._viewer):
+            self.layout().removeWidget(w)
+            w.deleteLater()
+        self._viewer = None
+        self._banner = None
+        self._pending_scroll = top
+        self._load_file()
+        self._editor.setVisible(True)
+        self._editor.setFocus()
 
+    def _apply_banner_theme(self):
+        if self._banner is None:
+            return
+        t = theme
+        self._banner.setStyleSheet(f"""
+            QWidget {{ background: {t.BG_PANEL}; }}
+            QLabel {{ color: {t.FG_SECONDARY}; font-size: 12px; }}
+            QPushButton {{
+                background: {t.BG_WIDGET_ALT}; color: {t.FG_PRIMARY};
+                border: 1px solid {t.BORDER_INPUT}; border-radius: 3px;
+                padding: 2px 10px;
+            }}
+        """)
+
+    def _load_file(self):
+        """在后台读入；读完前编辑器只读并显示「正在载入…」"""
+        old = self._load_req
+        if old is not None and not old.done:
+            # 之前的读取结果已经过时
+            old.finished.disconnect(self._on_loaded)
+            old.failed.disconnect(self._on_load_failed)
+        self._set_loading(True)
+        self._load_req = file_io().read_text(self._file_path)
+        self._load_req.finished.connect(self._on_loaded)
+        self._load_req.failed.connect(self._on_load_failed)
+
+    def _on_load_failed(self, _message: str):
+        self._on_loaded(f"# 无法读取文件：{self._file_path}")
+
+    def _on_loaded(self, content: str):
+        self._load_req = None
         self._editor.setPlainText(content)
         self._editor.document().setModified(False)
+        self._set_loading(False)
+        if self._pending_scroll is not None:
+            # QPlainTextEdit 的纵向滚动条以行为单位
+            self._editor.verticalScrollBar().setValue(self._pending_scroll)
+            self._pending_scroll = None
+        if self._pending_state is not None:
+            self._apply_view_state(self._pending_state)
+            self._pending_state = None
+        if self._pending_goto is not None:
+            self.go_to(*self._pending_goto)
+
+    def _set_loading(self, loading: bool):
+        self._loading = loading
+        self._editor.setReadOnly(loading)
+        self._editor.setPlaceholderText("正在载入…" if loading else "")
+
+    def _apply_view_state(self, state: dict):
+        last = max(self._editor.document().characterCount() - 1, 0)
+        pos = min(int(state.get("cursor", 0)), last)
+        anchor = min(int(state.get("anchor", pos)), last)
+        cursor = self._editor.textCursor()
+        cursor.setPosition(anchor)
+        cursor.setPosition(pos, QTextCursor.KeepAnchor)
+        self._editor.setTextCursor(cursor)
+        # 设置光标会把它滚进视野，之后再还原滚动位置
+        self._editor.verticalScrollBar().setValue(int(state.get("top", 0)))
+        self._editor.horizontalScrollBar().setValue(int(state.get("left", 0)))
+
+    def _on_save_failed(self, _message: str):
+        self._editor.document().setModified(True)
+
+    def go_to(self, line: int, col: int = 0, length: int = 0):
+        """跳到第 line 行（从 1 开始）第 col 列，并选中 length 个字符"""
+        if self._viewer is not None:
+            self._viewer.go_to(line, col, length)
+            return
+        if self._loading:
+            self._pending_goto = (line, col, length)
+            return
+        self._pending_goto = None
+        block = self._editor.document().findBlockByNumber(max(line - 1, 0))
+        if not block.isValid():
+            return
+        cursor = self._editor.textCursor()
+        pos = block.position() + min(col, max(block.length() - 1, 0))
+        cursor.setPosition(pos)
+        if length:
+            cursor.setPosition(min(pos + length, block.position() + block.length() - 1),
+                               cursor.MoveMode.KeepAnchor)
+        self._editor.setTextCursor(cursor)
+        self._editor.centerCursor()
+        self._editor.setFocus()
+
+    def replace_matches(self, pattern, replacement: str, regex: bool) -> int:
+        """
+        在文档中替换全部命中（在文件中替换时，已打开的文件走这里而不是磁盘），
+        整体作为一步撤销；返回替换处数。模板无效时抛出 re.error。
+        """
+        text = self._editor.toPlainText()
+        edits = find_replacements(text, pattern, replacement, regex)
+        if not edits:
+            return 0
+        if any(ord(c) > 0xFFFF for c in text):
+            # QTextDocument 的位置以 UTF-16 计，BMP 以外的字符占两个单位
+            edits = [(_utf16_len(text, s), _utf16_len(text, e), new) for s, e, new in edits]
+        cursor = QTextCursor(self._editor.document())
+        cursor.beginEditBlock()
+        for start, end, new in reversed(edits):
+            cursor.setPosition(start)
+            cursor.setPosition(end, QTextCursor.KeepAnchor)
+            cursor.insertText(new)
+        cursor.endEditBlock()
+        return len(edits)
+
+    def selected_text(self) -> str:
+        if self._viewer is not None:
+            return self._viewer.selected_text()
+        return self._editor.textCursor().selectedText()
 
     def show_find(self):
-        """显示/聚焦查找栏 (⌘F)"""
+        """显示/聚焦查找栏 (⌘F)；大文件模式下用「在文件中查找」"""
+        if self._viewer is not None:
+            return
         self._find_bar.setVisible(True)
         self._find_bar.focus()
 
@@ -293,6 +486,7 @@ class EditorHost(QWidget):
     def _on_theme_changed(self, _name: str):
         self._editor._apply_theme_style()
         self._find_bar.apply_theme()
+        self._apply_banner_theme()
 
     def _on_modified(self, modified: bool):
         self._modified = modified
@@ -303,13 +497,43 @@ class _FindBar(QWidget):
     """
     内嵌查找栏，显示在编辑器底部。
     支持：向前/向后查找、大小写匹配、Esc 关闭。
+
+      - 输入停顿 FIND_DELAY_MS 后才查找；查找词或大小写改变时跳到第一个结果，
+        编辑文档引起的重新统计只更新计数和高亮，不移动光标
+      - 高亮只覆盖视口内可见的块，滚动时重算，不为整篇文档建 ExtraSelection
+      - 命中总数在后台线程统计（最多 MAX_FIND_COUNT 处），结果是一组
+        UTF-16 偏移；上一个 / 下一个在偏移数组上二分，不保存 QTextCursor
     """
 
+    # 内部：后台线程 → UI 线程
+    _counted = Signal(int, object, bool, bool)   # (代次, 偏移, 是否完成, 是否达到上限)
+
     def __init__(self, editor: "_CodeEditor", parent=None):
         super().__init__(parent)
         self._editor = editor
-        self._matches: list = []
+        self._offsets = array("Q")       # 命中起点（文档位置，UTF-16）
+        self._length = 0                 # 命中长度（UTF-16）
+        self._pattern: re.Pattern | None = None
         self._cur_idx: int = -1
+        self._generation = 0
+        self._done = True
+        self._capped = False
+        self._anchor = -1                # 查找开始时的光标位置；首个结果从这里往后找
+        self._stale = False              # 文档在统计后被修改过
+        self._jump_pending = False       # 查找条件已改变，下次统计完跳到第一个结果
+        self._jump_first = False         # 本次统计完成第一个结果时跳过去
+
+        self._find_timer = QTimer(self)
+        self._find_timer.setSingleShot(True)
+        self._find_timer.setInterval(FIND_DELAY_MS)
+        self._find_timer.timeout.connect(self._on_find_timer)
+        self._paint_timer = QTimer(self)
+        self._paint_timer.setSingleShot(True)
+        self._paint_timer.setInterval(0)
+        self._paint_timer.timeout.connect(self._paint_visible)
+        self._counted.connect(self._on_counted)
+        editor.verticalScrollBar().valueChanged.connect(self._schedule_paint)
+        editor.document().contentsChanged.connect(self._on_contents_changed)
 
         self.setFixedHeight(36)
 
@@ -320,12 +544,12 @@ class _FindBar(QWidget):
         self._input = QLineEdit()
         self._input.setPlaceholderText("查找...")
         self._input.setFixedWidth(220)
-        self._input.textChanged.connect(self._do_find)
+        self._input.textChanged.connect(self._schedule_find)
         self._input.returnPressed.connect(self._find_next)
         layout.addWidget(self._input)
 
         self._case_cb = QCheckBox("区分大小写")
-        self._case_cb.stateChanged.connect(self._do_find)
+        self._case_cb.stateChanged.connect(self._schedule_find)
         layout.addWidget(self._case_cb)
 
         self._info_lbl = QLabel("")
@@ -406,75 +630,223 @@ class _FindBar(QWidget):
             super().keyPressEvent(event)
 
     def hideEvent(self, event):
-        # 关闭时清除高亮
+        # 关闭时清除高亮，停止统计
+        self._find_timer.stop()
+        self._generation += 1
+        self._pattern = None
         self._clear_highlights()
         super().hideEvent(event)
 
-    def _do_find(self):
-        self._clear_highlights()
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._schedule_paint()
+
+    # ── 查找 ──────────────────────────────────
+
+    def _schedule_find(self, *_args):
+        # 查找词 / 大小写改变
+        self._jump_pending = True
+        self._find_timer.start()
+
+    def _on_find_timer(self):
+        self._do_find(jump=self._jump_pending)
+
+    def _do_find(self, jump: bool = True):
+        """重新统计；jump 为 False 时（文档被编辑）不移动光标"""
+        self._find_timer.stop()
+        self._generation += 1
+        self._offsets = array("Q")
+        self._cur_idx = -1
+        self._stale = False
+        self._jump_pending = False
+        self._jump_first = jump
         text = self._input.text()
         if not text:
+            self._pattern = None
+            self._done = True
             self._info_lbl.setText("")
-            self._matches = []
-            self._cur_idx = -1
+            self._clear_highlights()
             return
 
-        flags = Qt.CaseSensitive if self._case_cb.isChecked() else Qt.CaseInsensitive
-        doc = self._editor.document()
-        cursor = doc.find(text, 0, flags)
-        self._matches = []
-        while not cursor.isNull():
-            self._matches.append(cursor)
-            cursor = doc.find(text, cursor, flags)
+        flags = 0 if self._case_cb.isChecked() else re.IGNORECASE
+        self._pattern = re.compile(re.escape(text), flags)
+        self._length = _utf16_len(text, len(text))
+        self._done = False
+        self._capped = False
+        self._anchor = self._editor.textCursor().selectionStart()
+        self._info_lbl.setText("…")
+        self._paint_visible()
+        # 文本快照交给后台线程统计
+        threading.Thread(target=self._count_worker,
+                         args=(self._generation, self._editor.toPlainText(), self._pattern),
+                         daemon=True).start()
+
+    def _count_worker(self, generation: int, text: str, pattern: re.Pattern):
+        wide = any(ord(c) > 0xFFFF for c in text) if not text.isascii() else False
+        batch = array("Q")
+        extra = 0                          # 之前出现的 BMP 以外字符数（UTF-16 多占一位）
+        last = 0
+        count = 0
+        for m in pattern.finditer(text):
+            if generation != self._generation:
+                return
+            start = m.start()
+            if wide:
+                extra += len(_ASTRAL.findall(text, last, start))
+                last = start
+            batch.append(start + extra)
+            count += 1
+            if count >= MAX_FIND_COUNT:
+                self._counted.emit(generation, batch, True, True)
+                return
+            if len(batch) >= FIND_BATCH:
+                self._counted.emit(generation, batch, False, False)
+                batch = array("Q")
+        self._counted.emit(generation, batch, True, False)
+
+    def _on_counted(self, generation: int, batch: array, done: bool, capped: bool):
+        if generation != self._generation:
+            return
+        self._offsets.extend(batch)
+        self._done = done
+        self._capped = capped
+        if not self._jump_first:
+            # 编辑后的重新统计：光标恰好选中某处命中时只更新序号
+            if self._cur_idx < 0:
+                self._cur_idx = self._selected_match()
+            self._update_info()
+            return
+        if self._cur_idx < 0 and self._offsets:
+            # 第一个结果：光标之后最近的一处；后面的批次还没到时先等
+            i = bisect_left(self._offsets, self._anchor)
+            if i < len(self._offsets):
+                self._jump_to(i)
+                return
+            if done:
+                self._jump_to(0)
+                return
+        self._update_info()
+
+    def _selected_match(self) -> int:
+        """当前选区正好是一处命中时返回其序号，否则 -1"""
+        cursor = self._editor.textCursor()
+        start = cursor.selectionStart()
+        if cursor.selectionEnd() - start != self._length:
+            return -1
+        i = bisect_left(self._offsets, start)
+        return i if i < len(self._offsets) and self._offsets[i] == start else -1
+
+    def _on_contents_changed(self):
+        # 编辑后偏移失效：高亮马上重算，计数延迟重新统计
+        if self._pattern is None or not self.isVisible():
+            return
+        self._stale = True
+        self._schedule_paint()
+        # 不设 _jump_pending：只重新统计，不跳转
+        self._find_timer.start()
 
-        # 高亮所有匹配
-        extra_sels = []
-        t = theme
-        for c in self._matches:
-            sel = QTextEdit.ExtraSelection()
-            sel.cursor = c
-            sel.format.setBackground(__import__('PySide6.QtGui', fromlist=['QColor']).QColor(
-                "#d4c500" if t.is_dark() else "#ffff00"
-            ))
-            extra_sels.append(sel)
-        self._editor.setExtraSelections(extra_sels)
-
-        count = len(self._matches)
-        if count > 0:
-            self._cur_idx = 0
-            self._jump_to(0)
-            self._info_lbl.setText(f"1 / {count}")
-        else:
-            self._cur_idx = -1
-            self._info_lbl.setText("无结果")
+    # ── 导航 ──────────────────────────────────
 
     def _find_next(self):
-        if not self._matches:
+        if self._find_timer.isActive() or self._stale:
+            self._do_find()
+            return
+        if not self._offsets:
             return
-        self._cur_idx = (self._cur_idx + 1) % len(self._matches)
-        self._jump_to(self._cur_idx)
+        pos = self._editor.textCursor().selectionStart()
+        i = bisect_right(self._offsets, pos)
+        if i >= len(self._offsets):
+            if not self._done or self._capped:
+                # 统计还没覆盖到这里，直接在文档里找
+                self._find_in_document(backward=False)
+                return
+            i = 0
+        self._jump_to(i)
 
     def _find_prev(self):
-        if not self._matches:
+        if self._find_timer.isActive() or self._stale:
+            self._do_find()
             return
-        self._cur_idx = (self._cur_idx - 1) % len(self._matches)
-        self._jump_to(self._cur_idx)
+        if not self._offsets:
+            return
+        pos = self._editor.textCursor().selectionStart()
+        i = bisect_left(self._offsets, pos) - 1
+        if i < 0:
+            if not self._done or self._capped:
+                self._find_in_document(backward=True)
+                return
+            i = len(self._offsets) - 1
+        self._jump_to(i)
+
+    def _find_in_document(self, backward: bool):
+        flags = QTextDocument.FindFlag(0)
+        if self._case_cb.isChecked():
+            flags |= QTextDocument.FindCaseSensitively
+        if backward:
+            flags |= QTextDocument.FindBackward
+        cursor = self._editor.document().find(self._input.text(), self._editor.textCursor(), flags)
+        if not cursor.isNull():
+            self._cur_idx = -1
+            self._editor.setTextCursor(cursor)
+            self._editor.ensureCursorVisible()
+            self._update_info()
 
     def _jump_to(self, idx: int):
-        cursor = self._matches[idx]
+        self._cur_idx = idx
+        start = self._offsets[idx]
+        cursor = self._editor.textCursor()
+        cursor.setPosition(start)
+        cursor.setPosition(start + self._length, QTextCursor.KeepAnchor)
         self._editor.setTextCursor(cursor)
         self._editor.ensureCursorVisible()
-        self._info_lbl.setText(f"{idx + 1} / {len(self._matches)}")
+        self._update_info()
 
-    def _clear_highlights(self):
-        self._editor.setExtraSelections([])
+    def _update_info(self):
+        count = len(self._offsets)
+        if self._done and not count:
+            self._info_lbl.setText("无结果")
+            return
+        total = f"{count}+" if self._capped or not self._done else str(count)
+        current = str(self._cur_idx + 1) if self._cur_idx >= 0 else "?"
+        self._info_lbl.setText(f"{current} / {total}")
+
+    # ── 高亮（只画可见块）──────────────────────
 
+    def _schedule_paint(self, *_args):
+        if self._pattern is not None:
+            self._paint_timer.start()
+
+    def _paint_visible(self):
+        pattern = self._pattern
+        if pattern is None:
+            return
+        color = QColor("#d4c500" if theme.is_dark() else "#ffff00")
+        selections = []
+        for block in self._editor.visible_blocks():
+            text = block.text()
+            base = block.position()
+            wide = not text.isascii() and any(ord(c) > 0xFFFF for c in text)
+            for m in pattern.finditer(text):
+                start, end = m.start(), m.end()
+                if wide:
+                    start, end = _utf16_len(text, start), _utf16_len(text, end)
+                sel = QTextEdit.ExtraSelection()
+                sel.cursor = QTextCursor(block)
+                sel.cursor.setPosition(base + start)
+                sel.cursor.setPosition(base + end, QTextCursor.KeepAnchor)
+                sel.format.setBackground(color)
+                selections.append(sel)
+        self._editor.set_find_selections(selections)
+
+    def _clear_highlights(self):
+        self._editor.set_find_selections([])
 
 
 def make_editor(file_path: str, parent=None) -> QWidget:
     """
     工厂函数：根据文件扩展名返回合适的编辑器。
-    返回的对象保证有 file_path / modified 属性和 save() / modified_changed 信号。
+    返回的对象保证有 file_path / modified 属性和 save() / modified_changed 信号；
+    save() 在后台写入，返回 IORequest（没有可写内容时返回 None）。
     """
     ext = os.path.splitext(file_path)[1].lower()
     if ext == ".input_binding":
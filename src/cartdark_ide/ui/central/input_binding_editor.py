@@ -13,9 +13,10 @@ from PySide6.QtWidgets import (
     QFrame, QHeaderView, QAbstractItemView, QAbstractScrollArea,
     QStyledItemDelegate
 )
-from PySide6.QtCore import Qt, Signal, QSize
+from PySide6.QtCore import Qt, Signal, QSize, QTimer
 
 from ..theme import theme
+from ...services.file_io_service import file_io, read_json
 
 
 _TOUCH_INPUTS = ["TOUCH_TAP", "TOUCH_DOWN", "TOUCH_UP"]
@@ -53,6 +54,15 @@ def _load_pins(file_path: str) -> list[str]:
     return []
 
 
+def _read_binding(file_path: str) -> tuple[list[str], dict]:
+    """（工作线程）读取引脚表和绑定文件；绑定文件无效时按空文件处理"""
+    try:
+        data = read_json(file_path)
+    except (OSError, ValueError):
+        data = {}
+    return _load_pins(file_path), data if isinstance(data, dict) else {}
+
+
 class _TriggerTable(QWidget):
     changed = Signal()
 
@@ -292,7 +302,9 @@ class InputBindingEditor(QWidget):
         super().__init__(parent)
         self._file_path = file_path
         self._modified  = False
-        self._pins      = _load_pins(file_path)
+        self._loading   = False
+        self._pending_scroll: int | None = None
+        self._pins: list[str] = []       # 与绑定文件一起在后台读入
 
         self._setup_ui()
         self._load_file()
@@ -306,16 +318,35 @@ class InputBindingEditor(QWidget):
     def modified(self) -> bool:
         return self._modified
 
-    def save(self) -> bool:
-        try:
-            data = self._build_data()
-            with open(self._file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-                f.write("\n")
-            self._set_modified(False)
-            return True
-        except OSError:
-            return False
+    def save(self):
+        """在后台保存，返回 IORequest；载入完成前返回 None"""
+        if self._loading:
+            return None
+        req = file_io().write_json(self._file_path, self._build_data())
+        self._set_modified(False)
+        req.failed.connect(self._on_save_failed)
+        return req
+
+    def reload(self):
+        """从磁盘重新读入（文件被 IDE 在别处改写后调用）"""
+        self._load_file()
+
+    def view_state(self) -> dict:
+        """标签休眠前记下的界面状态：滚动位置"""
+        return {"scroll": self._scroll.verticalScrollBar().value()}
+
+    def restore_view_state(self, state: dict):
+        scroll = state.get("scroll")
+        if not isinstance(scroll, int):
+            return
+        self._pending_scroll = scroll
+        if not self._loading:
+            QTimer.singleShot(0, self._apply_pending_scroll)
+
+    def _apply_pending_scroll(self):
+        if self._pending_scroll is not None:
+            self._scroll.verticalScrollBar().setValue(self._pending_scroll)
+            self._pending_scroll = None
 
     def _setup_ui(self):
         outer = QVBoxLayout(self)
@@ -361,15 +392,32 @@ class InputBindingEditor(QWidget):
             tbl.apply_theme()
 
     def _load_file(self):
-        try:
-            with open(self._file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception:
-            data = {}
+        """在后台读入绑定文件和引脚表；读完前表格不可编辑"""
+        self._loading = True
+        self._content.setEnabled(False)
+        req = file_io().call(self._file_path, _read_binding, self._file_path)
+        req.finished.connect(self._on_loaded)
+        req.failed.connect(self._on_load_failed)
+
+    def _on_load_failed(self, _message: str):
+        self._on_loaded(([], {}))
+
+    def _on_loaded(self, result):
+        pins, data = result
+        self._pins = pins
+        self._pin_table.update_input_opts(pins)
         self._pin_table.load_rows(data.get("pin_triggers", []))
         self._touch_table.load_rows(data.get("touch_triggers", []))
         self._gamepad_table.load_rows(data.get("gamepad_triggers", []))
+        self._loading = False
+        self._content.setEnabled(True)
         self._set_modified(False)
+        if self._pending_scroll is not None:
+            # 表格行数变化后的布局在下一轮事件循环才生效
+            QTimer.singleShot(0, self._apply_pending_scroll)
+
+    def _on_save_failed(self, _message: str):
+        self._set_modified(True)
 
     def _build_data(self) -> dict:
         return {
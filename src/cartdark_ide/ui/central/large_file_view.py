@@ -0,0 +1,318 @@
+"""
+CartDark IDE · ui/central/large_file_view.py
+大文件只读查看器（EditorHost 的大文件模式）。
+
+  - 文件经 mmap 映射，不读入 Python 字符串；内存占用只有行偏移表（每行 8 字节）
+  - 行偏移表在后台线程建立，已扫描到的部分立即可以滚动查看
+  - 只解码并绘制可见的几十行，没有语法高亮
+  - 支持按行选择并复制（⌘C）、键盘翻页、跳转到行
+
+用法
+----
+view = LargeFileView(file_path)
+view.go_to(120)
+"""
+from __future__ import annotations
+
+import mmap
+import threading
+from array import array
+
+from PySide6.QtWidgets import QAbstractScrollArea
+from PySide6.QtCore import Qt, QRect, Signal
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter, QKeySequence, QGuiApplication
+
+from ..theme import theme
+
+
+# 每扫描多少行通知一次界面
+INDEX_STEP = 65536
+
+# 单行最多解码 / 绘制的字节数（极长的单行 JSON）
+MAX_LINE_BYTES = 4096
+
+
+class LargeFileView(QAbstractScrollArea):
+    """
+    mmap 支持的只读文本视图。
+
+    信号
+    ----
+    indexed(int, bool)
+        行偏移表有进展：(已知行数, 是否扫描完成)。
+    """
+
+    indexed = Signal(int, bool)
+
+    # 内部：后台线程 → UI 线程
+    _progress = Signal(int, int, bool)      # (代次, 行数, 是否完成)
+
+    def __init__(self, file_path: str, parent=None):
+        super().__init__(parent)
+        self._file_path = file_path
+        self._file = None
+        self._mm: mmap.mmap | None = None
+        self._offsets = array("Q", [0])     # 第 i 行的起始字节
+        self._done = False
+        self._generation = 0
+        self._max_width = 0
+        self._sel_anchor = -1               # 选中的行范围（含两端）
+        self._sel_end = -1
+        self._pending_top: int | None = None    # 行偏移表还没扫到的滚动目标
+
+        font = QFont("JetBrains Mono, Menlo, Consolas, monospace")
+        font.setPointSize(13)
+        font.setFixedPitch(True)
+        self.setFont(font)
+        self.viewport().setFont(font)
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.verticalScrollBar().setSingleStep(1)
+
+        self._progress.connect(self._on_progress)
+        self._apply_theme()
+        theme.changed.connect(self._on_theme_changed)
+        self.reload()
+
+    # ── 公开 API ──────────────────────────────
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @property
+    def line_count(self) -> int:
+        """已知的行数（扫描中时不含最后一行）"""
+        return len(self._offsets) if self._done else len(self._offsets) - 1
+
+    @property
+    def is_indexed(self) -> bool:
+        return self._done
+
+    def reload(self):
+        """重新映射文件（文件被替换后调用）"""
+        self.close_file()
+        self._generation += 1
+        self._offsets = array("Q", [0])
+        self._done = False
+        self._max_width = 0
+        try:
+            self._file = open(self._file_path, "rb")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # 空文件不能映射，按零行处理
+            self.close_file()
+            self._done = True
+            self._update_scrollbars()
+            return
+        threading.Thread(target=self._build_index,
+                         args=(self._generation, self._mm, self._offsets),
+                         daemon=True).start()
+
+    def close_file(self):
+        self._generation += 1
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                # 后台线程仍持有切片时关闭会失败；交给垃圾回收
+                pass
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def go_to(self, line: int, col: int = 0, length: int = 0):
+        """滚动到第 line 行（从 1 开始）并选中该行"""
+        n = max(line - 1, 0)
+        self._sel_anchor = self._sel_end = n
+        bar = self.verticalScrollBar()
+        bar.setValue(max(n - self._visible_rows() // 2, 0))
+        self.viewport().update()
+        self.setFocus()
+
+    def scroll_to_line(self, top: int):
+        """让第 top 行（从 0 开始）位于顶部；该行还没扫描到时，扫到后再滚动"""
+        bar = self.verticalScrollBar()
+        if top <= bar.maximum() or self._done:
+            self._pending_top = None
+            bar.setValue(top)
+        else:
+            self._pending_top = top
+
+    def selected_text(self) -> str:
+        if self._sel_anchor < 0:
+            return ""
+        first, last = sorted((self._sel_anchor, self._sel_end))
+        return "\n".join(self._line(n) for n in range(first, min(last + 1, self.line_count)))
+
+    # ── 后台建立行偏移表 ───────────────────────
+
+    def _build_index(self, generation: int, mm: mmap.mmap, offsets: array):
+        find = mm.find
+        append = offsets.append
+        pos = 0
+        count = 0
+        try:
+            while True:
+                if generation != self._generation:
+                    return
+                i = find(b"\n", pos)
+                if i < 0:
+                    break
+                pos = i + 1
+                append(pos)
+                count += 1
+                if count % INDEX_STEP == 0:
+                    self._progress.emit(generation, count, False)
+        except ValueError:
+            # 映射已被关闭
+            return
+        self._progress.emit(generation, count, True)
+
+    def _on_progress(self, generation: int, _count: int, done: bool):
+        if generation != self._generation:
+            return
+        self._done = done
+        self._update_scrollbars()
+        if self._pending_top is not None:
+            self.scroll_to_line(self._pending_top)
+        self.viewport().update()
+        self.indexed.emit(self.line_count, done)
+
+    # ── 绘制 ──────────────────────────────────
+
+    def _line(self, n: int) -> str:
+        mm = self._mm
+        if mm is None:
+            return ""
+        offsets = self._offsets
+        start = offsets[n]
+        end = offsets[n + 1] - 1 if n + 1 < len(offsets) else len(mm)
+        raw = mm[start:min(end, start + MAX_LINE_BYTES)]
+        return raw.decode("utf-8", errors="replace").rstrip("\r")
+
+    def _line_height(self) -> int:
+        return QFontMetrics(self.font()).height()
+
+    def _visible_rows(self) -> int:
+        return max(self.viewport().height() // max(self._line_height(), 1), 1)
+
+    def _gutter_width(self) -> int:
+        digits = max(1, len(str(self.line_count)))
+        return 8 + QFontMetrics(self.font()).horizontalAdvance("9") * digits + 8
+
+    def _update_scrollbars(self):
+        rows = self._visible_rows()
+        vbar = self.verticalScrollBar()
+        vbar.setPageStep(rows)
+        vbar.setRange(0, max(self.line_count - rows + 1, 0))
+        hbar = self.horizontalScrollBar()
+        hbar.setPageStep(self.viewport().width())
+        hbar.setRange(0, max(self._max_width - self.viewport().width() + self._gutter_width(), 0))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        rect = self.viewport().rect()
+        painter.fillRect(rect, QColor(self._bg))
+        fm = QFontMetrics(self.font())
+        line_h = fm.height()
+        gutter = self._gutter_width()
+        first = self.verticalScrollBar().value()
+        x0 = gutter + 4 - self.horizontalScrollBar().value()
+        tab = " " * 4
+        sel = sorted((self._sel_anchor, self._sel_end)) if self._sel_anchor >= 0 else None
+        widest = self._max_width
+
+        count = self.line_count
+        for row in range(rect.height() // line_h + 1):
+            n = first + row
+            if n >= count:
+                break
+            y = row * line_h
+            if sel is not None and sel[0] <= n <= sel[1]:
+                painter.fillRect(QRect(0, y, rect.width(), line_h), QColor(self._sel_bg))
+            text = self._line(n).replace("\t", tab)
+            widest = max(widest, fm.horizontalAdvance(text))
+            painter.setPen(QColor(self._fg))
+            painter.drawText(x0, y, rect.width() - x0 + widest, line_h,
+                             Qt.AlignLeft | Qt.AlignVCenter, text)
+
+        # 行号区最后画，盖住横向滚动后的文本
+        painter.fillRect(QRect(0, 0, gutter, rect.height()), QColor(self._ln_bg))
+        painter.setPen(QColor(self._ln_fg))
+        for row in range(rect.height() // line_h + 1):
+            n = first + row
+            if n >= count:
+                break
+            painter.drawText(0, row * line_h, gutter - 6, line_h,
+                             Qt.AlignRight | Qt.AlignVCenter, str(n + 1))
+        painter.end()
+
+        if widest > self._max_width:
+            self._max_width = widest
+            self._update_scrollbars()
+
+    # ── 交互 ──────────────────────────────────
+
+    def _line_at(self, y: int) -> int:
+        n = self.verticalScrollBar().value() + y // max(self._line_height(), 1)
+        return min(n, self.line_count - 1)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            n = self._line_at(int(event.position().y()))
+            if event.modifiers() & Qt.ShiftModifier and self._sel_anchor >= 0:
+                self._sel_end = n
+            else:
+                self._sel_anchor = self._sel_end = n
+            self.viewport().update()
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton and self._sel_anchor >= 0:
+            self._sel_end = self._line_at(int(event.position().y()))
+            self.viewport().update()
+        super().mouseMoveEvent(event)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Copy):
+            text = self.selected_text()
+            if text:
+                QGuiApplication.clipboard().setText(text)
+            return
+        vbar = self.verticalScrollBar()
+        key = event.key()
+        if key == Qt.Key_Up:
+            vbar.setValue(vbar.value() - 1)
+        elif key == Qt.Key_Down:
+            vbar.setValue(vbar.value() + 1)
+        elif key == Qt.Key_PageUp:
+            vbar.setValue(vbar.value() - vbar.pageStep())
+        elif key == Qt.Key_PageDown:
+            vbar.setValue(vbar.value() + vbar.pageStep())
+        elif key == Qt.Key_Home and event.modifiers() & Qt.ControlModifier:
+            vbar.setValue(0)
+        elif key == Qt.Key_End and event.modifiers() & Qt.ControlModifier:
+            vbar.setValue(vbar.maximum())
+        else:
+            super().keyPressEvent(event)
+
+    # ── 主题 ──────────────────────────────────
+
+    def _on_theme_changed(self, _name: str):
+        self._apply_theme()
+
+    def _apply_theme(self):
+        # 与 _CodeEditor 的配色一致
+        if theme.is_dark():
+            self._bg, self._fg, self._sel_bg = "#1e1e1e", "#abb2bf", "#3e4451"
+            self._ln_bg, self._ln_fg = "#1e1e1e", "#5c6370"
+        else:
+            self._bg, self._fg, self._sel_bg = "#ffffff", "#383a42", "#cce5ff"
+            self._ln_bg, self._ln_fg = "#f5f5f5", "#9d9d9d"
+        self.setStyleSheet("QAbstractScrollArea { border: none; }")
+        self.viewport().update()
@@ -0,0 +1,529 @@
+"""
+CartDark IDE · ui/central/panels/quick_open.py
+快速打开（⌘P）：按文件名模糊查找项目文件。
+
+索引（PathIndex，后台线程构建，不依赖 Qt）：
+  - 小写路径、文件名起始偏移、路径段边界位图（/ _ - . 空格之后、驼峰处）
+  - 每个字符一张位图（Python 大整数，第 i 位表示路径 i 含该字符）：
+    查询各字符的位图按位与，得到可能模糊命中的路径
+  - 文件名的二元 / 三元组倒排表：查询在文件名中连续出现的候选
+    直接由倒排表得到，优先精确打分
+
+查询：
+  - 候选取三类：路径最短的一批模糊命中（命中 SCORE_LIMIT 条即停）、
+    文件名连续命中、最近打开；只对这些精确打分，再用堆取前 k 个
+  - 模糊命中只在字符位图收窄后的路径里按 id 升序逐条跑模糊正则
+  - 新查询是上一次的延长时：位图在上一次的结果上继续按位与；
+    上一次的命中里仍命中的直接保留，再从上一次停下的 id 往后扫，
+    每次按键只做新增的那部分工作
+  - 打分：逐字符基础分 + 连续命中 + 段首命中 + 落在文件名内 + 最近打开加权
+
+用法
+----
+palette = QuickOpenPalette(main_window)
+palette.file_chosen.connect(workspace.open_file)
+palette.set_source(project_root, lambda: [f.rel for f in index.files()])
+index.files_changed.connect(lambda _delta: palette.invalidate())
+palette.popup()
+"""
+from __future__ import annotations
+
+import heapq
+import os
+import re
+import threading
+from array import array
+
+from PySide6.QtWidgets import (
+    QFrame, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem,
+    QStyledItemDelegate, QStyle,
+)
+from PySide6.QtCore import Qt, Signal, QObject, QEvent, QRect, QSize
+from PySide6.QtGui import QFont, QFontMetrics, QColor
+
+from ...theme import theme
+
+
+# 返回的结果数
+TOP_K = 50
+
+# 每类候选最多精确打分的条数（取路径最短的）
+SCORE_LIMIT = 200
+
+# 记住的最近打开文件数
+MRU_SIZE = 50
+
+# 路径段分隔符
+_SEPARATORS = "/_-. "
+
+# 分数权重
+_S_CHAR = 1
+_S_CONSECUTIVE = 5
+_S_BOUNDARY = 8
+_S_BASENAME = 2
+_S_CONTIGUOUS_BASE = 30
+_S_BASE_PREFIX = 20
+_S_MRU = 40
+
+
+# ──────────────────────────────────────────────
+# 索引
+# ──────────────────────────────────────────────
+
+def _boundaries(path: str) -> int:
+    """path 中各段首字符位置的位图"""
+    bits = 1
+    prev = ""
+    for i, ch in enumerate(path):
+        if i and (prev in _SEPARATORS or (ch.isupper() and prev.islower())):
+            bits |= 1 << i
+        prev = ch
+    return bits
+
+
+def _subsequence_pattern(q: str) -> re.Pattern:
+    """按顺序包含 q 各字符（不跨行）的正则；每段用「非下一字符」贪心跳过，无回溯"""
+    parts = [re.escape(q[0])]
+    for c in q[1:]:
+        e = re.escape(c)
+        parts.append(f"[^\\n{e}]*{e}")
+    return re.compile("".join(parts))
+
+
+def _grams(text: str, n: int) -> set[str]:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+# 字节值 → 其中为 1 的位
+_BYTE_BITS = [tuple(b for b in range(8) if v >> b & 1) for v in range(256)]
+
+
+def _bit_ids(mask: int, start: int = 0):
+    """位图中不小于 start 的 1 位（升序）；跳过全零字节的工作在 C 层完成"""
+    mask = mask >> start << start
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for m in _NONZERO_BYTE.finditer(data, start >> 3):
+        pos = m.start()
+        base = pos * 8
+        for b in _BYTE_BITS[data[pos]]:
+            yield base + b
+
+
+class PathIndex:
+    """
+    项目文件路径的查询索引。构建后只读，可在后台线程构建、UI 线程查询。
+
+    路径按 (长度, 路径) 排序，id 越小路径越短；各处「取前 N 个」即取最短的 N 个。
+
+    用法
+    ----
+    idx = PathIndex(["script/main.lua", "res/img/a.png"])
+    idx.search("mainl")   # → [(分数, "script/main.lua", [匹配位置...]), ...]
+    """
+
+    def __init__(self, rels: list[str]):
+        self.paths = sorted(rels, key=lambda p: (len(p), p))
+        self._ids = {p: i for i, p in enumerate(self.paths)}
+        self._lower = [p.lower() for p in self.paths]
+        self._base = [p.rfind("/") + 1 for p in self.paths]
+        self._bounds = [_boundaries(p) for p in self.paths]
+        # 文件名二元 / 三元组倒排表（id 升序）
+        self._postings: dict[str, array] = {}
+        for i, low in enumerate(self._lower):
+            base = low[self._base[i]:]
+            for g in _grams(base, 2) | _grams(base, 3):
+                lst = self._postings.get(g)
+                if lst is None:
+                    lst = self._postings[g] = array("I")
+                lst.append(i)
+        # 字符位图：先在 bytearray 上置位，最后一次转成整数
+        bitmaps: dict[str, bytearray] = {}
+        size = (len(self._lower) + 7) // 8
+        for i, low in enumerate(self._lower):
+            byte, bit = i >> 3, 1 << (i & 7)
+            for ch in set(low):
+                bm = bitmaps.get(ch)
+                if bm is None:
+                    bm = bitmaps[ch] = bytearray(size)
+                bm[byte] |= bit
+        self._char_bits = {ch: int.from_bytes(bm, "little") for ch, bm in bitmaps.items()}
+        # 上一次的模糊命中：(查询, 命中 id, 已扫到的 id)；
+        # 命中包含已扫范围内的全部命中，扫到末尾（len(paths)）即完整
+        self._last: tuple[str, list[int], int] | None = None
+        # 上一次查询的字符位图：(查询, 位图)
+        self._last_mask: tuple[str, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    # ── 查询 ──────────────────────────────────
+
+    def search(self, query: str, k: int = TOP_K,
+               mru: dict[str, int] | None = None) -> list[tuple[int, str, list[int]]]:
+        """
+        模糊查找，返回按分数降序的前 k 个 (分数, 路径, 匹配字符位置)。
+        mru 为 {路径: 新近程度}，值越大越近，用于加权。
+        """
+        q = "".join(query.lower().split())
+        if not q:
+            return []
+        pattern = _subsequence_pattern(q)
+        mru = mru or {}
+
+        # 候选：最短的一批模糊命中 + 文件名连续命中 + 最近打开
+        chosen = set(self._fuzzy(q, pattern))
+        chosen.update(self._contiguous(q))
+        for path in mru:
+            i = self._ids.get(path)
+            if i is not None:
+                chosen.add(i)
+
+        scored = []
+        for i in chosen:
+            hit = self._score(q, i)
+            if hit is None:
+                continue
+            score, positions = hit
+            path = self.paths[i]
+            if path in mru:
+                score += _S_MRU * mru[path] // max(len(mru), 1)
+            scored.append((score, -i, positions))
+        top = heapq.nlargest(k, scored)
+        return [(s, self.paths[-neg_i], pos) for s, neg_i, pos in top]
+
+    def _char_mask(self, q: str) -> int:
+        """含 q 全部字符的路径位图；查询延长时在上一次的位图上继续按位与"""
+        last = self._last_mask
+        if last is not None and q.startswith(last[0]):
+            mask, chars = last[1], q[len(last[0]):]
+        else:
+            mask, chars = (1 << len(self.paths)) - 1, q
+        for ch in set(chars):
+            if not mask:
+                break
+            mask &= self._char_bits.get(ch, 0)
+        self._last_mask = (q, mask)
+        return mask
+
+    def _fuzzy(self, q: str, pattern: re.Pattern) -> list[int]:
+        """按顺序包含 q 全部字符的最短 SCORE_LIMIT 条路径"""
+        lower = self._lower
+        search = pattern.search
+        last = self._last
+        if last is not None and q.startswith(last[0]):
+            # 本次查询只是延长：上次已扫范围内的命中只会减少，从上次停下处继续
+            ids = [i for i in last[1] if search(lower[i])]
+            start = last[2]
+        else:
+            ids = []
+            start = 0
+        mask = self._char_mask(q)
+
+        end = len(self.paths)
+        if len(ids) < SCORE_LIMIT:
+            for i in _bit_ids(mask, start):
+                if search(lower[i]):
+                    ids.append(i)
+                    if len(ids) == SCORE_LIMIT:
+                        end = i + 1
+                        break
+        else:
+            end = ids[-1] + 1
+        self._last = (q, ids, end)
+        return ids
+
+    def _contiguous(self, q: str) -> list[int]:
+        """文件名中连续包含 q 的最短 SCORE_LIMIT 条路径（最短的倒排表逐条校验）"""
+        n = 3 if len(q) >= 3 else 2
+        if len(q) < n:
+            return []
+        candidates = None
+        for g in _grams(q, n):
+            lst = self._postings.get(g)
+            if lst is None:
+                return []
+            if candidates is None or len(lst) < len(candidates):
+                candidates = lst
+        lower, base = self._lower, self._base
+        out = []
+        for i in candidates:
+            if lower[i].find(q, base[i]) != -1:
+                out.append(i)
+                if len(out) == SCORE_LIMIT:
+                    break
+        return out
+
+    # ── 打分 ──────────────────────────────────
+
+    def _score(self, q: str, i: int) -> tuple[int, list[int]] | None:
+        low = self._lower[i]
+        base = self._base[i]
+        bounds = self._bounds[i]
+
+        # 文件名中连续出现：最好的情况
+        pos = low.find(q, base)
+        if pos != -1:
+            positions = list(range(pos, pos + len(q)))
+            score = _S_CONTIGUOUS_BASE + len(q) * (_S_CHAR + _S_CONSECUTIVE + _S_BASENAME)
+            if pos == base:
+                score += _S_BASE_PREFIX
+            elif (bounds >> pos) & 1:
+                score += _S_BOUNDARY
+            return score, positions
+
+        # 从末尾向前贪心匹配，使尽量多的字符落在文件名中
+        positions = []
+        j = len(low)
+        for ch in reversed(q):
+            j = low.rfind(ch, 0, j)
+            if j == -1:
+                return None
+            positions.append(j)
+        positions.reverse()
+
+        score = 0
+        prev = -2
+        for p in positions:
+            score += _S_CHAR
+            if p == prev + 1:
+                score += _S_CONSECUTIVE
+            if (bounds >> p) & 1:
+                score += _S_BOUNDARY
+            if p >= base:
+                score += _S_BASENAME
+            prev = p
+        return score, positions
+
+
+class _IndexBuilder(QObject):
+    """在后台线程构建 PathIndex"""
+
+    built = Signal(int, object)     # (代次, PathIndex)
+
+    def build(self, generation: int, rels: list[str]):
+        threading.Thread(target=lambda: self.built.emit(generation, PathIndex(rels)),
+                         daemon=True).start()
+
+
+# ──────────────────────────────────────────────
+# 界面
+# ──────────────────────────────────────────────
+
+_ROLE_POSITIONS = Qt.UserRole + 1
+
+
+class _ResultDelegate(QStyledItemDelegate):
+    """结果行：文件名（匹配字符加粗、强调色）+ 所在目录（次要色）"""
+
+    ROW_HEIGHT = 24
+
+    def sizeHint(self, option, index) -> QSize:
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, QColor(theme.BG_SELECTED))
+
+        path: str = index.data(Qt.DisplayRole) or ""
+        positions = set(index.data(_ROLE_POSITIONS) or ())
+        base = path.rfind("/") + 1
+
+        normal = QFont(option.font)
+        bold = QFont(option.font)
+        bold.setBold(True)
+        x = option.rect.x() + 10
+        y = option.rect.y()
+        h = option.rect.height()
+
+        # 文件名，按是否命中分段绘制
+        fg = QColor(theme.FG_PRIMARY)
+        accent = QColor(theme.ACCENT)
+        run_start = base
+        for j in range(base, len(path) + 1):
+            if j < len(path) and (j in positions) == (run_start in positions):
+                continue
+            text = path[run_start:j]
+            hit = run_start in positions
+            font = bold if hit else normal
+            painter.setFont(font)
+            painter.setPen(accent if hit else fg)
+            w = QFontMetrics(font).horizontalAdvance(text)
+            painter.drawText(QRect(x, y, w, h), Qt.AlignVCenter | Qt.AlignLeft, text)
+            x += w
+            run_start = j
+
+        # 目录
+        if base:
+            painter.setFont(normal)
+            painter.setPen(QColor(theme.FG_SECONDARY))
+            rect = QRect(x + 12, y, option.rect.right() - x - 12, h)
+            elided = QFontMetrics(normal).elidedText(path[:base - 1], Qt.ElideLeft, rect.width())
+            painter.drawText(rect, Qt.AlignVCenter | Qt.AlignLeft, elided)
+        painter.restore()
+
+
+class QuickOpenPalette(QFrame):
+    """
+    快速打开浮层。
+
+    信号
+    ----
+    file_chosen(str)
+        选中的文件绝对路径。
+    """
+
+    file_chosen = Signal(str)
+
+    WIDTH = 560
+    MAX_ROWS = 14
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.Popup)
+        self._root = ""
+        self._index: PathIndex | None = None
+        self._source = None              # () -> list[str]，当前项目的相对路径清单
+        self._stale = False
+        self._generation = 0
+        self._mru: list[str] = []        # 最近打开的相对路径，最近的在前
+        self._builder = _IndexBuilder(self)
+        self._builder.built.connect(self._on_index_built)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+        layout.setSpacing(4)
+
+        self._edit = QLineEdit()
+        self._edit.setPlaceholderText("按名称查找文件…")
+        self._edit.textChanged.connect(self._update_results)
+        self._edit.installEventFilter(self)
+        layout.addWidget(self._edit)
+
+        self._list = QListWidget()
+        self._list.setItemDelegate(_ResultDelegate(self._list))
+        self._list.setUniformItemSizes(True)
+        self._list.itemActivated.connect(self._choose)
+        layout.addWidget(self._list)
+
+        self._apply_theme()
+        theme.changed.connect(lambda _: self._apply_theme())
+
+    # ── 公开 API ──────────────────────────────
+
+    def set_source(self, project_root: str, source):
+        """切换项目；source() 返回文件相对路径清单，立即在后台建索引"""
+        self._root = project_root
+        self._source = source
+        self._index = None
+        self._mru = []
+        self._rebuild()
+
+    def invalidate(self):
+        """文件清单变了：下次弹出时在后台重建索引，完成前沿用旧索引"""
+        self._stale = True
+
+    def clear(self):
+        self._root = ""
+        self._source = None
+        self._index = None
+        self._mru = []
+        self._stale = False
+        self._generation += 1
+
+    def note_opened(self, abs_path: str):
+        """记录最近打开的文件（用于排序加权）"""
+        if not self._root:
+            return
+        rel = os.path.relpath(abs_path, self._root).replace(os.sep, "/")
+        if rel.startswith(".."):
+            return
+        if rel in self._mru:
+            self._mru.remove(rel)
+        self._mru.insert(0, rel)
+        del self._mru[MRU_SIZE:]
+
+    def popup(self):
+        parent = self.parentWidget()
+        if parent is not None:
+            top_left = parent.mapToGlobal(parent.rect().topLeft())
+            x = top_left.x() + (parent.width() - self.WIDTH) // 2
+            self.setGeometry(x, top_left.y() + 60, self.WIDTH,
+                             _ResultDelegate.ROW_HEIGHT * self.MAX_ROWS + 48)
+        if self._stale:
+            self._rebuild()
+        self._edit.clear()
+        self._update_results("")
+        self.show()
+        self._edit.setFocus()
+
+    # ── 内部 ──────────────────────────────────
+
+    def _rebuild(self):
+        self._stale = False
+        self._generation += 1
+        if self._source is not None:
+            self._builder.build(self._generation, self._source())
+
+    def _on_index_built(self, generation: int, index: PathIndex):
+        if generation != self._generation:
+            return
+        self._index = index
+        if self.isVisible():
+            self._update_results(self._edit.text())
+
+    def _update_results(self, text: str):
+        self._list.clear()
+        if not text.strip():
+            # 空查询：列出最近打开的文件
+            for rel in self._mru[:TOP_K]:
+                self._add_row(rel, [])
+        elif self._index is not None:
+            recency = {rel: len(self._mru) - n for n, rel in enumerate(self._mru)}
+            for _score, rel, positions in self._index.search(text, TOP_K, recency):
+                self._add_row(rel, positions)
+        if self._list.count():
+            self._list.setCurrentRow(0)
+
+    def _add_row(self, rel: str, positions: list[int]):
+        item = QListWidgetItem(rel)
+        item.setData(_ROLE_POSITIONS, positions)
+        item.setToolTip(rel)
+        self._list.addItem(item)
+
+    def _choose(self, item: QListWidgetItem | None = None):
+        item = item or self._list.currentItem()
+        if item is None:
+            return
+        rel = item.text()
+        self.hide()
+        abs_path = os.path.join(self._root, *rel.split("/"))
+        self.note_opened(abs_path)
+        self.file_chosen.emit(abs_path)
+
+    def eventFilter(self, obj, event) -> bool:
+        if obj is self._edit and event.type() == QEvent.KeyPress:
+            key = event.key()
+            if key in (Qt.Key_Down, Qt.Key_Up):
+                row = self._list.currentRow() + (1 if key == Qt.Key_Down else -1)
+                if 0 <= row < self._list.count():
+                    self._list.setCurrentRow(row)
+                return True
+            if key in (Qt.Key_Return, Qt.Key_Enter):
+                self._choose()
+                return True
+            if key == Qt.Key_Escape:
+                self.hide()
+                return True
+        return super().eventFilter(obj, event)
+
+    def _apply_theme(self):
+        self.setStyleSheet(
+            f"QuickOpenPalette {{ background: {theme.BG_PANEL};"
+            f" border: 1px solid {theme.BORDER}; }}"
+            f"QLineEdit {{ background: {theme.BG_WIDGET}; color: {theme.FG_PRIMARY};"
+            f" border: 1px solid {theme.BORDER_INPUT}; padding: 4px; }}"
+            f"QLineEdit:focus {{ border-color: {theme.BORDER_FOCUS}; }}"
+            f"QListWidget {{ background: {theme.BG_PANEL}; border: none; }}"
+        )
@@ -0,0 +1,210 @@
+"""
+CartDark IDE · ui/central/syntax.py
+编辑器语法高亮：按行的单遍词法分析 + 跨行状态。
+
+  - 每种语言一个 lexer 函数：lexer(行文本, 进入状态) → (记号列表, 离开状态)，
+    一行只用一个合并后的正则从左到右扫描一次，关键字 / 内置名查集合
+  - 跨行的结构（Lua 的 --[[ ]] 注释、[[ ]] 长字符串，带 = 级别）记在块状态里
+    （setCurrentBlockState）；一行的离开状态不变时 Qt 不会继续重排后面的行，
+    编辑只重新高亮受影响的行
+  - lexer 与 Qt 无关，可以单独测试
+
+用法
+----
+highlighter = highlighter_for(file_path, editor.document())   # 不支持的类型返回 None
+"""
+from __future__ import annotations
+
+import os
+import re
+
+from PySide6.QtGui import QColor, QSyntaxHighlighter, QTextCharFormat, QTextDocument
+
+
+# ──────────────────────────────────────────────
+# 记号类别
+# ──────────────────────────────────────────────
+
+KEYWORD = "keyword"
+BUILTIN = "builtin"
+STRING = "string"
+NUMBER = "number"
+COMMENT = "comment"
+KEY = "key"             # JSON 对象键
+CONSTANT = "constant"   # JSON true / false / null
+
+# (颜色, 粗体, 斜体)
+_STYLES = {
+    KEYWORD:  ("#c678dd", True, False),
+    BUILTIN:  ("#61afef", False, False),
+    STRING:   ("#98c379", False, False),
+    NUMBER:   ("#d19a66", False, False),
+    COMMENT:  ("#5c6370", False, True),
+    KEY:      ("#e06c75", False, False),
+    CONSTANT: ("#c678dd", True, False),
+}
+
+# 块状态：0 为普通；长注释 / 长字符串为 类别基数 + 括号级别
+STATE_NORMAL = 0
+_STATE_LONG_COMMENT = 0x100
+_STATE_LONG_STRING = 0x200
+_STATE_LEVEL_MASK = 0xFF
+
+
+# ──────────────────────────────────────────────
+# Lua
+# ──────────────────────────────────────────────
+
+LUA_KEYWORDS = frozenset({
+    "and", "break", "do", "else", "elseif", "end", "false",
+    "for", "function", "goto", "if", "in", "local", "nil",
+    "not", "or", "repeat", "return", "then", "true", "until", "while",
+})
+
+LUA_BUILTINS = frozenset({
+    "print", "pairs", "ipairs", "type", "tostring", "tonumber",
+    "require", "math", "table", "string", "io", "os",
+})
+
+_LUA_TOKEN = re.compile(r"""
+    (?P<long_comment>--\[(?P<lc_eq>=*)\[)
+  | (?P<comment>--.*)
+  | (?P<long_string>\[(?P<ls_eq>=*)\[)
+  | (?P<string>"(?:[^"\\]|\\.)*"?|'(?:[^'\\]|\\.)*'?)
+  | (?P<number>0[xX][0-9a-fA-F]*(?:\.[0-9a-fA-F]*)?(?:[pP][+-]?\d+)?
+              |(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_]\w*)
+""", re.VERBOSE)
+
+_LUA_KINDS = {"comment": COMMENT, "string": STRING, "number": NUMBER}
+
+_LONG_CLOSE = [f"]{'=' * n}]" for n in range(_STATE_LEVEL_MASK + 1)]
+
+
+def _close_long(text: str, pos: int, level: int) -> int:
+    """从 pos 起找 ]==] 的结尾位置；找不到返回 -1"""
+    close = _LONG_CLOSE[level]
+    i = text.find(close, pos)
+    return -1 if i == -1 else i + len(close)
+
+
+def lex_lua(text: str, state: int) -> tuple[list[tuple[int, int, str]], int]:
+    tokens: list[tuple[int, int, str]] = []
+    pos = 0
+    if state:
+        # 上一行留下的长注释 / 长字符串
+        kind = COMMENT if state & _STATE_LONG_COMMENT else STRING
+        end = _close_long(text, 0, state & _STATE_LEVEL_MASK)
+        if end == -1:
+            tokens.append((0, len(text), kind))
+            return tokens, state
+        tokens.append((0, end, kind))
+        pos = end
+
+    search = _LUA_TOKEN.search
+    while True:
+        m = search(text, pos)
+        if m is None:
+            return tokens, STATE_NORMAL
+        group = m.lastgroup
+        start = m.start()
+        if group == "name":
+            word = m.group()
+            if word in LUA_KEYWORDS:
+                tokens.append((start, len(word), KEYWORD))
+            elif word in LUA_BUILTINS:
+                tokens.append((start, len(word), BUILTIN))
+            pos = m.end()
+        elif group == "long_comment" or group == "long_string":
+            is_comment = group == "long_comment"
+            level = min(len(m.group("lc_eq" if is_comment else "ls_eq")), _STATE_LEVEL_MASK)
+            kind = COMMENT if is_comment else STRING
+            end = _close_long(text, m.end(), level)
+            if end == -1:
+                tokens.append((start, len(text) - start, kind))
+                base = _STATE_LONG_COMMENT if is_comment else _STATE_LONG_STRING
+                return tokens, base | level
+            tokens.append((start, end - start, kind))
+            pos = end
+        else:
+            kind = _LUA_KINDS[group]
+            tokens.append((start, m.end() - start, kind))
+            pos = m.end()
+        if pos >= len(text):
+            return tokens, STATE_NORMAL
+
+
+# ──────────────────────────────────────────────
+# JSON（.json / .cart / .collection / .input_binding）
+# ──────────────────────────────────────────────
+
+_JSON_TOKEN = re.compile(r"""
+    (?P<string>"(?:[^"\\]|\\.)*"?)(?P<colon>\s*:)?
+  | (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<constant>\b(?:true|false|null)\b)
+""", re.VERBOSE)
+
+
+def lex_json(text: str, state: int) -> tuple[list[tuple[int, int, str]], int]:
+    tokens: list[tuple[int, int, str]] = []
+    for m in _JSON_TOKEN.finditer(text):
+        if m.group("string") is not None:
+            kind = KEY if m.group("colon") else STRING
+            tokens.append((m.start(), len(m.group("string")), kind))
+        elif m.group("number") is not None:
+            tokens.append((m.start(), m.end() - m.start(), NUMBER))
+        else:
+            tokens.append((m.start(), m.end() - m.start(), CONSTANT))
+    return tokens, STATE_NORMAL
+
+
+_LEXERS = {
+    ".lua": lex_lua,
+    ".json": lex_json,
+    ".cart": lex_json,
+    ".collection": lex_json,
+    ".input_binding": lex_json,
+}
+
+
+def lexer_for(file_path: str):
+    return _LEXERS.get(os.path.splitext(file_path)[1].lower())
+
+
+# ──────────────────────────────────────────────
+# 高亮器
+# ──────────────────────────────────────────────
+
+def _make_formats() -> dict[str, QTextCharFormat]:
+    formats = {}
+    for kind, (color, bold, italic) in _STYLES.items():
+        f = QTextCharFormat()
+        f.setForeground(QColor(color))
+        if bold:
+            f.setFontWeight(700)
+        if italic:
+            f.setFontItalic(True)
+        formats[kind] = f
+    return formats
+
+
+class SyntaxHighlighter(QSyntaxHighlighter):
+    """用 lexer 高亮每一块；块状态即 lexer 的离开状态"""
+
+    def __init__(self, document: QTextDocument, lexer):
+        super().__init__(document)
+        self._lexer = lexer
+        self._formats = _make_formats()
+
+    def highlightBlock(self, text: str):
+        state = self.previousBlockState()
+        tokens, end_state = self._lexer(text, state if state > 0 else STATE_NORMAL)
+        formats = self._formats
+        for start, length, kind in tokens:
+            self.setFormat(start, length, formats[kind])
+        self.setCurrentBlockState(end_state)
+
+
+def highlighter_for(file_path: str, document: QTextDocument) -> SyntaxHighlighter | None:
+    lexer = lexer_for(file_path)
+    return SyntaxHighlighter(document, lexer) if lexer is not None else None
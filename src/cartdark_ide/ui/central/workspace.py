@@ -1,17 +1,54 @@
 """
 CartDark IDE · ui/central/workspace.py
 中央工作区：管理标签页 + 编辑器 + 欢迎页。
+
+标签休眠：同时保留的编辑器不超过上限（设置 editor/max_live_editors），
+超出时最久未使用、未修改的后台编辑器被销毁，只留下 EditorSnapshot
+（路径、打开模式、光标和滚动位置）；标签栏不变，切回该标签时重新创建编辑器。
+
+会话：session_state() / restore_session() 导出和恢复全部标签与最近关闭的标签，
+恢复时只创建当前标签的编辑器，其余标签都以休眠状态出现（见 SessionService）。
 """
 from __future__ import annotations
 
 import os
+from collections import OrderedDict
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QStackedWidget, QMessageBox
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 
 from .welcome_page import WelcomePage
 from ..theme import theme
 from .editor_host import EditorHost, make_editor
 from ..widgets.tab_header import TabHeader
+from ...services.file_io_service import IORequest
+from ...state.settings_store import SettingsStore
+
+
+# 最近关闭的标签最多记多少个（⌘⇧T 重新打开）
+CLOSED_TAB_LIMIT = 20
+
+
+class EditorSnapshot:
+    """休眠标签：重新创建编辑器所需的全部信息"""
+
+    __slots__ = ("file_path", "mode", "state")
+
+    def __init__(self, file_path: str, mode: str, state: dict):
+        self.file_path = file_path
+        self.mode = mode
+        self.state = state      # 编辑器 view_state() 的结果
+
+    def to_dict(self) -> dict:
+        return {"path": self.file_path, "mode": self.mode, "state": self.state}
+
+    @classmethod
+    def from_dict(cls, data) -> EditorSnapshot | None:
+        """会话文件里的一项；格式不对时返回 None"""
+        if not isinstance(data, dict) or not isinstance(data.get("path"), str):
+            return None
+        mode = data.get("mode") if data.get("mode") in ("editor", "text") else "editor"
+        state = data.get("state") if isinstance(data.get("state"), dict) else {}
+        return cls(data["path"], mode, state)
 
 
 class Workspace(QWidget):
@@ -20,8 +57,21 @@ class Workspace(QWidget):
 
     外部调用：
         workspace.open_file(abs_path)   打开或切换到指定文件
+
+    信号
+    ----
+    file_saved(str)
+        某个文件已写入磁盘，携带绝对路径。
+    current_changed(object)
+        当前编辑器切换，携带编辑器；没有标签时为 None。
+    save_failed(str, str)
+        (绝对路径, 错误信息)，写入失败。
     """
 
+    file_saved = Signal(str)
+    current_changed = Signal(object)
+    save_failed = Signal(str, str)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         root_layout = QVBoxLayout(self)
@@ -50,6 +100,15 @@ class Workspace(QWidget):
 
         # file_path → EditorHost
         self._editors: dict[str, EditorHost] = {}
+        # file_path → 休眠标签（与 _editors 不相交，两者合起来就是标签栏上的全部标签）
+        self._snapshots: dict[str, EditorSnapshot] = {}
+        # 标签的使用顺序，最近使用的在末尾
+        self._recent: OrderedDict[str, None] = OrderedDict()
+        # 最近关闭的标签，最近关闭的在末尾
+        self._closed: list[EditorSnapshot] = []
+        # file_path → 尚未写完的保存（写完前不休眠该编辑器）
+        self._saving: dict[str, IORequest] = {}
+        self._live_limit = SettingsStore().max_live_editors
 
     # ── 主题 ──────────────────────────────────
 
@@ -68,28 +127,18 @@ class Workspace(QWidget):
         if not os.path.isfile(file_path):
             return
 
-        if file_path in self._editors:
-            existing_mode = getattr(self._editors[file_path], "_open_mode", "editor")
+        existing_mode = self._mode_of(file_path)
+        if existing_mode is not None:
             if existing_mode == mode:
-                self._tab_bar.set_active(file_path)
-                self._stack.setCurrentWidget(self._editors[file_path])
+                self._activate(file_path)
                 return
             else:
                 # mode 不同，关闭后重新以新 mode 打开
-                self._close_tab(file_path, confirm=True)
+                self._close_tab(file_path, confirm=True, show_next=False)
                 if file_path in self._editors:
                     return  # 用户取消了关闭确认
 
-        # 新建编辑器：mode=="text" 强制纯文本，否则走工厂函数
-        if mode == "text":
-            editor = EditorHost(file_path)
-        else:
-            editor = make_editor(file_path)
-        editor._open_mode = mode  # 记录打开模式
-        editor.modified_changed.connect(
-            lambda mod, fp=file_path: self._on_editor_modified(fp, mod)
-        )
-
+        editor = self._create_editor(file_path, mode)
         self._editors[file_path] = editor
         self._stack.addWidget(editor)
 
@@ -97,49 +146,190 @@ class Workspace(QWidget):
         self._tab_bar.add_tab(file_path, title)
         self._tab_bar.setVisible(True)
         self._stack.setCurrentWidget(editor)
+        self._touch(file_path)
+        self._enforce_budget()
+        self.current_changed.emit(editor)
+
+    def open_location(self, file_path: str, line: int, col: int = 0, length: int = 0):
+        """打开文件并跳到指定位置；结构化编辑器的文件以纯文本打开"""
+        ext = os.path.splitext(file_path)[1].lower()
+        mode = "text" if ext in (".cart", ".input_binding") else "editor"
+        existing = self._editors.get(file_path)
+        snapshot = self._snapshots.get(file_path)
+        if existing is not None and hasattr(existing, "go_to"):
+            mode = getattr(existing, "_open_mode", mode)
+        elif snapshot is not None and mode == "editor":
+            # 非结构化文件两种模式都是纯文本编辑器，沿用原来的模式免得重开
+            mode = snapshot.mode
+        self.open_file(file_path, mode)
+        editor = self._editors.get(file_path)
+        if editor is not None and hasattr(editor, "go_to"):
+            editor.go_to(line, col, length)
+
+    def current_editor(self):
+        """当前激活的编辑器；没有时返回 None"""
+        return self._editors.get(self._tab_bar.active_id or "")
+
+    def editor_for(self, file_path: str):
+        """已打开的编辑器；未打开或标签在休眠时返回 None（内容与磁盘一致）"""
+        return self._editors.get(file_path)
+
+    def reload_files(self, file_paths):
+        """磁盘上的文件被 IDE 改写后，重新读入未修改的已打开编辑器"""
+        for fp in file_paths:
+            editor = self._editors.get(fp)
+            if editor is not None and not editor.modified and hasattr(editor, "reload"):
+                editor.reload()
 
     def close_file(self, file_path: str):
         """关闭指定文件的标签，不弹确认（文件已被外部删除时调用）"""
-        if file_path in self._editors:
+        if file_path in self._editors or file_path in self._snapshots:
             self._close_tab(file_path, confirm=False)
 
     def save_current(self) -> bool:
-        """保存当前激活的文件"""
+        """保存当前激活的文件（后台写入），返回是否发出了写入"""
         tab_id = self._tab_bar.active_id
         if tab_id and tab_id in self._editors:
-            return self._editors[tab_id].save()
+            return self._save(tab_id) is not None
         return False
 
-    def save_all(self) -> bool:
-        """保存所有已修改的文件"""
-        ok = True
-        for editor in self._editors.values():
-            if editor.modified:
-                ok = editor.save() and ok
-        return ok
+    def save_all(self, callback=None):
+        """
+        保存所有已修改的文件：写入同时发出、并行完成。
+        全部写完后调用 callback(是否全部成功)。
+        """
+        requests = [req for fp, editor in list(self._editors.items())
+                    if editor.modified and (req := self._save(fp)) is not None]
+        if callback is None:
+            return
+        if not requests:
+            callback(True)
+            return
+        state = {"left": len(requests), "ok": True}
+
+        def one_done(ok: bool):
+            state["left"] -= 1
+            state["ok"] = state["ok"] and ok
+            if state["left"] == 0:
+                callback(state["ok"])
+
+        for req in requests:
+            req.finished.connect(lambda _result: one_done(True))
+            req.failed.connect(lambda _msg: one_done(False))
+
+    def close_current_tab(self):
+        """关闭当前标签（⌘W），有未保存修改时询问"""
+        tab_id = self._tab_bar.active_id
+        if tab_id:
+            self._close_by_user(tab_id)
+
+    def reopen_last_closed(self):
+        """重新打开最近关闭的标签（⌘⇧T），恢复光标和滚动位置"""
+        while self._closed:
+            snapshot = self._closed.pop()
+            fp = snapshot.file_path
+            if self._mode_of(fp) is not None or not os.path.isfile(fp):
+                # 已经又打开了，或文件已不在
+                continue
+            self.open_file(fp, snapshot.mode)
+            editor = self._editors.get(fp)
+            if editor is not None and snapshot.state and hasattr(editor, "restore_view_state"):
+                editor.restore_view_state(snapshot.state)
+            return
 
-    def close_all(self):
-        """关闭所有标签（项目关闭时调用）"""
+    def close_all(self, confirm: bool = False):
+        """
+        关闭所有标签（项目关闭时调用）。
+        confirm 为 True 时逐个询问未保存的修改，选择「取消」的标签保留。
+        """
+        # 先丢掉休眠标签，免得关闭过程中被逐个唤醒
+        for fp in list(self._snapshots):
+            self._close_tab(fp, confirm=False, show_next=False)
         for fp in list(self._editors.keys()):
-            self._close_tab(fp, confirm=False)
+            self._close_tab(fp, confirm=confirm, show_next=False)
+        self._closed.clear()
+        self._show_active()
+
+    def session_state(self) -> dict:
+        """
+        导出会话：标签（按标签栏顺序）、当前标签和最近关闭的标签。
+        {"tabs": [EditorSnapshot.to_dict(), ...], "active": 路径 | None, "closed": [...]}
+        """
+        tabs = []
+        for fp in self._tab_bar.tab_ids:
+            snapshot = self._snapshot_of(fp)
+            if snapshot is not None:
+                tabs.append(snapshot.to_dict())
+        return {
+            "tabs":   tabs,
+            "active": self._tab_bar.active_id,
+            "closed": [s.to_dict() for s in self._closed],
+        }
+
+    def restore_session(self, state: dict):
+        """
+        恢复 session_state() 导出的会话：标签全部以休眠状态加入，
+        只唤醒当前标签；已经打开的文件跳过。
+        调用方负责去掉磁盘上已不存在的文件（SessionService 在工作线程里做）。
+        """
+        previous = self._tab_bar.active_id
+        restored = []
+        for entry in state.get("tabs", []):
+            snapshot = EditorSnapshot.from_dict(entry)
+            if snapshot is None:
+                continue
+            fp = snapshot.file_path
+            if self._mode_of(fp) is not None:
+                continue
+            self._snapshots[fp] = snapshot
+            self._tab_bar.add_tab(fp, os.path.basename(fp))
+            self._touch(fp)
+            restored.append(fp)
+
+        closed = [s for s in map(EditorSnapshot.from_dict, state.get("closed", []))
+                  if s is not None]
+        self._closed = closed[-CLOSED_TAB_LIMIT:]
+
+        if not restored:
+            return
+        self._tab_bar.setVisible(True)
+        # 恢复前用户已经打开了文件时，保持在那个标签上
+        active = state.get("active")
+        if previous is not None:
+            active = previous
+        elif active not in restored:
+            active = restored[-1]
+        self._activate(active)
+
+    def set_live_editor_limit(self, count: int):
+        """修改同时保留的编辑器个数，超出的立即休眠"""
+        self._live_limit = max(count, 1)
+        self._enforce_budget()
 
     # ── 内部槽 ────────────────────────────────
 
     def _on_tab_activated(self, tab_id: str):
-        if tab_id in self._editors:
-            self._stack.setCurrentWidget(self._editors[tab_id])
+        if tab_id in self._editors or tab_id in self._snapshots:
+            self._activate(tab_id)
 
     def _on_tab_close_requested(self, tab_id: str):
-        self._close_tab(tab_id, confirm=True)
+        self._close_by_user(tab_id)
 
     def _on_editor_modified(self, file_path: str, modified: bool):
         self._tab_bar.set_modified(file_path, modified)
 
     # ── 内部方法 ──────────────────────────────
 
-    def _close_tab(self, file_path: str, confirm: bool):
+    def _close_tab(self, file_path: str, confirm: bool, show_next: bool = True):
+        """关闭标签；show_next 为 False 时不切到下一个标签（调用方随后自己处理）"""
         editor = self._editors.get(file_path)
         if not editor:
+            if self._snapshots.pop(file_path, None) is not None:
+                # 休眠标签没有未保存的内容
+                self._recent.pop(file_path, None)
+                self._tab_bar.remove_tab(file_path)
+                if show_next:
+                    self._show_active()
             return
 
         if confirm and editor.modified:
@@ -148,13 +338,137 @@ class Workspace(QWidget):
             if choice == "cancel":
                 return
             if choice == "save":
-                editor.save()
+                self._save(file_path)
 
         # 移除
+        if hasattr(editor, "release"):
+            editor.release()
         self._tab_bar.remove_tab(file_path)
         self._stack.removeWidget(editor)
         editor.deleteLater()
         del self._editors[file_path]
+        self._recent.pop(file_path, None)
+        if show_next:
+            self._show_active()
+
+    def _close_by_user(self, file_path: str):
+        """用户关闭标签：关掉后记入最近关闭的标签"""
+        snapshot = self._snapshot_of(file_path)
+        self._close_tab(file_path, confirm=True)
+        if snapshot is not None and self._mode_of(file_path) is None:
+            self._closed.append(snapshot)
+            del self._closed[:-CLOSED_TAB_LIMIT]
+
+    def _snapshot_of(self, file_path: str) -> EditorSnapshot | None:
+        """标签当前的快照：休眠的直接取，打开的现取界面状态"""
+        snapshot = self._snapshots.get(file_path)
+        if snapshot is not None:
+            return snapshot
+        editor = self._editors.get(file_path)
+        if editor is None:
+            return None
+        state = editor.view_state() if hasattr(editor, "view_state") else {}
+        return EditorSnapshot(file_path, getattr(editor, "_open_mode", "editor"), state)
+
+    def _show_active(self):
+        """关闭标签后，显示标签栏上新的当前标签；没有标签了回到欢迎页"""
+        active = self._tab_bar.active_id
+        if active is not None:
+            self._activate(active)
+        else:
+            self._tab_bar.setVisible(False)
+            self._stack.setCurrentWidget(self._welcome)
+            self.current_changed.emit(None)
+
+    def _mode_of(self, file_path: str) -> str | None:
+        """已打开（含休眠）标签的打开模式；未打开时返回 None"""
+        editor = self._editors.get(file_path)
+        if editor is not None:
+            return getattr(editor, "_open_mode", "editor")
+        snapshot = self._snapshots.get(file_path)
+        return snapshot.mode if snapshot is not None else None
+
+    def _create_editor(self, file_path: str, mode: str):
+        # mode=="text" 强制纯文本，否则走工厂函数
+        if mode == "text":
+            editor = EditorHost(file_path)
+        else:
+            editor = make_editor(file_path)
+        editor._open_mode = mode  # 记录打开模式
+        editor.modified_changed.connect(
+            lambda mod, fp=file_path: self._on_editor_modified(fp, mod)
+        )
+        return editor
+
+    def _activate(self, file_path: str):
+        """切到指定标签，休眠的先唤醒"""
+        editor = self._editors.get(file_path)
+        if editor is None:
+            editor = self._wake(file_path)
+        self._tab_bar.set_active(file_path)
+        self._stack.setCurrentWidget(editor)
+        self._touch(file_path)
+        self._enforce_budget()
+        self.current_changed.emit(editor)
+
+    # ── 标签休眠 ──────────────────────────────
+
+    def _touch(self, file_path: str):
+        self._recent[file_path] = None
+        self._recent.move_to_end(file_path)
+
+    def _enforce_budget(self):
+        """编辑器超过上限时，从最久未使用的开始休眠可以休眠的"""
+        excess = len(self._editors) - self._live_limit
+        if excess <= 0:
+            return
+        active = self._tab_bar.active_id
+        for fp in list(self._recent):
+            if excess <= 0:
+                break
+            editor = self._editors.get(fp)
+            if (editor is None or fp == active or editor.modified
+                    or fp in self._saving or getattr(editor, "_loading", False)):
+                # 已休眠 / 当前标签 / 有未保存修改 / 正在写入 / 还在载入的不动
+                continue
+            self._hibernate(fp)
+            excess -= 1
+
+    def _hibernate(self, file_path: str):
+        self._snapshots[file_path] = self._snapshot_of(file_path)
+        editor = self._editors.pop(file_path)
+        if hasattr(editor, "release"):
+            editor.release()
+        self._stack.removeWidget(editor)
+        editor.deleteLater()
+
+    def _wake(self, file_path: str):
+        snapshot = self._snapshots.pop(file_path)
+        editor = self._create_editor(file_path, snapshot.mode)
+        self._editors[file_path] = editor
+        self._stack.addWidget(editor)
+        if snapshot.state and hasattr(editor, "restore_view_state"):
+            editor.restore_view_state(snapshot.state)
+        return editor
+
+    def _save(self, file_path: str):
+        """发出写入，返回 IORequest；编辑器没有可写内容时返回 None"""
+        req = self._editors[file_path].save()
+        if req is not None:
+            self._saving[file_path] = req
+            req.finished.connect(lambda _result, fp=file_path, r=req: self._on_saved(fp, r, None))
+            req.failed.connect(lambda msg, fp=file_path, r=req: self._on_saved(fp, r, msg))
+        return req
+
+    def _on_saved(self, file_path: str, req: IORequest, error: str | None):
+        if self._saving.get(file_path) is req:
+            del self._saving[file_path]
+            # 写入期间被跳过的休眠现在可以补上
+            self._enforce_budget()
+        if error is None:
+            self.file_saved.emit(file_path)
+        else:
+            self.save_failed.emit(file_path, error)
 
     def _ask_save(self, filename: str) -> str:
         """弹出保存确认，返回 'save' / 'discard' / 'cancel'"""
@@ -204,9 +518,4 @@ class Workspace(QWidget):
         save.clicked.connect(lambda: (result.update(choice="save"),    dlg.accept()))
 
         dlg.exec()
-        return result["choice"]
-
-        # 没有标签了，回到欢迎页
-        if not self._editors:
-            self._tab_bar.setVisible(False)
-            self._stack.setCurrentWidget(self._welcome)
\ No newline at end of file
+        return result["choice"]
\ No newline at end of file
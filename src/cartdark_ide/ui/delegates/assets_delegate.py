@@ -2,6 +2,9 @@ from PySide6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem
 from PySide6.QtGui import QPainter, QColor, QFont
 from PySide6.QtCore import Qt, QModelIndex, QSize
 
+from ..icons import get_icon, is_dark_mode
+from ..models.assets_fs_model import ICON_NAME_ROLE
+
 
 class AssetsDelegate(QStyledItemDelegate):
     """
@@ -11,11 +14,29 @@ class AssetsDelegate(QStyledItemDelegate):
     - 根节点使用加粗字体
     - 鼠标悬停行高亮（浅色背景）
     - 统一行高
+    - 图标按模型的图标名在绘制时从缓存取用，主题切换后调用
+      on_theme_changed() 再重绘视口即可
     """
 
     ROW_HEIGHT = 24          # 每行高度（像素）
     INDENT_EXTRA = 4         # 额外缩进补偿
 
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._dark: bool | None = None     # 当前主题，None 表示下次绘制时读取调色板
+
+    def on_theme_changed(self):
+        self._dark = None
+
+    def initStyleOption(self, option: QStyleOptionViewItem, index: QModelIndex):
+        super().initStyleOption(option, index)
+        name = index.data(ICON_NAME_ROLE)
+        if name:
+            if self._dark is None:
+                self._dark = is_dark_mode()
+            option.icon = get_icon(name, self._dark)
+            option.features |= QStyleOptionViewItem.HasDecoration
+
     def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
         size = super().sizeHint(option, index)
         return QSize(size.width(), self.ROW_HEIGHT)
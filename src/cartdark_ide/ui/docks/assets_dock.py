@@ -11,12 +11,13 @@ import sys
 
 from PySide6.QtWidgets import (
     QDockWidget, QTreeView, QMenu, QInputDialog, QMessageBox,
-    QFileDialog, QLineEdit
+    QFileDialog, QLineEdit, QAbstractItemView
 )
 from PySide6.QtCore import Qt, Signal, QModelIndex, QPoint
 
-from ..models.assets_fs_model import AssetsFsModel, AssetsItem
+from ..models.assets_fs_model import AssetsFsModel
 from ..delegates.assets_delegate import AssetsDelegate
+from ..theme import theme
 
 
 class AssetsDock(QDockWidget):
@@ -33,19 +34,31 @@ class AssetsDock(QDockWidget):
             QDockWidget.DockWidgetClosable
         )
         self._model = AssetsFsModel(self)
+        self._model.directory_loaded.connect(self._on_directory_loaded)
         self._project_root: str = ""
+        self._index = None                   # WorkspaceIndex，见 set_workspace_index
+        self._pending_expand: set = set()    # 刷新后待恢复展开、尚未加载到的目录
+        self._pending_reveal: str = ""       # 待定位、所在目录尚未加载的路径
 
         self._tree = QTreeView()
         self._tree.setHeaderHidden(True)
+        self._tree.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self._tree.setModel(self._model)
-        self._tree.setItemDelegate(AssetsDelegate(self._tree))
+        self._delegate = AssetsDelegate(self._tree)
+        self._tree.setItemDelegate(self._delegate)
         self._tree.activated.connect(self._on_item_activated)
         self._tree.setContextMenuPolicy(Qt.CustomContextMenu)
         self._tree.customContextMenuRequested.connect(self._on_context_menu)
         self.setWidget(self._tree)
+        theme.changed.connect(lambda _name: self.on_theme_changed())
 
     # ── 公开 API ──────────────────────────────
 
+    def set_workspace_index(self, index):
+        """项目文件索引：pack 校验取其文件清单，资源树共用其目录监视"""
+        self._index = index
+        self._model.set_watcher(index.watcher)
+
     def load_project(self, project_root: str, project_name: str = ""):
         self._project_root = os.path.abspath(project_root)
         self._model.load_from_root(project_root, project_name)
@@ -53,22 +66,32 @@ class AssetsDock(QDockWidget):
 
     def close_project(self):
         self._project_root = ""
+        self._pending_expand.clear()
+        self._pending_reveal = ""
         self._model.clear()
-        self._model.setHorizontalHeaderLabels(["名称"])
-        self._model._show_placeholder()
+
+    def reveal_path(self, abs_path: str):
+        """在资源树中选中并滚动到 abs_path，沿途目录按需加载并展开"""
+        abs_path = os.path.abspath(abs_path)
+        if not self._project_root or not abs_path.startswith(self._project_root):
+            return
+        parent = os.path.dirname(abs_path)
+        while len(parent) >= len(self._project_root):
+            self._pending_expand.add(parent)
+            parent = os.path.dirname(parent)
+        self._pending_reveal = abs_path
+        self._restore_expanded_paths(self._pending_expand)
+        self._finish_reveal()
 
     def on_theme_changed(self):
-        from ..icons import clear_cache
-        clear_cache()
-        self._model.reload_icons()
+        # 图标由委托在绘制时按主题取用，只需重绘可见区域
+        self._delegate.on_theme_changed()
+        self._tree.viewport().update()
 
     # ── 文件激活 ──────────────────────────────
 
     def _on_item_activated(self, index: QModelIndex):
-        item = self._model.itemFromIndex(index)
-        if not item:
-            return
-        abs_path = getattr(item, "_abs_path", "")
+        abs_path = self._model.path_for(index)
         if abs_path and os.path.isfile(abs_path):
             self.file_activated.emit(abs_path, "editor")
 
@@ -80,10 +103,13 @@ class AssetsDock(QDockWidget):
         if not index.isValid():
             self._show_blank_menu(global_pos)
             return
-        item = self._model.itemFromIndex(index)
-        if not isinstance(item, AssetsItem) or not item._abs_path:
+        abs_path = self._model.path_for(index)
+        if not abs_path:
+            return
+        selected = self._selected_paths()
+        if len(selected) > 1 and abs_path in selected:
+            self._show_multi_menu(selected, global_pos)
             return
-        abs_path = item._abs_path
         if os.path.isdir(abs_path):
             self._show_dir_menu(abs_path, global_pos)
         else:
@@ -141,6 +167,15 @@ class AssetsDock(QDockWidget):
             menu.addAction("复制路径",        lambda: self._cmd_copy_path(abs_path))
         menu.exec(pos)
 
+    def _show_multi_menu(self, paths: list, pos):
+        menu = QMenu(self)
+        n = str(len(paths))
+        menu.addAction("移动 " + n + " 项到…", lambda: self._cmd_move_many(paths))
+        menu.addAction("删除 " + n + " 项…",   lambda: self._cmd_delete_many(paths))
+        menu.addSeparator()
+        menu.addAction("复制路径", lambda: self._cmd_copy_path("\n".join(paths)))
+        menu.exec(pos)
+
     def _show_file_menu(self, abs_path: str, pos):
         menu = QMenu(self)
         name      = os.path.basename(abs_path)
@@ -236,7 +271,7 @@ class AssetsDock(QDockWidget):
         except Exception as e:
             QMessageBox.warning(self, "打包清单", "文件已创建，但写入 pack.json 失败：" + str(e))
 
-        self._cmd_refresh()
+        self._sync_dirs(parent_dir)
 
     def _cmd_new_file(self, parent_dir: str):
         if not parent_dir:
@@ -250,7 +285,7 @@ class AssetsDock(QDockWidget):
             return
         try:
             open(path, "w").close()
-            self._cmd_refresh()
+            self._sync_dirs(parent_dir)
         except OSError as e:
             QMessageBox.critical(self, "新建文件", str(e))
 
@@ -266,7 +301,7 @@ class AssetsDock(QDockWidget):
             return
         try:
             os.makedirs(path)
-            self._cmd_refresh()
+            self._sync_dirs(parent_dir)
         except OSError as e:
             QMessageBox.critical(self, "新建文件夹", str(e))
 
@@ -282,7 +317,7 @@ class AssetsDock(QDockWidget):
         try:
             os.rename(abs_path, new_path)
             self._pack_sync_rename(abs_path, new_path)
-            self._cmd_refresh()
+            self._sync_dirs(os.path.dirname(abs_path))
         except OSError as e:
             QMessageBox.critical(self, "重命名", str(e))
 
@@ -304,10 +339,60 @@ class AssetsDock(QDockWidget):
             shutil.rmtree(abs_path) if is_dir else os.remove(abs_path)
             self._pack_sync_delete(abs_path)
             self.file_deleted.emit(abs_path)
-            self._cmd_refresh()
+            self._sync_dirs(os.path.dirname(abs_path))
         except OSError as e:
             QMessageBox.critical(self, "删除", str(e))
 
+    def _cmd_delete_many(self, paths: list):
+        msg = "确定删除选中的 " + str(len(paths)) + " 项？文件夹将递归删除，此操作不可撤销。"
+        btn = QMessageBox.question(self, "删除", msg,
+                                   QMessageBox.Yes | QMessageBox.Cancel, QMessageBox.Cancel)
+        if btn != QMessageBox.Yes:
+            return
+        deleted, errors = [], []
+        for p in paths:
+            try:
+                shutil.rmtree(p) if os.path.isdir(p) else os.remove(p)
+                deleted.append(p)
+            except OSError as e:
+                errors.append(os.path.basename(p) + "：" + str(e))
+        self._pack_sync_delete_many(deleted)
+        for p in deleted:
+            self.file_deleted.emit(p)
+        self._sync_dirs(*{os.path.dirname(p) for p in deleted})
+        if errors:
+            QMessageBox.warning(self, "删除", "\n".join(errors))
+
+    def _cmd_move_many(self, paths: list):
+        target = QFileDialog.getExistingDirectory(self, "移动到", self._project_root)
+        if not target:
+            return
+        target = os.path.abspath(target)
+        root = self._project_root + os.sep
+        if target != self._project_root and not target.startswith(root):
+            QMessageBox.warning(self, "移动", "只能移动到项目目录内")
+            return
+        moves, errors = [], []
+        for p in paths:
+            dst = os.path.join(target, os.path.basename(p))
+            if dst == p:
+                continue
+            if target == p or target.startswith(p + os.sep):
+                errors.append(os.path.basename(p) + "：不能移动到自身内部")
+                continue
+            if os.path.exists(dst):
+                errors.append(os.path.basename(p) + "：目标已存在")
+                continue
+            try:
+                shutil.move(p, dst)
+                moves.append((p, dst))
+            except OSError as e:
+                errors.append(os.path.basename(p) + "：" + str(e))
+        self._pack_sync_rename_many(moves)
+        self._sync_dirs(target, *{os.path.dirname(p) for p, _ in moves})
+        if errors:
+            QMessageBox.warning(self, "移动", "\n".join(errors))
+
     def _cmd_duplicate(self, abs_path: str):
         base, ext = os.path.splitext(abs_path)
         new_path = base + "_副本" + ext
@@ -317,7 +402,7 @@ class AssetsDock(QDockWidget):
             n += 1
         try:
             shutil.copy2(abs_path, new_path)
-            self._cmd_refresh()
+            self._sync_dirs(os.path.dirname(abs_path))
         except OSError as e:
             QMessageBox.critical(self, "复制", str(e))
 
@@ -343,7 +428,7 @@ class AssetsDock(QDockWidget):
                 shutil.copy2(src, dst)
             except OSError as e:
                 QMessageBox.warning(self, "导入", str(e))
-        self._cmd_refresh()
+        self._sync_dirs(target_dir)
 
     def _cmd_import_to_pack(self, target_dir: str):
         self._cmd_import(target_dir)
@@ -362,7 +447,15 @@ class AssetsDock(QDockWidget):
         from PySide6.QtWidgets import QApplication
         QApplication.clipboard().setText(abs_path)
 
+    def _sync_dirs(self, *dir_paths: str):
+        """本面板改动磁盘后立即把这些目录的变化应用到树上（增量，不重建）"""
+        if not self._project_root:
+            return
+        self._model.sync_dirs(dir_paths)
+        self.project_changed.emit()
+
     def _cmd_refresh(self):
+        """完整重新扫描（右键「刷新」）；日常变化由文件监视增量更新"""
         if not self._project_root:
             return
         expanded = self._get_expanded_paths()
@@ -379,7 +472,7 @@ class AssetsDock(QDockWidget):
 
     def _cmd_validate_pack(self):
         from ...project.pack_sync import validate
-        issues = validate(self._project_root)
+        issues = validate(self._project_root, self._index)
         if not issues:
             QMessageBox.information(self, "校验打包清单", "未发现问题")
         else:
@@ -396,7 +489,6 @@ class AssetsDock(QDockWidget):
         from ...project.pack_sync import regenerate_from_res
         if regenerate_from_res(self._project_root):
             QMessageBox.information(self, "重新生成清单", "已完成，请检查 pack.json")
-            self._cmd_refresh()
         else:
             QMessageBox.critical(self, "重新生成清单", "操作失败")
 
@@ -422,26 +514,19 @@ class AssetsDock(QDockWidget):
                 "发现问题：\n\n" + "\n".join("• " + i for i in issues))
 
     def _cmd_add_to_pack(self, abs_path: str):
+        from ...project.pack_sync import chunks_containing
         rel = os.path.relpath(abs_path, self._project_root).replace(os.sep, "/")
-        QMessageBox.information(self, "加入打包清单",
-            "pack.json 使用 glob 匹配 res/**/*，\n" + rel + " 已自动包含在打包范围内。")
+        hits = chunks_containing(self._project_root, abs_path)
+        if hits:
+            QMessageBox.information(self, "加入打包清单",
+                rel + " 已包含在打包范围内（chunks[" + ", ".join(map(str, hits)) + "]）。")
+        else:
+            QMessageBox.information(self, "加入打包清单",
+                rel + " 不在任何 chunk 的 glob 范围内，或已被 exclude 排除。")
 
     def _cmd_remove_from_pack(self, abs_path: str):
-        from ...project.pack_sync import _find_pack_json, _load, _save
-        pack_path = _find_pack_json(self._project_root)
-        if not pack_path:
-            return
-        data = _load(pack_path)
-        changed = False
-        for chunk in data.get("chunks", []):
-            if chunk.get("type") == "RES":
-                excl = chunk.setdefault("exclude", [])
-                pattern = "**/" + os.path.basename(abs_path)
-                if pattern not in excl:
-                    excl.append(pattern)
-                    changed = True
-        if changed:
-            _save(pack_path, data)
+        from ...project.pack_sync import exclude_from_res_chunks
+        if exclude_from_res_chunks(self._project_root, abs_path):
             QMessageBox.information(self, "打包清单",
                 os.path.basename(abs_path) + " 已加入排除列表")
         else:
@@ -474,25 +559,63 @@ class AssetsDock(QDockWidget):
         except Exception:
             pass
 
+    def _pack_sync_rename_many(self, moves: list):
+        try:
+            from ...project.pack_sync import on_files_renamed
+            on_files_renamed(self._project_root, moves)
+        except Exception:
+            pass
+
+    def _pack_sync_delete_many(self, paths: list):
+        try:
+            from ...project.pack_sync import on_files_deleted
+            on_files_deleted(self._project_root, paths)
+        except Exception:
+            pass
+
+    def _selected_paths(self) -> list:
+        """选中项的绝对路径；父目录也被选中的条目不重复列出"""
+        paths = []
+        for idx in self._tree.selectionModel().selectedRows(0):
+            abs_path = self._model.path_for(idx)
+            if abs_path and abs_path != self._project_root:
+                paths.append(abs_path)
+        chosen = set(paths)
+        def covered(p):
+            parent = os.path.dirname(p)
+            while parent and parent != os.path.dirname(parent):
+                if parent in chosen:
+                    return True
+                parent = os.path.dirname(parent)
+            return False
+        return [p for p in paths if not covered(p)]
+
     def _get_expanded_paths(self) -> set:
-        expanded = set()
-        def walk(parent_index):
-            for row in range(self._model.rowCount(parent_index)):
-                idx = self._model.index(row, 0, parent_index)
-                if self._tree.isExpanded(idx):
-                    item = self._model.itemFromIndex(idx)
-                    if isinstance(item, AssetsItem):
-                        expanded.add(item._abs_path)
-                walk(idx)
-        walk(self._tree.rootIndex())
-        return expanded
+        # 只有已加载的目录可能处于展开状态
+        return {p for p in self._model.loaded_dirs()
+                if self._tree.isExpanded(self._model.index_for_path(p))}
 
     def _restore_expanded_paths(self, expanded: set):
-        def walk(parent_index):
-            for row in range(self._model.rowCount(parent_index)):
-                idx = self._model.index(row, 0, parent_index)
-                item = self._model.itemFromIndex(idx)
-                if isinstance(item, AssetsItem) and item._abs_path in expanded:
-                    self._tree.setExpanded(idx, True)
-                walk(idx)
-        walk(self._tree.rootIndex())
\ No newline at end of file
+        # 目录按需加载：已加载的立即展开，其余在所在目录加载完成后展开
+        self._pending_expand = set(expanded)
+        for path in sorted(expanded, key=len):
+            idx = self._model.index_for_path(path)
+            if idx.isValid():
+                self._pending_expand.discard(path)
+                self._tree.setExpanded(idx, True)
+
+    def _on_directory_loaded(self, dir_path: str):
+        if self._pending_expand:
+            for path in [p for p in self._pending_expand if os.path.dirname(p) == dir_path]:
+                self._pending_expand.discard(path)
+                self._tree.setExpanded(self._model.index_for_path(path), True)
+        if self._pending_reveal and os.path.dirname(self._pending_reveal) == dir_path:
+            self._finish_reveal()
+
+    def _finish_reveal(self):
+        idx = self._model.index_for_path(self._pending_reveal)
+        if not idx.isValid():
+            return
+        self._pending_reveal = ""
+        self._tree.setCurrentIndex(idx)
+        self._tree.scrollTo(idx)
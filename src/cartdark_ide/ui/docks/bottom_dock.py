@@ -5,6 +5,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtGui import QIcon, QPixmap, QPainter, QColor, QPen, QPainterPath
 from PySide6.QtCore import Qt, QSize, QSettings
 from ..bottom_tabs.console_tab import ConsoleTab
+from ..bottom_tabs.search_results_tab import SearchResultsTab
 
 
 def _load_dark() -> bool:
@@ -127,7 +128,9 @@ class BottomDock(QDockWidget):
         outer_layout.addWidget(self._separator)
         outer_layout.addWidget(self.stack)
 
-        tabs = [ConsoleTab(), QWidget(), QWidget(), QWidget()]
+        self.console_tab = ConsoleTab()
+        self.search_tab = SearchResultsTab()
+        tabs = [self.console_tab, QWidget(), self.search_tab, QWidget()]
         for shape, label, widget in zip(self._SHAPES, self._LABELS, tabs):
             self.tab_bar.addTab(_make_icon(shape, dark), label)
             self.stack.addWidget(widget)
@@ -135,6 +138,12 @@ class BottomDock(QDockWidget):
         self.setWidget(container)
         self._apply(dark)
 
+    def show_tab(self, widget: QWidget):
+        """显示面板并切换到 widget 所在的标签"""
+        self.setVisible(True)
+        self.raise_()
+        self.tab_bar.setCurrentIndex(self.stack.indexOf(widget))
+
     def _apply(self, dark: bool):
         """外部直接调用此方法切换主题"""
         self.tab_bar.setStyleSheet(_tab_stylesheet(dark))
@@ -1,4 +1,24 @@
-from PySide6.QtWidgets import QDockWidget, QWidget
+"""
+CartDark IDE · ui/docks/outline_dock.py
+大纲面板：当前 Lua 脚本的函数、表和 require。
+
+  - 跟随 Workspace 的当前编辑器（set_editor）；文档内容变化后停顿 OUTLINE_DELAY_MS 再请求
+  - 解析在 OutlineService 的后台线程里增量完成，输入时界面不等待大纲
+  - 更新后保持用户折叠过的节点；双击 / 回车跳到符号所在行
+"""
+from __future__ import annotations
+
+from PySide6.QtWidgets import QDockWidget, QWidget, QVBoxLayout, QTreeView, QLabel
+from PySide6.QtCore import Qt, QTimer, QModelIndex
+
+from ..theme import theme
+from ..models.outline_model import OutlineModel
+from ...services.outline_service import OutlineService
+
+
+# 停止输入多久后重新生成大纲
+OUTLINE_DELAY_MS = 400
+
 
 class OutlineDock(QDockWidget):
     """大纲面板"""
@@ -9,6 +29,128 @@ class OutlineDock(QDockWidget):
                          QDockWidget.DockWidgetFloatable |
                          QDockWidget.DockWidgetClosable)
 
+        self._editor = None
+        self._document = None
+        self._file_path = ""
+        self._collapsed: set[tuple] = set()     # 用户折叠的节点（祖先名称链）
+
+        self._service = OutlineService(self)
+        self._service.outline_ready.connect(self._on_outline)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(OUTLINE_DELAY_MS)
+        self._timer.timeout.connect(self._request)
+
         # 创建内容部件
         content_widget = QWidget()
+        layout = QVBoxLayout(content_widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        self._model = OutlineModel(self)
+        self._tree = QTreeView()
+        self._tree.setHeaderHidden(True)
+        self._tree.setUniformRowHeights(True)
+        self._tree.setModel(self._model)
+        self._tree.activated.connect(self._on_activated)
+        self._tree.collapsed.connect(lambda index: self._collapsed.add(self._key(index)))
+        self._tree.expanded.connect(lambda index: self._collapsed.discard(self._key(index)))
+        layout.addWidget(self._tree, 1)
+
+        self._empty = QLabel("当前文件没有大纲")
+        self._empty.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self._empty, 1)
+        self._tree.setVisible(False)
+
         self.setWidget(content_widget)
+        self._apply_theme()
+        theme.changed.connect(lambda _: self._apply_theme())
+
+    # ── 公开 API ──────────────────────────────
+
+    def set_editor(self, editor):
+        """切换到 editor 的大纲；不是 Lua 纯文本编辑器（或为 None）时显示空状态"""
+        if editor is self._editor:
+            return
+        self._detach()
+        self._editor = editor
+        path = getattr(editor, "file_path", "")
+        document = editor.document() if hasattr(editor, "document") else None
+        if document is None or not path.lower().endswith(".lua"):
+            self._show_empty()
+            return
+        self._document = document
+        self._file_path = path
+        self._collapsed.clear()
+        document.contentsChanged.connect(self._schedule)
+        self._request()
+
+    # ── 内部 ──────────────────────────────────
+
+    def _detach(self):
+        self._timer.stop()
+        self._service.cancel()
+        if self._document is not None:
+            try:
+                self._document.contentsChanged.disconnect(self._schedule)
+            except (RuntimeError, TypeError):
+                # 编辑器已销毁，连接随之断开
+                pass
+        self._editor = None
+        self._document = None
+        self._file_path = ""
+
+    def _schedule(self):
+        # 每次按键都重新计时，停顿后才请求
+        self._timer.start()
+
+    def _request(self):
+        if self._document is not None:
+            self._service.request(self._file_path, self._document.toPlainText())
+
+    def _on_outline(self, file_path: str, symbols: list):
+        if file_path != self._file_path:
+            return
+        self._model.set_symbols(symbols)
+        self._tree.setVisible(bool(symbols))
+        self._empty.setVisible(not symbols)
+        collapsed = set(self._collapsed)
+        self._tree.expandAll()
+        self._collapsed = collapsed
+        if collapsed:
+            self._restore_collapsed(QModelIndex())
+
+    def _restore_collapsed(self, parent: QModelIndex):
+        for row in range(self._model.rowCount(parent)):
+            index = self._model.index(row, 0, parent)
+            if not self._model.hasChildren(index):
+                continue
+            if self._key(index) in self._collapsed:
+                self._tree.collapse(index)
+            else:
+                self._restore_collapsed(index)
+
+    def _show_empty(self):
+        self._model.clear()
+        self._tree.setVisible(False)
+        self._empty.setVisible(True)
+
+    def _key(self, index: QModelIndex) -> tuple:
+        names = []
+        sym = self._model.symbol(index)
+        while sym is not None:
+            names.append(sym.name)
+            sym = sym.parent
+        return tuple(reversed(names))
+
+    def _on_activated(self, index: QModelIndex):
+        sym = self._model.symbol(index)
+        if sym is not None and self._editor is not None and hasattr(self._editor, "go_to"):
+            self._editor.go_to(sym.line, sym.col)
+
+    def _apply_theme(self):
+        t = theme
+        self._tree.setStyleSheet(f"QTreeView {{ background: {t.BG_PANEL}; border: none; }}")
+        self._empty.setStyleSheet(f"QLabel {{ color: {t.FG_MUTED}; font-size: 12px; }}")
+        self._tree.viewport().update()
@@ -1,9 +1,21 @@
-from PySide6.QtGui import QIcon, QPixmap, QColor
-from PySide6.QtWidgets import QApplication
+"""
+CartDark IDE · ui/icons.py
+界面图标。暗色模式使用 RGB 反色、保留 alpha 的变体。
+
+  - 反色由 QImage.invertPixels 在原始像素缓冲上完成，不逐像素调用 Python
+  - 两种主题的变体在启动时（warm_icons）一次性生成，并缓存到 IDE 状态目录；
+    缓存文件名带源文件的 mtime/大小，源图标更新后自动重新生成
+  - 切换主题只是换用另一组已缓存的 QIcon，不再清缓存重算
+"""
+from __future__ import annotations
+
 import os
 
-# 图标缓存（区分亮/暗模式）
-_icon_cache = {}
+from PySide6.QtGui import QIcon, QImage, QPixmap
+from PySide6.QtWidgets import QApplication
+
+# 图标缓存：(名称, 是否暗色) → QIcon
+_icon_cache: dict[tuple[str, bool], QIcon] = {}
 
 # 图标文件映射
 _icon_files = {
@@ -18,54 +30,92 @@ _icon_files = {
     "layer": "图层.png"
 }
 
+_ICON_DIR = os.path.join(os.path.dirname(__file__), "resources", "icons")
+
+
 def is_dark_mode() -> bool:
     """检测是否为暗色模式"""
     from PySide6.QtGui import QPalette
     bg = QApplication.palette().color(QPalette.ColorRole.Window)
     return bg.lightness() < 128
 
-def _invert_pixmap(pixmap: QPixmap) -> QPixmap:
-    """反转 pixmap 的 RGB 颜色，保留 alpha 通道"""
-    inverted = QPixmap(pixmap.size())
-    inverted.fill(QColor(0, 0, 0, 0))
-    for x in range(pixmap.width()):
-        for y in range(pixmap.height()):
-            color = pixmap.pixelColor(x, y)
-            if color.alpha() > 0:
-                inverted.setPixelColor(x, y, QColor(
-                    255 - color.red(),
-                    255 - color.green(),
-                    255 - color.blue(),
-                    color.alpha()
-                ))
-    return inverted
-
-def get_icon(name: str) -> QIcon:
-    """获取图标，暗色模式下自动反转颜色"""
-    dark = is_dark_mode()
-    cache_key = f"{name}_{'dark' if dark else 'light'}"
-
-    if cache_key in _icon_cache:
-        return _icon_cache[cache_key]
-
-    icon_path = os.path.join(
-        os.path.dirname(__file__),
-        "resources", "icons",
-        _icon_files.get(name, "文件.png")
-    )
 
+def _invert_image(image: QImage) -> QImage:
+    """反转 RGB 颜色，保留 alpha 通道"""
+    # 非预乘格式下按通道取反，半透明边缘的颜色不会被 alpha 拉偏
+    out = image.convertToFormat(QImage.Format_ARGB32)
+    out.invertPixels(QImage.InvertRgb)
+    return out
+
+
+def _disk_cache_path(name: str, src: str) -> str | None:
+    """暗色变体在磁盘缓存中的路径；状态目录不可用时返回 None"""
+    try:
+        from ..state.paths import cache_dir
+        st = os.stat(src)
+        folder = cache_dir("icons")
+    except OSError:
+        return None
+    return os.path.join(folder, f"{name}-dark-{st.st_mtime_ns:x}-{st.st_size:x}.png")
+
+
+def _prune_stale(name: str, keep: str) -> None:
+    """删除同一图标旧版本源文件留下的缓存"""
+    folder = os.path.dirname(keep)
+    prefix = f"{name}-dark-"
+    for entry in os.listdir(folder):
+        path = os.path.join(folder, entry)
+        if entry.startswith(prefix) and path != keep:
+            os.remove(path)
+
+
+def _load_dark(name: str, src: str) -> QPixmap:
+    cached = _disk_cache_path(name, src)
+    if cached and os.path.isfile(cached):
+        pixmap = QPixmap(cached)
+        if not pixmap.isNull():
+            return pixmap
+
+    image = _invert_image(QImage(src))
+    if cached:
+        # 写临时文件再改名，并发启动的两个进程不会读到半截文件
+        tmp = cached + ".tmp"
+        if image.save(tmp, "PNG"):
+            try:
+                os.replace(tmp, cached)
+                _prune_stale(name, cached)
+            except OSError:
+                pass
+    return QPixmap.fromImage(image)
+
+
+def _build_icon(name: str, dark: bool) -> QIcon:
+    icon_path = os.path.join(_ICON_DIR, _icon_files.get(name, "文件.png"))
     if not os.path.exists(icon_path):
         print(f"[icons] Icon not found: {icon_path}")
         return QIcon()
+    pixmap = _load_dark(name, icon_path) if dark else QPixmap(icon_path)
+    return QIcon(pixmap)
 
-    pixmap = QPixmap(icon_path)
-    if dark:
-        pixmap = _invert_pixmap(pixmap)
 
-    icon = QIcon(pixmap)
-    _icon_cache[cache_key] = icon
+def get_icon(name: str, dark: bool | None = None) -> QIcon:
+    """获取图标；dark 为 None 时按当前调色板选择亮/暗变体"""
+    if dark is None:
+        dark = is_dark_mode()
+    key = (name, dark)
+    icon = _icon_cache.get(key)
+    if icon is None:
+        icon = _icon_cache[key] = _build_icon(name, dark)
     return icon
 
+
+def warm_icons() -> None:
+    """启动时生成全部图标的两种主题变体（需在 QApplication 创建之后调用）"""
+    for name in _icon_files:
+        get_icon(name, False)
+        get_icon(name, True)
+
+
 def clear_cache():
-    """清除图标缓存（切换主题时调用）"""
-    _icon_cache.clear()
\ No newline at end of file
+    """丢弃内存中的图标（源图标文件被替换后调用）；主题切换不需要调用"""
+    _icon_cache.clear()
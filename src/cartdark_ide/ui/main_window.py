@@ -1,9 +1,13 @@
+import os
+
 from PySide6.QtWidgets import QMainWindow, QApplication, QDockWidget
 from PySide6.QtCore import Qt
 from .app_style import setup_app_style
+from .icons import warm_icons
 from .menus import create_menu_bar
 from .statusbar import create_status_bar
 from .central.workspace import Workspace
+from .central.panels.quick_open import QuickOpenPalette
 from .docks.assets_dock import AssetsDock
 from .docks.changed_files_dock import ChangedFilesDock
 from .docks.outline_dock import OutlineDock
@@ -11,6 +15,11 @@ from .docks.properties_dock import PropertiesDock
 from .docks.bottom_dock import BottomDock
 from .shortcuts import register_shortcuts
 from ..services.project_service import ProjectService
+from ..services.build_service import BuildService
+from ..services.workspace_service import WorkspaceIndex
+from ..services.text_index_service import TrigramIndex
+from ..services.session_service import SessionService
+from ..project.pack_document import flush_all, close_document
 
 
 class MainWindow(QMainWindow):
@@ -21,6 +30,7 @@ class MainWindow(QMainWindow):
 
         # ★ qdarktheme 必须最先调用，在任何 widget 创建之前
         setup_app_style()
+        warm_icons()
 
         create_menu_bar(self)
         create_status_bar(self)
@@ -34,22 +44,59 @@ class MainWindow(QMainWindow):
 
         register_shortcuts(self)
 
-        # 项目服务
+        # 项目服务；ProjectService 发出 project_closed 前已清空根目录，这里自己记一份
+        self._project_root = ""
         self._project_service = ProjectService(self)
         self._project_service.project_opened.connect(self._on_project_opened)
         self._project_service.project_closed.connect(self._on_project_closed)
         self._project_service.error_occurred.connect(self._on_project_error)
 
+        # 项目文件索引；资源树共用它的目录监视，pack 校验取它的文件清单
+        self.workspace_index = WorkspaceIndex(self)
+        self.assets_dock.set_workspace_index(self.workspace_index)
+        self.workspace.save_failed.connect(
+            lambda path, msg: self.statusBar().showMessage(
+                f"保存失败：{os.path.basename(path)}（{msg}）", 5000))
+        self.workspace.file_saved.connect(
+            lambda path: self.workspace_index.refresh_paths([path]))
+
+        # 快速打开（⌘P）
+        self._quick_open = QuickOpenPalette(self)
+        self._quick_open.file_chosen.connect(self.workspace.open_file)
+        self.assets_dock.file_activated.connect(
+            lambda path, _mode: self._quick_open.note_opened(path))
+        self.workspace_index.ready.connect(self._quick_open.invalidate)
+        self.workspace_index.files_changed.connect(
+            lambda _delta: self._quick_open.invalidate())
+
+        # 在文件中查找（⌘⇧F）；三元组索引随 WorkspaceIndex 增量更新
+        self.text_index = TrigramIndex(self.workspace_index, self)
+        self.bottom_dock.search_tab.set_index(self.text_index)
+        self.bottom_dock.search_tab.location_activated.connect(self.workspace.open_location)
+        self.bottom_dock.search_tab.set_editor_provider(self.workspace.editor_for)
+        self.bottom_dock.search_tab.files_replaced.connect(self._on_files_replaced)
+
+        # 工作区会话：按项目保存 / 恢复打开的标签
+        self._session = SessionService(self.workspace, self)
+
+        # 构建服务
+        self._build_service = BuildService(self)
+        self._build_service.build_progress.connect(self._on_build_progress)
+        self._build_service.build_finished.connect(self._on_build_finished)
+        self._build_service.build_failed.connect(self._on_build_failed)
+
     def _create_left_panels(self):
         self.assets_dock = AssetsDock()
         self.assets_dock.file_activated.connect(self.workspace.open_file)
         self.assets_dock.file_deleted.connect(self.workspace.close_file)
+        self.workspace.current_changed.connect(self._on_current_editor_changed)
         self.addDockWidget(Qt.LeftDockWidgetArea, self.assets_dock)
         self.changed_files_dock = ChangedFilesDock()
         self.addDockWidget(Qt.LeftDockWidgetArea, self.changed_files_dock)
 
     def _create_right_panels(self):
         self.outline_dock = OutlineDock()
+        self.workspace.current_changed.connect(self.outline_dock.set_editor)
         self.addDockWidget(Qt.RightDockWidgetArea, self.outline_dock)
         self.properties_dock = PropertiesDock()
         self.addDockWidget(Qt.RightDockWidgetArea, self.properties_dock)
@@ -82,18 +129,118 @@ class MainWindow(QMainWindow):
 
     def _on_project_opened(self, project, project_root: str):
         """项目加载成功，更新各面板"""
+        if self._session.is_open:
+            # 直接切换到另一个项目：先保存并关掉上一个项目的标签
+            self._session.close()
+            self.workspace.close_all(confirm=True)
+        if self._project_root and self._project_root != project_root:
+            close_document(self._project_root)
+        self._project_root = project_root
         self.setWindowTitle(f"CartDark IDE — {project.name}")
+        self.text_index.open(project_root)
+        # 索引先打开（会清空共用的目录监视），资源树再登记根目录
+        self.workspace_index.open(project_root)
         self.assets_dock.load_project(project_root, project.name)
+        self._quick_open.set_source(
+            project_root, lambda: [f.rel for f in self.workspace_index.files()])
+        self.bottom_dock.search_tab.set_source(project_root, self.workspace_index.files)
+        self._session.open(project.project_id, project_root)
 
     def _on_project_closed(self):
         """项目关闭，重置面板"""
         self.setWindowTitle("CartDark IDE")
+        flush_all()
+        if self._project_root:
+            # 释放项目的 pack.json 文档，重新打开时从磁盘读取
+            close_document(self._project_root)
+            self._project_root = ""
+        self._session.close()
+        self.workspace.close_all(confirm=True)
         self.assets_dock.close_project()
+        self.workspace_index.close()
+        self.text_index.close()
+        self._quick_open.clear()
+        self.bottom_dock.search_tab.set_source("", None)
+
+    def closeEvent(self, event):
+        # 退出前写出会话；文件读写线程会在解释器退出前写完
+        self._session.save()
+        super().closeEvent(event)
+
+    def open_quick_open(self):
+        """弹出快速打开（⌘P）"""
+        if not self._project_service.is_open:
+            self.statusBar().showMessage("未打开项目", 3000)
+            return
+        self._quick_open.popup()
+
+    def open_search_in_files(self):
+        """切到「搜索结果」标签并聚焦输入框（⌘⇧F），带入编辑器中选中的文本"""
+        tab = self.bottom_dock.search_tab
+        self.bottom_dock.show_tab(tab)
+        editor = self.workspace.current_editor()
+        selected = editor.selected_text() if hasattr(editor, "selected_text") else ""
+        # 多行选区不适合作为查询
+        tab.focus_input(selected if "\u2029" not in selected else "")
+
+    def _on_files_replaced(self, paths: list):
+        self.workspace_index.refresh_paths(paths)
+        self.workspace.reload_files(paths)
+
+    def _on_current_editor_changed(self, editor):
+        """资源树跟随当前标签选中对应文件"""
+        if editor is not None:
+            self.assets_dock.reveal_path(editor.file_path)
 
     def _on_project_error(self, message: str):
         from PySide6.QtWidgets import QMessageBox
         QMessageBox.critical(self, "打开项目失败", message)
 
+    # ── 构建 ──────────────────────────────────
+
+    def build_and_run(self):
+        """保存所有文件后按 pack.json 构建镜像（⌘B）"""
+        if not self._project_service.is_open:
+            self.statusBar().showMessage("未打开项目", 3000)
+            return
+        if self._build_service.is_running:
+            self.statusBar().showMessage("构建进行中…", 3000)
+            return
+        # 等所有文件写完再开始构建
+        self.statusBar().showMessage("保存中…")
+        self.workspace.save_all(self._start_build)
+
+    def _start_build(self, saved_ok: bool):
+        if not self._project_service.is_open or self._build_service.is_running:
+            return
+        root = self._project_service.current_root
+        flush_all()   # 写出尚未落盘的 pack.json 修改
+        if not saved_ok:
+            self.bottom_dock.console_tab.append_line("[构建] 警告：有文件保存失败，使用磁盘上的版本构建")
+        self.bottom_dock.console_tab.append_line(f"[构建] 开始：{root}")
+        self.statusBar().showMessage("构建中…")
+        self._build_service.build(root)
+
+    def _on_build_progress(self, done: int, total: int):
+        self.statusBar().showMessage(f"构建中… {done}/{total}")
+
+    def _on_build_finished(self, result):
+        console = self.bottom_dock.console_tab
+        for w in result.warnings:
+            console.append_line(f"[构建] 警告：{w}")
+        if result.up_to_date:
+            console.append_line(f"[构建] 已是最新：{result.output_path}")
+        else:
+            console.append_line(
+                f"[构建] 完成：{result.output_path}（{result.image_size} 字节，"
+                f"{result.chunk_count} 个 chunk，{result.file_count} 个文件，"
+                f"复用 {result.reused_files} 个）")
+        self.statusBar().showMessage("构建完成", 5000)
+
+    def _on_build_failed(self, message: str):
+        self.bottom_dock.console_tab.append_line(f"[构建] 失败：{message}")
+        self.statusBar().showMessage("构建失败", 5000)
+
 
 if __name__ == "__main__":
     app = QApplication([])
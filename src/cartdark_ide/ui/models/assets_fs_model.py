@@ -1,12 +1,49 @@
 """
 CartDark IDE · ui/models/assets_fs_model.py
 资源面板的数据模型，直接反映项目磁盘目录结构。
+
+结构：
+  - 自定义 QAbstractItemModel，每个条目是一个 __slots__ 节点，
+    不再为每个文件创建带图标、提示文本和属性字典的 QStandardItem
+  - 绝对路径 → 节点 的字典索引；按路径定位、展开状态恢复、增量更新均为 O(1)
+  - 节点只保存图标名（ICON_NAME_ROLE），由 AssetsDelegate 在绘制时
+    按当前主题取图标；切换主题不触碰模型
+
+目录按需加载：
+  - 打开项目时只同步扫描项目根目录一层
+  - 其余目录在视图展开时经 canFetchMore / fetchMore 请求，
+    由后台线程 scandir 并排序，结果通过信号交回 UI 线程
+  - 子项分批插入（每批 _INSERT_BATCH 行，批间让出事件循环），
+    大目录展开时界面不会卡住
+
+增量更新：
+  - 不单独监视磁盘：使用 WorkspaceIndex 的 FsWatchService（set_watcher），
+    加载完成的目录登记到其中（索引已登记的目录沿用其快照）
+  - 磁盘变化以增量（新增 / 删除 / 重命名）送回，未加载的目录忽略；
+    按排序位置插入 / 移除 / 移动行，不重建整棵树
 """
 from __future__ import annotations
 
 import os
-from PySide6.QtGui import QStandardItemModel, QStandardItem
-from ..icons import get_icon
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import (
+    QAbstractItemModel, QModelIndex, QObject, QTimer, Qt, Signal,
+)
+from ...services.fs_watch_service import (
+    FsWatchService, FsDelta, ADDED, REMOVED, RENAMED, scan_dir,
+)
+
+
+# 图标名角色：值为 icons.get_icon 接受的名称
+ICON_NAME_ROLE = Qt.UserRole + 1
+
+# 每次事件循环插入的最大行数
+_INSERT_BATCH = 256
+
+# 目录扫描线程数
+_SCAN_WORKERS = 2
 
 
 # 文件扩展名 → 图标名映射
@@ -39,110 +76,418 @@ def _icon_for_dir(name: str) -> str:
     return _DIR_ICON.get(name.lower(), "folder")
 
 
-class AssetsItem(QStandardItem):
-    """资源树节点，存储图标名以便主题切换时重建"""
+# 目录加载状态
+_UNFETCHED = 0
+_LOADING = 1     # 扫描或分批插入进行中
+_FETCHED = 2
+
+
+class _Node:
+    """资源树节点"""
+    __slots__ = ("name", "path", "parent", "children", "row", "is_dir", "icon", "state")
 
-    def __init__(self, label: str, icon_name: str, abs_path: str = ""):
-        super().__init__(label)
-        self._icon_name = icon_name
-        self._abs_path = abs_path
-        self.setIcon(get_icon(icon_name))
-        self.setEditable(False)
-        if abs_path:
-            self.setToolTip(abs_path)
+    def __init__(self, name: str, path: str, parent: "_Node | None",
+                 is_dir: bool, icon: str):
+        self.name = name
+        self.path = path
+        self.parent = parent
+        self.children: list[_Node] = []
+        self.row = 0
+        self.is_dir = is_dir
+        self.icon = icon
+        self.state = _UNFETCHED if is_dir else _FETCHED
 
-    def refresh_icon(self):
-        self.setIcon(get_icon(self._icon_name))
 
+def _sort_key(is_dir: bool, name: str):
+    """与 scan_dir 的排序一致"""
+    return (0 if is_dir else 1, name.lower())
 
-class AssetsFsModel(QStandardItemModel):
+
+class _DirScanner(QObject):
+    """
+    后台目录扫描。
+
+    信号
+    ----
+    scanned(int, str, list)
+        (代次, 目录路径, scan_dir 的结果)，已过滤并排序。
+    """
+
+    scanned = Signal(int, str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=_SCAN_WORKERS,
+                                            thread_name_prefix="assets-scan")
+
+    def request(self, generation: int, dir_path: str):
+        self._executor.submit(self._run, generation, dir_path)
+
+    def _run(self, generation: int, dir_path: str):
+        # 信号跨线程发出时 Qt 自动排队到 UI 线程
+        self.scanned.emit(generation, dir_path, scan_dir(dir_path))
+
+
+class AssetsFsModel(QAbstractItemModel):
     """
     资源面板数据模型。
 
     空状态（未打开项目）时显示占位提示；
-    打开项目后扫描磁盘目录填充树。
+    打开项目后同步加载根目录一层，其余目录展开时按需加载。
+
+    信号
+    ----
+    directory_loaded(str)
+        某目录的子项已全部插入。
     """
 
+    directory_loaded = Signal(str)
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setHorizontalHeaderLabels(["名称"])
+        self._root = _Node("", "", None, True, "")          # 不可见根
+        self._root.state = _FETCHED
+        self._placeholder = _Node("未打开项目", "", self._root, False, "")
+        self._root.children = [self._placeholder]
+        self._by_path: dict[str, _Node] = {}
         self._project_root: str = ""
-        self._show_placeholder()
+        self._generation = 0                     # 每次重建 +1，丢弃过期的扫描结果
+        self._insert_queue: deque = deque()      # [(node, entries, offset)]
+        self._insert_timer = QTimer(self)
+        self._insert_timer.setSingleShot(True)
+        self._insert_timer.setInterval(0)
+        self._insert_timer.timeout.connect(self._insert_next_batch)
+        self._scanner = _DirScanner(self)
+        self._scanner.scanned.connect(self._on_scanned)
+        self._watcher: FsWatchService | None = None   # 与 WorkspaceIndex 共用
 
     # ── 公开 API ──────────────────────────────
 
+    def set_watcher(self, watcher: FsWatchService):
+        """使用共享的目录监视服务（WorkspaceIndex.watcher）接收磁盘增量"""
+        if self._watcher is not None:
+            self._watcher.changed.disconnect(self.apply_deltas)
+        self._watcher = watcher
+        watcher.changed.connect(self.apply_deltas)
+
     def load_from_root(self, project_root: str, project_name: str = ""):
         """
         扫描 project_root 目录，重建资源树。
         project_name 作为根节点显示名称；不传则用目录名。
         """
-        self.clear()
-        self.setHorizontalHeaderLabels(["名称"])
+        self.beginResetModel()
+        self._reset()
         self._project_root = os.path.abspath(project_root)
 
         display_name = project_name or os.path.basename(self._project_root)
-        root = AssetsItem(display_name, "folder", self._project_root)
-        self.appendRow(root)
-        self._populate(root, self._project_root)
-
-    def reload_icons(self):
-        """主题切换后递归刷新所有节点图标"""
-        self._refresh_icons(self.invisibleRootItem())
-
-    # ── 内部方法 ──────────────────────────────
-
-    def _show_placeholder(self):
-        placeholder = QStandardItem("未打开项目")
-        placeholder.setEditable(False)
-        placeholder.setEnabled(False)
-        self.appendRow(placeholder)
-
-    def _populate(self, parent_item: AssetsItem, dir_path: str):
-        """递归扫描目录，填充到 parent_item 下"""
-        try:
-            entries = sorted(os.scandir(dir_path), key=_sort_key)
-        except PermissionError:
+        top = _Node(display_name, self._project_root, self._root, True, "folder")
+        self._root.children = [top]
+        self._by_path[top.path] = top
+        # 根目录一层同步加载，打开项目即可看到顶层
+        entries = scan_dir(self._project_root)
+        self._append_children(top, entries)
+        top.state = _FETCHED
+        self.endResetModel()
+        self._watch_dir(self._project_root, entries)
+
+    def clear(self):
+        """关闭项目，回到占位状态"""
+        self.beginResetModel()
+        self._reset()
+        self._project_root = ""
+        self._root.children = [self._placeholder]
+        self.endResetModel()
+
+    def path_for(self, index: QModelIndex) -> str:
+        node = self._node(index)
+        return node.path if node is not None else ""
+
+    def is_dir(self, index: QModelIndex) -> bool:
+        node = self._node(index)
+        return node is not None and node.is_dir
+
+    def index_for_path(self, abs_path: str) -> QModelIndex:
+        """已加载节点中 abs_path 对应的索引；尚未加载时返回无效索引"""
+        node = self._by_path.get(os.path.abspath(abs_path)) if abs_path else None
+        return self._index_of(node) if node is not None else QModelIndex()
+
+    def loaded_dirs(self) -> list[str]:
+        """子项已加载的目录"""
+        return [p for p, n in self._by_path.items() if n.is_dir and n.state == _FETCHED]
+
+    def ensure_loaded(self, dir_path: str) -> bool:
+        """请求加载 dir_path 的子项；已加载时返回 True，否则完成后发出 directory_loaded"""
+        node = self._by_path.get(dir_path)
+        if node is None or not node.is_dir:
+            return False
+        if node.state == _UNFETCHED:
+            self._request(node)
+        return node.state == _FETCHED
+
+    def sync_dirs(self, dir_paths):
+        """IDE 自己改动磁盘后调用：立即比较这些目录并应用增量（索引同时收到）"""
+        if self._watcher is not None:
+            self._watcher.poll([os.path.abspath(d) for d in dir_paths])
+
+    def apply_deltas(self, deltas: list[FsDelta]):
+        """把磁盘增量应用为行的插入 / 移除；未加载的目录忽略（展开时再读取）"""
+        for d in deltas:
+            if d.kind == REMOVED:
+                self._remove_path(d.path)
+            elif d.kind == ADDED:
+                self._add_path(d.path, d.is_dir)
+            elif d.kind == RENAMED:
+                self._rename_path(d.path, d.new_path, d.is_dir)
+
+    # ── QAbstractItemModel ────────────────────
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        p = self._node(parent) if parent.isValid() else self._root
+        if column != 0 or p is None or not 0 <= row < len(p.children):
+            return QModelIndex()
+        return self.createIndex(row, 0, p.children[row])
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        node = self._node(index)
+        if node is None or node.parent is None or node.parent is self._root:
+            return QModelIndex()
+        return self.createIndex(node.parent.row, 0, node.parent)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        node = self._node(parent) if parent.isValid() else self._root
+        return len(node.children) if node is not None else 0
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        node = self._node(parent) if parent.isValid() else self._root
+        if node is None:
+            return False
+        if node.is_dir and node.state != _FETCHED:
+            return True
+        return bool(node.children)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        node = self._node(parent)
+        return node is not None and node.is_dir and node.state == _UNFETCHED
+
+    def fetchMore(self, parent: QModelIndex):
+        node = self._node(parent)
+        if node is not None and node.is_dir and node.state == _UNFETCHED:
+            self._request(node)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        node = self._node(index)
+        if node is None:
+            return None
+        if role == Qt.DisplayRole:
+            return node.name
+        if node is self._placeholder:
+            return None
+        if role == ICON_NAME_ROLE:
+            return node.icon
+        if role == Qt.ToolTipRole:
+            return node.path
+        return None
+
+    def flags(self, index: QModelIndex):
+        node = self._node(index)
+        if node is None or node is self._placeholder:
+            return Qt.NoItemFlags        # 占位行不可选
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and section == 0:
+            return "名称"
+        return None
+
+    # ── 内部：节点 ────────────────────────────
+
+    @staticmethod
+    def _node(index: QModelIndex) -> _Node | None:
+        return index.internalPointer() if index.isValid() else None
+
+    def _index_of(self, node: _Node) -> QModelIndex:
+        if node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def _reset(self):
+        self._generation += 1
+        self._insert_queue.clear()
+        self._insert_timer.stop()
+        # 监视服务归 WorkspaceIndex 所有，随项目关闭由它清空
+        self._by_path.clear()
+
+    def _watch_dir(self, dir_path: str, entries):
+        if self._watcher is not None:
+            self._watcher.watch_dir(dir_path, entries)
+
+    def _make_node(self, parent: _Node, name: str, is_dir: bool) -> _Node:
+        path = os.path.join(parent.path, name)
+        icon = _icon_for_dir(name) if is_dir else _icon_for_file(name)
+        node = _Node(name, path, parent, is_dir, icon)
+        self._by_path[path] = node
+        return node
+
+    def _append_children(self, parent: _Node, entries):
+        children = parent.children
+        for name, is_dir, _ino in entries:
+            node = self._make_node(parent, name, is_dir)
+            node.row = len(children)
+            children.append(node)
+
+    @staticmethod
+    def _renumber(parent: _Node, start: int):
+        children = parent.children
+        for i in range(start, len(children)):
+            children[i].row = i
+
+    def _forget_tree(self, node: _Node):
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            self._by_path.pop(n.path, None)
+            stack.extend(n.children)
+
+    # ── 内部：按需加载 ────────────────────────
+
+    def _request(self, node: _Node):
+        node.state = _LOADING
+        self._scanner.request(self._generation, node.path)
+
+    def _on_scanned(self, generation: int, dir_path: str, entries: list):
+        if generation != self._generation:
             return
+        node = self._by_path.get(dir_path)
+        if node is None or node.state != _LOADING:
+            return
+        self._insert_queue.append((node, entries, 0))
+        if not self._insert_timer.isActive():
+            self._insert_timer.start()
 
-        for entry in entries:
-            # 跳过隐藏文件和 IDE 内部目录（.venv 等）
-            if _should_skip(entry.name):
-                continue
-
-            if entry.is_dir(follow_symlinks=False):
-                icon = _icon_for_dir(entry.name)
-                item = AssetsItem(entry.name, icon, entry.path)
-                parent_item.appendRow(item)
-                self._populate(item, entry.path)
+    def _insert_next_batch(self):
+        """插入一批子项；未插完的目录留在队首，下一轮事件循环继续"""
+        if not self._insert_queue:
+            return
+        node, entries, offset = self._insert_queue.popleft()
+        if self._by_path.get(node.path) is not node:
+            # 加载期间目录被移除或改名，丢弃这次结果
+            node.state = _UNFETCHED
+        else:
+            batch = entries[offset:offset + _INSERT_BATCH]
+            if batch:
+                first = len(node.children)
+                self.beginInsertRows(self._index_of(node), first, first + len(batch) - 1)
+                self._append_children(node, batch)
+                self.endInsertRows()
+            offset += len(batch)
+            if offset < len(entries):
+                self._insert_queue.appendleft((node, entries, offset))
             else:
-                icon = _icon_for_file(entry.name)
-                item = AssetsItem(entry.name, icon, entry.path)
-                parent_item.appendRow(item)
-
-    def _refresh_icons(self, parent: QStandardItem):
-        for row in range(parent.rowCount()):
-            item = parent.child(row)
-            if isinstance(item, AssetsItem):
-                item.refresh_icon()
-            self._refresh_icons(item)
-
-
-# ── 辅助函数 ──────────────────────────────────
-
-# 跳过这些目录/文件
-_SKIP_NAMES = {".venv", ".git", ".idea", "__pycache__", ".DS_Store", "Thumbs.db"}
-_SKIP_PREFIXES = (".",)   # 以 . 开头的隐藏文件/目录（.gitignore 除外）
-
-
-def _should_skip(name: str) -> bool:
-    if name in _SKIP_NAMES:
-        return True
-    # 保留 .gitignore，跳过其他隐藏文件
-    if name.startswith(".") and name != ".gitignore":
-        return True
-    return False
+                node.state = _FETCHED
+                self._watch_dir(node.path, entries)
+                if not entries:
+                    # 空目录：让视图重新询问 hasChildren，去掉展开箭头
+                    idx = self._index_of(node)
+                    self.dataChanged.emit(idx, idx)
+                self.directory_loaded.emit(node.path)
+        if self._insert_queue:
+            self._insert_timer.start()
+
+    # ── 内部：增量 ────────────────────────────
+
+    def _loaded_dir(self, dir_path: str) -> _Node | None:
+        node = self._by_path.get(dir_path)
+        if node is not None and node.is_dir and node.state == _FETCHED:
+            return node
+        return None
+
+    @staticmethod
+    def _insert_pos(parent: _Node, key) -> int:
+        """按排序规则在 parent 的子项中二分查找插入位置"""
+        children = parent.children
+        lo, hi = 0, len(children)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            c = children[mid]
+            if _sort_key(c.is_dir, c.name) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
 
+    def _remove_path(self, abs_path: str):
+        node = self._by_path.get(abs_path)
+        if node is None or node.parent is self._root:
+            return
+        parent = node.parent
+        self.beginRemoveRows(self._index_of(parent), node.row, node.row)
+        del parent.children[node.row]
+        self._renumber(parent, node.row)
+        self._forget_tree(node)
+        self.endRemoveRows()
+
+    def _add_path(self, abs_path: str, is_dir: bool):
+        parent = self._loaded_dir(os.path.dirname(abs_path))
+        if parent is None or abs_path in self._by_path:
+            return
+        name = os.path.basename(abs_path)
+        pos = self._insert_pos(parent, _sort_key(is_dir, name))
+        self.beginInsertRows(self._index_of(parent), pos, pos)
+        parent.children.insert(pos, self._make_node(parent, name, is_dir))
+        self._renumber(parent, pos)
+        self.endInsertRows()
+
+    def _rename_path(self, old_path: str, new_path: str, is_dir: bool):
+        node = self._by_path.get(old_path)
+        new_parent = self._loaded_dir(os.path.dirname(new_path))
+        if node is None or node.parent is self._root:
+            if new_parent is not None:
+                self._add_path(new_path, is_dir)
+            return
+        if new_parent is None:
+            self._remove_path(old_path)
+            return
 
-def _sort_key(entry: os.DirEntry):
-    """目录排在文件前，同类按名称字母序"""
-    return (0 if entry.is_dir() else 1, entry.name.lower())
\ No newline at end of file
+        old_parent = node.parent
+        src = node.row
+        name = os.path.basename(new_path)
+        # 目标位置按去掉自身后的列表计算
+        del old_parent.children[src]
+        pos = self._insert_pos(new_parent, _sort_key(node.is_dir, name))
+        old_parent.children.insert(src, node)
+
+        same = new_parent is old_parent
+        moving = not same or pos != src
+        if moving:
+            # beginMoveRows 的目标行以移动前的列表为准
+            dst = pos + 1 if same and pos > src else pos
+            self.beginMoveRows(self._index_of(old_parent), src, src,
+                               self._index_of(new_parent), dst)
+            del old_parent.children[src]
+            self._renumber(old_parent, src)
+            new_parent.children.insert(pos, node)
+            node.parent = new_parent
+            self._renumber(new_parent, min(pos, src) if same else pos)
+        self._retarget(node, name, new_path)
+        if moving:
+            self.endMoveRows()
+        idx = self._index_of(node)
+        self.dataChanged.emit(idx, idx)
+
+    def _retarget(self, node: _Node, name: str, new_path: str):
+        """节点改名 / 移动后更新名称、图标以及已加载子孙的路径索引"""
+        node.name = name
+        node.icon = _icon_for_dir(name) if node.is_dir else _icon_for_file(name)
+        stack = [(node, new_path)]
+        while stack:
+            n, path = stack.pop()
+            self._by_path.pop(n.path, None)
+            n.path = path
+            self._by_path[path] = n
+            for child in n.children:
+                stack.append((child, os.path.join(path, child.name)))
@@ -0,0 +1,101 @@
+"""
+CartDark IDE · ui/models/outline_model.py
+大纲面板的数据模型。
+
+  - 直接以 outline_service.Symbol 树为节点（internalPointer），
+    不为每个符号创建 QStandardItem；索引在视图访问到时才生成
+  - 每次解析结果整体替换（reset），符号树由后台线程新建，不与旧树共享节点
+"""
+from __future__ import annotations
+
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt
+
+from ...services.outline_service import (
+    Symbol, FUNCTION, LOCAL_FUNCTION, METHOD, TABLE, REQUIRE,
+)
+from ..icons import get_icon
+
+
+# Symbol 角色：值为 Symbol 对象
+SYMBOL_ROLE = Qt.UserRole + 1
+
+# 符号类别 → (图标名, 说明)
+_KIND_INFO: dict[str, tuple[str, str]] = {
+    FUNCTION:       ("code", "函数"),
+    LOCAL_FUNCTION: ("code", "局部函数"),
+    METHOD:         ("code", "方法"),
+    TABLE:          ("struct", "表"),
+    REQUIRE:        ("dependency", "require"),
+}
+
+
+class OutlineModel(QAbstractItemModel):
+    """一个文件的符号树"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._symbols: list[Symbol] = []
+
+    # ── 公开 API ──────────────────────────────
+
+    def set_symbols(self, symbols: list[Symbol]):
+        self.beginResetModel()
+        self._symbols = symbols
+        self.endResetModel()
+
+    def clear(self):
+        self.set_symbols([])
+
+    def symbol(self, index: QModelIndex) -> Symbol | None:
+        return index.internalPointer() if index.isValid() else None
+
+    # ── QAbstractItemModel ────────────────────
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        children = self._children(parent)
+        if column != 0 or not 0 <= row < len(children):
+            return QModelIndex()
+        return self.createIndex(row, 0, children[row])
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        sym = self.symbol(index)
+        if sym is None or sym.parent is None:
+            return QModelIndex()
+        return self.createIndex(sym.parent.row, 0, sym.parent)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        return len(self._children(parent))
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return bool(self._children(parent))
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        sym = self.symbol(index)
+        if sym is None:
+            return None
+        if role == Qt.DisplayRole:
+            return sym.name
+        if role == Qt.DecorationRole:
+            # 图标按当前主题取，切换主题后重绘即可
+            return get_icon(_KIND_INFO.get(sym.kind, ("code", ""))[0])
+        if role == Qt.ToolTipRole:
+            return f"{_KIND_INFO.get(sym.kind, ('', sym.kind))[1]} · 第 {sym.line} 行"
+        if role == SYMBOL_ROLE:
+            return sym
+        return None
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    # ── 内部 ──────────────────────────────────
+
+    def _children(self, parent: QModelIndex) -> list[Symbol]:
+        sym = self.symbol(parent)
+        return sym.children if sym is not None else self._symbols
@@ -38,8 +38,8 @@ def register_shortcuts(window) -> None:
     # ⌘O / Ctrl+O  打开项目
     _bind(window, "Ctrl+O", lambda: window.open_open_project_dialog())
 
-    # ⌘P / Ctrl+P  聚焦到资源面板（打开资源）
-    _bind(window, "Ctrl+P", lambda: _focus_assets(window))
+    # ⌘P / Ctrl+P  快速打开文件
+    _bind(window, "Ctrl+P", lambda: window.open_quick_open())
 
     # ── 构建/运行 ─────────────────────────────────
 
@@ -110,15 +110,6 @@ def _editor_op(workspace, method: str) -> None:
             fn()
 
 
-def _focus_assets(window) -> None:
-    """显示并聚焦资源面板"""
-    dock = window.assets_dock
-    if not dock.isVisible():
-        dock.setVisible(True)
-    dock.raise_()
-    dock.setFocus()
-
-
 def _toggle_fullscreen(window) -> None:
     if window.isFullScreen():
         window.showNormal()
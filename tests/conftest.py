@@ -0,0 +1,12 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def app():
+    """整个测试进程共用一个 QApplication（离屏）"""
+    pytest.importorskip("PySide6")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
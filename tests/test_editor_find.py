@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from src.cartdark_ide.ui.central.editor_host import _CodeEditor, _FindBar  # noqa: E402
+
+
+TEXT = "a\nb\nfoo bar\nfoo = foo + 1\n"
+
+
+def _wait_until(app, cond, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if cond():
+            return
+        time.sleep(0.01)
+    raise AssertionError("timed out")
+
+
+def _settled(bar):
+    return not bar._find_timer.isActive() and not bar._stale and bar._done
+
+
+@pytest.fixture
+def find_bar(app):
+    editor = _CodeEditor()
+    editor.setPlainText(TEXT)
+    bar = _FindBar(editor)
+    bar.show()
+    bar._input.setText("foo")
+    _wait_until(app, lambda: _settled(bar) and len(bar._offsets) == 3)
+    yield editor, bar
+    bar.hide()
+    bar.deleteLater()
+    editor.deleteLater()
+
+
+def test_changing_query_selects_first_match(find_bar):
+    editor, _bar = find_bar
+    assert editor.textCursor().selectedText() == "foo"
+
+
+def test_edit_with_bar_open_keeps_cursor_in_place(app, find_bar):
+    editor, bar = find_bar
+    cursor = editor.textCursor()
+    cursor.setPosition(editor.document().findBlockByNumber(2).position())
+    editor.setTextCursor(cursor)
+
+    editor.insertPlainText("X")
+    pos = editor.textCursor().position()
+    time.sleep(0.3)
+    _wait_until(app, lambda: _settled(bar))
+
+    assert editor.textCursor().position() == pos
+    assert not editor.textCursor().hasSelection()
+    editor.insertPlainText("Y")
+    lines = editor.toPlainText().split("\n")
+    assert lines[2] == "XYfoo bar"
+    assert lines[3] == "foo = foo + 1"
+    assert len(bar._offsets) == 3
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from src.cartdark_ide.project import pack_sync
+from src.cartdark_ide.project.pack_document import close_document
+
+
+@pytest.fixture
+def project(tmp_path):
+    pack = {
+        "icon": {"path": "res/icon.png"},
+        "meta": {"entry": "main/main.lua"},
+        "chunks": [
+            {"type": "script", "glob": "script/**/*.lua",
+             "strip_prefix": "script/", "name_prefix": "main/",
+             "res": ["script/main.lua"]},
+            {"type": "RES", "glob": "res/**/*",
+             "strip_prefix": "res/", "name_prefix": "res/"},
+        ],
+    }
+    (tmp_path / "pack.json").write_text(json.dumps(pack), encoding="utf-8")
+    (tmp_path / "script").mkdir()
+    (tmp_path / "script" / "main.lua").write_text("", encoding="utf-8")
+    (tmp_path / "res").mkdir()
+    (tmp_path / "res" / "icon.png").write_bytes(b"")
+    yield tmp_path
+    close_document(str(tmp_path))
+
+
+def _pack(root):
+    close_document(str(root))
+    return json.loads((root / "pack.json").read_text(encoding="utf-8"))
+
+
+def _rename(root, old, new):
+    (root / old).rename(root / new)
+    return pack_sync.on_file_renamed(str(root), str(root / old), str(root / new))
+
+
+def test_renaming_unrelated_folder_keeps_name_prefix(project):
+    (project / "main").mkdir()
+    assert not _rename(project, "main", "levels")
+    data = _pack(project)
+    assert data["chunks"][0]["name_prefix"] == "main/"
+    assert data["meta"]["entry"] == "main/main.lua"
+
+
+def test_renaming_source_folder_moves_paths_not_pack_names(project):
+    assert _rename(project, "script", "code")
+    chunk = _pack(project)["chunks"][0]
+    assert chunk["glob"] == "code/**/*.lua"
+    assert chunk["strip_prefix"] == "code/"
+    assert chunk["res"] == ["code/main.lua"]
+    assert chunk["name_prefix"] == "main/"
+
+
+def test_renaming_res_keeps_res_name_prefix(project):
+    assert _rename(project, "res", "assets")
+    data = _pack(project)
+    assert data["chunks"][1]["strip_prefix"] == "assets/"
+    assert data["chunks"][1]["name_prefix"] == "res/"
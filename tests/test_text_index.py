@@ -0,0 +1,41 @@
+import re
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from src.cartdark_ide.services.text_index_service import (  # noqa: E402
+    query_trigrams, regex_literals, trigrams_of,
+)
+
+
+def _narrows_to(pattern: str, text: str) -> bool:
+    """text 含 pattern 的匹配时，查询三元组必须全部出现在 text 中"""
+    assert re.search(pattern, text)
+    return query_trigrams(pattern, regex=True, case_sensitive=True) <= trigrams_of(text.encode())
+
+
+@pytest.mark.parametrize("pattern", [
+    r"\x41BCD",
+    r"\U00000041BCD",
+    r"\N{LATIN CAPITAL LETTER A}BCD",
+    r"\101BCD",
+    r"\0BCD",
+])
+def test_escape_arguments_are_not_literals(pattern):
+    assert regex_literals(pattern) == ["BCD"]
+
+
+def test_hex_escape_still_finds_text():
+    assert _narrows_to(r"\x41BCD", "xx ABCD yy")
+
+
+def test_backreference_is_a_cut_point():
+    assert regex_literals(r"(a)\1BCD") == ["BCD"]
+    assert regex_literals(r"(a)\12xyz") == ["xyz"]
+    assert _narrows_to(r"(ab)\1cdef", "ababcdef")
+
+
+def test_punctuation_escapes_stay_literal():
+    assert regex_literals(r"foo\.bar") == ["foo.bar"]
+    assert regex_literals(r"ab\dcd") == ["ab", "cd"]
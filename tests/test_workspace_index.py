@@ -0,0 +1,74 @@
+import json
+import time
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from src.cartdark_ide.project import pack_sync  # noqa: E402
+from src.cartdark_ide.project.pack_document import close_document, document_for  # noqa: E402
+from src.cartdark_ide.services.workspace_service import WorkspaceIndex  # noqa: E402
+from src.cartdark_ide.ui.models.assets_fs_model import AssetsFsModel  # noqa: E402
+
+
+def _wait_until(app, cond, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if cond():
+            return
+        time.sleep(0.01)
+    raise AssertionError("timed out")
+
+
+@pytest.fixture
+def project(app, tmp_path):
+    pack = {"chunks": [
+        {"type": "RES", "glob": "res/**/*", "strip_prefix": "res/", "name_prefix": "res/"},
+        {"type": "RES", "glob": "img/**/*.png", "strip_prefix": "img/", "name_prefix": "img/"},
+    ]}
+    (tmp_path / "pack.json").write_text(json.dumps(pack), encoding="utf-8")
+    (tmp_path / "res").mkdir()
+    (tmp_path / "res" / "a.png").write_bytes(b"")
+    index = WorkspaceIndex()
+    index.open(str(tmp_path))
+    _wait_until(app, lambda: index.is_ready and index.watcher._snapshots)
+    yield tmp_path, index
+    index.close()
+    close_document(str(tmp_path))
+
+
+def _glob_issues(issues):
+    return [i for i in issues if "glob" in i]
+
+
+def test_validate_uses_index_instead_of_walking(project, monkeypatch):
+    root, index = project
+
+    def no_walk(*_args, **_kwargs):
+        raise AssertionError("validate walked the project")
+
+    monkeypatch.setattr(pack_sync, "scan_project", no_walk)
+    assert _glob_issues(pack_sync.validate(str(root), index)) == [
+        "chunks[1] glob 未匹配到任何文件：img/**/*.png"]
+
+    # 尚未写盘的修改按当前内容重新分类
+    def retarget(data):
+        data["chunks"][1]["glob"] = "res/**/*.png"
+        return True
+
+    document_for(str(root)).mutate(retarget)
+    assert _glob_issues(pack_sync.validate(str(root), index)) == []
+
+
+def test_assets_model_shares_index_watcher(app, project):
+    root, index = project
+    model = AssetsFsModel()
+    model.set_watcher(index.watcher)
+    model.load_from_root(str(root))
+
+    (root / "new.lua").write_text("", encoding="utf-8")
+    model.sync_dirs([str(root)])
+
+    assert model.index_for_path(str(root / "new.lua")).isValid()
+    assert index.get("new.lua") is not None